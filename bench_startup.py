@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Замер времени запуска неинтерактивных команд system.py
+
+Сравнивает пустой интерпретатор, разовые команды и прежнюю схему, когда
+при старте сразу загружались psutil, platform, shutil, socket, subprocess,
+hashlib, json и datetime. Запуск: python bench_startup.py [число повторов]
+"""
+
+import os
+import subprocess
+import sys
+import time
+import py_compile
+from statistics import median
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EAGER = "import psutil, platform, shutil, socket, subprocess, hashlib, json, datetime, system"
+
+CASES = [
+    ("python -c pass", [sys.executable, "-c", "pass"]),
+    ("прежний импорт (всё сразу)", [sys.executable, "-c", EAGER]),
+    ("system mem --json", [sys.executable, "-m", "system", "mem", "--json"]),
+    ("system --help", [sys.executable, "-m", "system", "--help"]),
+]
+
+
+def measure(command, runs):
+    """Медиана времени выполнения команды в миллисекундах"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=HERE, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    # Байткод компилируется заранее, иначе замер включает компиляцию исходника
+    py_compile.compile(os.path.join(HERE, "system.py"))
+
+    results = [(name, measure(command, runs)) for name, command in CASES]
+    baseline = results[0][1]
+    print(f"{'Команда':<30} {'медиана, мс':>12} {'сверх интерпретатора':>22}")
+    for name, elapsed in results:
+        print(f"{name:<30} {elapsed:>12.1f} {elapsed - baseline:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
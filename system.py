@@ -6,15 +6,34 @@
 Автор: ByredHub
 """
 
-import psutil
-import platform
 import os
 import time
-from datetime import datetime, timedelta
-import shutil
-import socket
-import subprocess
 import sys
+import threading
+import heapq
+from array import array
+from collections import namedtuple
+
+
+class _LazyModule:
+    """Модуль, импортируемый при первом обращении к его атрибуту
+    
+    После импорта глобальное имя заменяется настоящим модулем, так что
+    дальнейшие обращения идут напрямую. Тяжелые зависимости (psutil)
+    не загружаются командами, которым они не нужны.
+    """
+    
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+    
+    def __getattr__(self, attr):
+        module = __import__(self._name)
+        globals()[self._name] = module
+        return getattr(module, attr)
+
+
+psutil = _LazyModule('psutil')
+
 
 class Colors:
     """ANSI цвета для красивого вывода"""
@@ -37,9 +56,1899 @@ class Colors:
     BRIGHT_RED = '\033[91m'
     WHITE = '\033[97m'
 
+
+class CpuSampler:
+    """Фоновый сэмплер загрузки CPU по разнице снимков cpu_times
+    
+    На каждом такте также обновляются подключенные трекеры (add_tracker) -
+    объекты с методом update(), например скорости дисков и сети.
+    """
+    
+    # Интервал первого замера, чтобы данные появились сразу после старта
+    WARMUP = 0.25
+    
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._prev = None
+        # (общая загрузка, загрузка по ядрам, время замера) - заменяется целиком
+        self._latest = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.trackers = []
+    
+    def add_tracker(self, tracker):
+        """Подключение трекера: первый замер сразу, дальше - на каждом такте"""
+        tracker.update()
+        self.trackers.append(tracker)
+    
+    @staticmethod
+    def _percent(prev, cur):
+        """Процент занятости между двумя снимками (busy, total)"""
+        delta_total = cur[1] - prev[1]
+        if delta_total <= 0:
+            return 0.0
+        percent = (cur[0] - prev[0]) / delta_total * 100
+        return round(min(max(percent, 0.0), 100.0), 1)
+    
+    def sample(self):
+        """Снять снимок cpu_times и обновить последние значения"""
+        cur = get_backend().cpu_busy_total()
+        prev, self._prev = self._prev, cur
+        if prev is None or len(prev) != len(cur):
+            return
+        
+        percpu = tuple(self._percent(p, c) for p, c in zip(prev, cur))
+        total = self._percent(
+            (sum(p[0] for p in prev), sum(p[1] for p in prev)),
+            (sum(c[0] for c in cur), sum(c[1] for c in cur)),
+        )
+        self._latest = (total, percpu, time.monotonic())
+        self._ready.set()
+    
+    def _tick(self):
+        try:
+            self.sample()
+        except Exception:
+            pass
+        for tracker in list(self.trackers):
+            try:
+                tracker.update()
+            except Exception:
+                pass
+    
+    def _run(self):
+        self._tick()
+        delay = min(self.WARMUP, self.interval)
+        while not self._stop.wait(delay):
+            self._tick()
+            delay = self.interval
+    
+    def start(self):
+        """Запуск фонового потока (повторный вызов ничего не делает)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        """Остановка фонового потока"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def latest(self, timeout=None):
+        """Последний замер: (общая загрузка, загрузка по ядрам, время замера)
+        
+        Блокирует только до появления первого замера после старта.
+        """
+        if self._latest is None:
+            if self._thread is None:
+                self.start()
+            self._ready.wait(self.interval + self.WARMUP if timeout is None else timeout)
+        return self._latest or (0.0, (), time.monotonic())
+    
+    def total(self):
+        """Общая загрузка CPU в процентах"""
+        return self.latest()[0]
+    
+    def percpu(self):
+        """Загрузка по ядрам в процентах"""
+        return list(self.latest()[1])
+
+
+_cpu_sampler = None
+_cpu_sampler_lock = threading.Lock()
+
+
+def get_cpu_sampler(interval=None):
+    """Общий фоновый сэмплер CPU (запускается при первом обращении)"""
+    global _cpu_sampler
+    with _cpu_sampler_lock:
+        if _cpu_sampler is None:
+            _cpu_sampler = CpuSampler(interval or 1.0)
+        elif interval:
+            _cpu_sampler.interval = interval
+        return _cpu_sampler.start()
+
+
+class ProcessEntry:
+    """Запись в таблице процессов (живет между обновлениями)"""
+    __slots__ = ('proc', 'pid', 'create_time', 'name', 'username', 'ppid', 'status', 'cpu_time',
+                 'cpu_percent', 'rss', 'memory_percent', '_cmdline', '_cgroup')
+    
+    def __init__(self, proc):
+        self.proc = proc
+        self.pid = proc.pid
+        self.create_time = proc.create_time()
+        self.name = proc.name()
+        try:
+            self.username = proc.username()
+        except (psutil.AccessDenied, KeyError):
+            self.username = '?'
+        self.ppid = None
+        self.status = None
+        self.cpu_time = None
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.memory_percent = 0.0
+        self._cmdline = None
+        self._cgroup = None
+    
+    @property
+    def key(self):
+        """Уникальный ключ процесса: PID может быть переиспользован"""
+        return (self.pid, self.create_time)
+    
+    def cmdline(self):
+        """Командная строка (читается один раз за жизнь процесса)"""
+        if self._cmdline is None:
+            try:
+                self._cmdline = ' '.join(self.proc.cmdline())
+            except psutil.Error:
+                self._cmdline = ''
+        return self._cmdline
+    
+    def cgroup(self):
+        """Путь cgroup на Linux (читается один раз за жизнь процесса)"""
+        if self._cgroup is None:
+            cgroup = ''
+            try:
+                with open(f'/proc/{self.pid}/cgroup') as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                lines = []
+            # "0::/path" для cgroup v2, иначе берем первую иерархию v1
+            for line in lines:
+                parts = line.split(':', 2)
+                if len(parts) < 3:
+                    continue
+                if parts[0] == '0' and not parts[1]:
+                    cgroup = parts[2]
+                    break
+                cgroup = cgroup or parts[2]
+            self._cgroup = cgroup
+        return self._cgroup
+
+
+class ProcessQuery:
+    """Фильтр процессов, разобранный один раз
+    
+    Имя и пользователь ищутся по индексам таблицы; результат проверок
+    неизменных полей (командная строка, cgroup) запоминается по ключу
+    процесса, так что повторный запрос проверяет только новые процессы.
+    Каждое обновление перепроверяется только состояние.
+    """
+    
+    def __init__(self, name=None, user=None, cmdline=None, cgroup=None, status=None):
+        import re
+        self.name = name or None
+        self.user = user or None
+        self.cmdline = re.compile(cmdline) if cmdline else None
+        self.cgroup = cgroup or None
+        if isinstance(status, str):
+            status = [status]
+        self.status = frozenset(status) if status else None
+        self._static = {}
+    
+    def __repr__(self):
+        parts = []
+        if self.name:
+            parts.append(f"имя={self.name}")
+        if self.user:
+            parts.append(f"пользователь={self.user}")
+        if self.cmdline:
+            parts.append(f"cmdline~/{self.cmdline.pattern}/")
+        if self.cgroup:
+            parts.append(f"cgroup~{self.cgroup}")
+        if self.status:
+            parts.append(f"состояние={','.join(sorted(self.status))}")
+        return ' '.join(parts) or 'все процессы'
+    
+    def _static_match(self, entry):
+        key = entry.key
+        match = self._static.get(key)
+        if match is None:
+            match = ((self.cmdline is None or self.cmdline.search(entry.cmdline()) is not None)
+                     and (self.cgroup is None or self.cgroup in entry.cgroup()))
+            self._static[key] = match
+        return match
+    
+    def run(self, table):
+        """Подходящие записи таблицы"""
+        candidates = table.lookup(self.name, self.user)
+        result = [entry for entry in candidates
+                  if (self.status is None or entry.status in self.status) and self._static_match(entry)]
+        if len(self._static) > 2 * len(table) + 1024:
+            # Забываем завершившиеся процессы
+            alive = {entry.key for entry in table.entries()}
+            self._static = {key: match for key, match in self._static.items() if key in alive}
+        return result
+
+
+class ProcessTable:
+    """Кэшируемая таблица процессов с расчетом CPU% по разнице замеров
+    
+    Объекты psutil.Process создаются один раз на процесс и живут между
+    обновлениями; CPU% считается по приросту cpu_times за реальное время
+    между обновлениями, топ выбирается кучей без полной сортировки.
+    PID может достаться другому процессу только после переполнения
+    счетчика PID: тогда (по последнему выданному PID из /proc/loadavg,
+    без /proc - каждые SWEEP_EVERY обновлений) записи сверяются через
+    is_running().
+    """
+    
+    SWEEP_EVERY = 10
+    
+    def __init__(self, min_interval=0.5, procfs='/proc'):
+        # Более частые обновления не сдвигают базу для CPU% (шум тиков)
+        self.min_interval = min_interval
+        self._entries = {}
+        # Вторичные индексы: {имя: {pid: запись}}, {пользователь: {pid: запись}}
+        self._by_name = {}
+        self._by_user = {}
+        self._lock = threading.Lock()
+        self._last_refresh = None
+        self._refreshes = 0
+        self._loadavg = f'{procfs}/loadavg'
+        self._last_pid = None
+        self._total_memory = psutil.virtual_memory().total
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    @property
+    def refreshes(self):
+        """Количество выполненных обновлений"""
+        return self._refreshes
+    
+    def _new_entry(self, pid):
+        entry = ProcessEntry(psutil.Process(pid))
+        self._drop_entry(pid)
+        self._entries[pid] = entry
+        self._by_name.setdefault(entry.name, {})[pid] = entry
+        self._by_user.setdefault(entry.username, {})[pid] = entry
+        return entry
+    
+    def _read_last_pid(self):
+        """Последний выданный ядром PID (None без /proc)"""
+        try:
+            with open(self._loadavg, 'rb') as f:
+                return int(f.read().split()[-1])
+        except (OSError, ValueError, IndexError):
+            return None
+    
+    def _reuse_possible(self):
+        """Мог ли какой-то PID с прошлого обновления достаться другому процессу"""
+        last_pid = self._read_last_pid()
+        previous, self._last_pid = self._last_pid, last_pid
+        if last_pid is None:
+            return self._refreshes % self.SWEEP_EVERY == 0
+        return previous is not None and last_pid < previous
+    
+    def _rename(self, entry, name):
+        """Смена имени после exec: запись переносится в индексе имен"""
+        bucket = self._by_name.get(entry.name)
+        if bucket is not None:
+            bucket.pop(entry.pid, None)
+            if not bucket:
+                del self._by_name[entry.name]
+        entry.name = name
+        self._by_name.setdefault(name, {})[entry.pid] = entry
+    
+    def _drop_entry(self, pid):
+        entry = self._entries.pop(pid, None)
+        if entry is None:
+            return
+        for index, key in ((self._by_name, entry.name), (self._by_user, entry.username)):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(pid, None)
+                if not bucket:
+                    del index[key]
+    
+    def refresh(self):
+        """Обновление таблицы: новые процессы добавляются, завершенные удаляются"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_refresh if self._last_refresh is not None else 0.0
+            update_cpu = self._last_refresh is None or elapsed >= self.min_interval
+            if update_cpu:
+                self._last_refresh = now
+            
+            pids = psutil.pids()
+            sweep = self._reuse_possible()
+            entries = self._entries
+            for pid in set(entries).difference(pids):
+                self._drop_entry(pid)
+            
+            for pid in pids:
+                try:
+                    entry = entries.get(pid)
+                    if entry is None:
+                        entry = self._new_entry(pid)
+                    elif sweep and not entry.proc.is_running():
+                        # is_running() сверяет create_time: PID занят уже другим процессом
+                        entry = self._new_entry(pid)
+                    with entry.proc.oneshot():
+                        # Имя - из того же чтения stat: после exec оно меняется при том же PID
+                        name = entry.proc.name()
+                        times = entry.proc.cpu_times()
+                        rss = entry.proc.memory_info().rss
+                        ppid = entry.proc.ppid()
+                        status = entry.proc.status()
+                    cpu_time = times.user + times.system
+                    
+                    previous = entry.cpu_time
+                    if previous is not None and cpu_time < previous:
+                        # Время CPU уменьшилось - PID занят уже другим процессом (запасная проверка)
+                        entry = self._new_entry(pid)
+                        previous = None
+                    
+                    if name != entry.name:
+                        self._rename(entry, name)
+                    entry.ppid = ppid
+                    entry.status = status
+                    entry.rss = rss
+                    entry.memory_percent = rss / self._total_memory * 100
+                    if previous is None:
+                        entry.cpu_time = cpu_time
+                    elif update_cpu:
+                        entry.cpu_time = cpu_time
+                        entry.cpu_percent = (cpu_time - previous) / elapsed * 100
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    self._drop_entry(pid)
+                except psutil.AccessDenied:
+                    pass
+            
+            self._refreshes += 1
+    
+    def entries(self):
+        """Все записи таблицы"""
+        return list(self._entries.values())
+    
+    def top(self, limit=10, key='cpu_percent'):
+        """Топ N процессов по полю key (куча, без полной сортировки)"""
+        return heapq.nlargest(limit, self.entries(), key=lambda e: getattr(e, key))
+    
+    def lookup(self, name=None, user=None):
+        """Записи с данными именем и/или пользователем (по индексам)"""
+        if name is None and user is None:
+            return self.entries()
+        with self._lock:
+            buckets = []
+            if name is not None:
+                buckets.append(self._by_name.get(name, {}))
+            if user is not None:
+                buckets.append(self._by_user.get(user, {}))
+            smallest = min(buckets, key=len)
+            return [entry for pid, entry in smallest.items() if all(pid in b for b in buckets)]
+    
+    def query(self, query, limit=None, key='cpu_percent'):
+        """Записи, подходящие под ProcessQuery (топ N по key, если задан limit)"""
+        result = query.run(self)
+        if limit is not None:
+            return heapq.nlargest(limit, result, key=lambda e: getattr(e, key))
+        return result
+
+
+_process_table = None
+_process_table_lock = threading.Lock()
+
+
+def get_process_table():
+    """Общая таблица процессов (создается при первом обращении)"""
+    global _process_table
+    with _process_table_lock:
+        if _process_table is None:
+            _process_table = ProcessTable()
+        return _process_table
+
+
+class TreeNode:
+    """Узел дерева процессов: собственные значения и суммы по поддереву"""
+    __slots__ = ('pid', 'create_time', 'name', 'ppid', 'parent', 'children',
+                 'cpu_percent', 'rss', 'subtree_cpu', 'subtree_rss', 'subtree_count')
+    
+    def __init__(self, entry):
+        self.pid = entry.pid
+        self.create_time = entry.create_time
+        self.name = entry.name
+        self.ppid = entry.ppid
+        self.parent = None
+        self.children = set()
+        self.cpu_percent = entry.cpu_percent
+        self.rss = entry.rss
+        self.subtree_cpu = entry.cpu_percent
+        self.subtree_rss = entry.rss
+        self.subtree_count = 1
+
+
+class ProcessTree:
+    """Дерево процессов с суммами CPU% и RSS по поддеревьям
+    
+    Строится из записей ProcessTable и обновляется инкрементально: при
+    изменении процесса разница поднимается только по цепочке его предков,
+    появление, завершение и смена родителя переносят поддерево целиком.
+    Процесс, чей родитель еще не известен, ждет его в _waiting.
+    """
+    
+    # Раз в столько обновлений суммы пересчитываются заново (накопление ошибок float)
+    RESYNC_EVERY = 100
+    
+    def __init__(self):
+        self.nodes = {}
+        self._waiting = {}
+        self._lock = threading.Lock()
+        self.updates = 0
+    
+    def __len__(self):
+        return len(self.nodes)
+    
+    @staticmethod
+    def _add_up(node, cpu, rss, count):
+        while node is not None:
+            node.subtree_cpu += cpu
+            node.subtree_rss += rss
+            node.subtree_count += count
+            node = node.parent
+    
+    @staticmethod
+    def _can_adopt(parent, child):
+        # Родитель не может быть моложе ребенка: иначе это переиспользованный PID
+        return parent.pid != child.pid and parent.create_time <= child.create_time
+    
+    def _attach(self, node):
+        parent = self.nodes.get(node.ppid)
+        if parent is not None and self._can_adopt(parent, node):
+            node.parent = parent
+            parent.children.add(node)
+            self._add_up(parent, node.subtree_cpu, node.subtree_rss, node.subtree_count)
+        else:
+            node.parent = None
+            if node.ppid is not None and node.ppid != node.pid:
+                self._waiting.setdefault(node.ppid, set()).add(node)
+    
+    def _detach(self, node):
+        parent = node.parent
+        if parent is not None:
+            parent.children.discard(node)
+            self._add_up(parent, -node.subtree_cpu, -node.subtree_rss, -node.subtree_count)
+            node.parent = None
+        else:
+            waiting = self._waiting.get(node.ppid)
+            if waiting is not None:
+                waiting.discard(node)
+                if not waiting:
+                    del self._waiting[node.ppid]
+    
+    def _insert(self, entry):
+        node = TreeNode(entry)
+        self.nodes[node.pid] = node
+        # Дети, пришедшие раньше родителя
+        waiting = self._waiting.pop(node.pid, ())
+        for child in waiting:
+            if self._can_adopt(node, child):
+                child.parent = node
+                node.children.add(child)
+                node.subtree_cpu += child.subtree_cpu
+                node.subtree_rss += child.subtree_rss
+                node.subtree_count += child.subtree_count
+            else:
+                self._waiting.setdefault(node.pid, set()).add(child)
+        self._attach(node)
+    
+    def _remove(self, node):
+        del self.nodes[node.pid]
+        self._detach(node)
+        # Осиротевшие дети становятся корнями до смены родителя
+        for child in node.children:
+            child.parent = None
+            self._waiting.setdefault(node.pid, set()).add(child)
+        node.children = set()
+    
+    def _resync(self, node):
+        node.subtree_cpu = node.cpu_percent
+        node.subtree_rss = node.rss
+        node.subtree_count = 1
+        for child in node.children:
+            self._resync(child)
+            node.subtree_cpu += child.subtree_cpu
+            node.subtree_rss += child.subtree_rss
+            node.subtree_count += child.subtree_count
+    
+    def update(self, entries):
+        """Применение нового состояния таблицы процессов"""
+        with self._lock:
+            current = {entry.pid: entry for entry in entries}
+            nodes = self.nodes
+            for node in [n for pid, n in nodes.items()
+                         if pid not in current or current[pid].create_time != n.create_time]:
+                self._remove(node)
+            
+            for pid, entry in current.items():
+                node = nodes.get(pid)
+                if node is None:
+                    self._insert(entry)
+                    continue
+                node.name = entry.name
+                if entry.ppid != node.ppid:
+                    self._detach(node)
+                    node.ppid = entry.ppid
+                    self._attach(node)
+                cpu = entry.cpu_percent - node.cpu_percent
+                rss = entry.rss - node.rss
+                if cpu or rss:
+                    node.cpu_percent = entry.cpu_percent
+                    node.rss = entry.rss
+                    self._add_up(node, cpu, rss, 0)
+            
+            self.updates += 1
+            if self.updates % self.RESYNC_EVERY == 0:
+                for node in self.roots():
+                    self._resync(node)
+    
+    def roots(self):
+        """Процессы без известного родителя"""
+        return [node for node in self.nodes.values() if node.parent is None]
+    
+    def rows(self, max_depth=None, min_cpu=0.0, min_rss=0, limit=None):
+        """Строки дерева в порядке обхода (дети по убыванию CPU% поддерева)
+        
+        Поддеревья глубже max_depth и ниже обоих порогов сворачиваются,
+        в строке родителя остается число скрытых процессов.
+        """
+        with self._lock:
+            result = []
+            order = lambda node: (-node.subtree_cpu, -node.subtree_rss, node.pid)
+            visible = lambda node: node.subtree_cpu >= min_cpu or node.subtree_rss >= min_rss
+            stack = [(node, 0) for node in sorted(self.roots(), key=order, reverse=True)]
+            while stack:
+                node, depth = stack.pop()
+                if limit is not None and len(result) >= limit:
+                    break
+                shown = []
+                if max_depth is None or depth < max_depth:
+                    shown = [child for child in node.children if visible(child)]
+                hidden = node.subtree_count - 1 - sum(child.subtree_count for child in shown)
+                result.append(TreeRow(
+                    depth, node.pid, node.name, node.cpu_percent, node.rss,
+                    max(node.subtree_cpu, 0.0), max(node.subtree_rss, 0), node.subtree_count, hidden,
+                ))
+                stack.extend((child, depth + 1) for child in sorted(shown, key=order, reverse=True))
+            return result
+
+
+_process_tree = None
+
+
+def get_process_tree():
+    """Общее дерево процессов поверх общей таблицы процессов"""
+    global _process_tree
+    with _process_table_lock:
+        if _process_tree is None:
+            _process_tree = ProcessTree()
+        return _process_tree
+
+
+class ProcessLifecycle:
+    """События запуска и завершения процессов по разнице наборов PID
+    
+    За опрос читается только список PID (на Linux - имена каталогов /proc)
+    и берется разность множеств; подробности (родитель, командная строка)
+    читаются лишь для новых процессов, так что работа на Python растет с
+    числом изменений, а не процессов. Процесс идентифицируется парой
+    (pid, create_time): повторное использование PID между опросами возможно
+    только после переполнения счетчика PID, и тогда (по последнему
+    выданному PID из /proc/loadavg) все общие PID сверяются по create_time.
+    Без /proc такая сверка идет каждые SWEEP_EVERY опросов.
+    """
+    
+    SWEEP_EVERY = 10
+    
+    def __init__(self, procfs='/proc', window=60.0, max_events=1000):
+        from collections import deque
+        self.procfs = procfs
+        self.window = window
+        self.use_procfs = os.path.isfile(f'{procfs}/loadavg') and os.path.isfile(f'{procfs}/stat')
+        self.events = deque(maxlen=max_events)
+        self.polls = 0
+        # {pid: ProcessEvent запуска} - живые процессы
+        self._live = {}
+        self._last_pid = None
+        self._forks = None
+        self._fork_rate = None
+        self._poll_time = None
+        # {имя: deque(время запуска)} - для частоты запусков за окно
+        self._execs = {}
+        self.exec_totals = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._live)
+    
+    def _pids(self):
+        if self.use_procfs:
+            return {int(name) for name in os.listdir(self.procfs) if name.isdigit()}
+        return set(psutil.pids())
+    
+    def _kernel_counters(self):
+        """(последний выданный PID, число fork с загрузки) или (None, None)"""
+        if not self.use_procfs:
+            return None, None
+        try:
+            with open(f'{self.procfs}/loadavg', 'rb') as f:
+                last_pid = int(f.read().split()[-1])
+            forks = None
+            with open(f'{self.procfs}/stat', 'rb') as f:
+                for line in f:
+                    if line.startswith(b'processes '):
+                        forks = int(line.split()[1])
+                        break
+            return last_pid, forks
+        except (OSError, ValueError, IndexError):
+            return None, None
+    
+    @staticmethod
+    def _describe(pid, now):
+        """Событие запуска для живого процесса (None, если он уже завершился)"""
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                create_time = proc.create_time()
+                name = proc.name()
+                ppid = proc.ppid()
+            try:
+                cmdline = ' '.join(proc.cmdline())
+            except psutil.AccessDenied:
+                cmdline = ''
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+        except psutil.AccessDenied:
+            return ProcessEvent('spawn', pid, None, '?', '', None, now, None)
+        return ProcessEvent('spawn', pid, ppid, name, cmdline, create_time, now, None)
+    
+    def _exit(self, started, now):
+        runtime = now - started.create_time if started.create_time is not None else None
+        return ProcessEvent('exit', started.pid, started.ppid, started.name, started.cmdline,
+                            started.create_time, now, runtime)
+    
+    def _count_exec(self, name, now):
+        times = self._execs.get(name)
+        if times is None:
+            from collections import deque
+            times = self._execs[name] = deque()
+        times.append(now)
+        self.exec_totals[name] = self.exec_totals.get(name, 0) + 1
+    
+    def poll(self):
+        """Опрос: список новых событий (первый опрос только запоминает процессы)"""
+        with self._lock:
+            now = time.time()
+            current = self._pids()
+            last_pid, forks = self._kernel_counters()
+            live = self._live
+            events = []
+            
+            if self.polls == 0:
+                for pid in current:
+                    started = self._describe(pid, now)
+                    if started is not None:
+                        live[pid] = started
+            else:
+                reuse_possible = (self._last_pid is None or last_pid is None or last_pid < self._last_pid
+                                  if self.use_procfs else self.polls % self.SWEEP_EVERY == 0)
+                spawned = current.difference(live)
+                exited = set(live).difference(current)
+                if reuse_possible:
+                    # Счетчик PID мог переполниться - сверяем общие PID по create_time
+                    for pid in current.intersection(live):
+                        try:
+                            create_time = psutil.Process(pid).create_time()
+                        except psutil.Error:
+                            continue
+                        if live[pid].create_time is not None and create_time != live[pid].create_time:
+                            exited.add(pid)
+                            spawned.add(pid)
+                
+                for pid in exited:
+                    events.append(self._exit(live.pop(pid), now))
+                for pid in spawned:
+                    started = self._describe(pid, now)
+                    if started is None:
+                        continue
+                    live[pid] = started
+                    events.append(started)
+                    self._count_exec(started.name, now)
+            
+            if forks is not None and self._forks is not None and now > self._poll_time:
+                self._fork_rate = (forks - self._forks) / (now - self._poll_time)
+            self._last_pid, self._forks, self._poll_time = last_pid, forks, now
+            self.polls += 1
+            self.events.extend(events)
+            return events
+    
+    @property
+    def fork_rate(self):
+        """Созданий процессов и потоков в секунду по счетчику ядра (None, если недоступно)"""
+        return self._fork_rate
+    
+    def exec_rates(self, limit=10):
+        """Топ имен по частоте запусков за последние window секунд: [(имя, в секунду, всего)]"""
+        with self._lock:
+            cutoff = time.time() - self.window
+            rates = []
+            for name, times in list(self._execs.items()):
+                while times and times[0] < cutoff:
+                    times.popleft()
+                if not times:
+                    del self._execs[name]
+                    continue
+                rates.append((name, len(times) / self.window, self.exec_totals[name]))
+            return heapq.nlargest(limit, rates, key=lambda item: item[1])
+
+
+class Snapshot:
+    """Базовый класс компактных снимков собранных данных"""
+    __slots__ = ()
+    
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self.__slots__):
+            raise TypeError(f"{type(self).__name__}: слишком много аргументов")
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+        for name in self.__slots__[len(args):]:
+            setattr(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__}: неизвестные поля {', '.join(kwargs)}")
+    
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+    
+    def as_dict(self):
+        """Преобразование в словарь (вложенные снимки тоже)"""
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, Snapshot):
+                value = value.as_dict()
+            elif isinstance(value, (list, tuple)):
+                value = [v.as_dict() if isinstance(v, Snapshot) else v for v in value]
+            result[name] = value
+        return result
+
+
+class SystemSnapshot(Snapshot):
+    """Снимок информации о системе"""
+    __slots__ = ('system', 'node', 'release', 'machine', 'processor', 'boot_time', 'uptime')
+
+
+class CpuSnapshot(Snapshot):
+    """Снимок состояния CPU"""
+    __slots__ = ('physical_cores', 'logical_cores', 'freq_current', 'freq_min', 'freq_max',
+                 'total_percent', 'percpu')
+
+
+class MemorySnapshot(Snapshot):
+    """Снимок оперативной памяти и SWAP"""
+    __slots__ = ('total', 'available', 'used', 'percent', 'swap_total', 'swap_used', 'swap_percent')
+
+
+class PartitionSnapshot(Snapshot):
+    """Снимок раздела диска (total/used/free/percent = None, если нет доступа)"""
+    __slots__ = ('device', 'mountpoint', 'fstype', 'total', 'used', 'free', 'percent')
+
+
+class DiskRate(Snapshot):
+    """Скорости I/O устройства: байт/с, операций/с, средняя задержка (мс), занятость (%)"""
+    __slots__ = ('device', 'read_bps', 'write_bps', 'read_iops', 'write_iops', 'latency_ms', 'busy_percent')
+
+
+class DiskSnapshot(Snapshot):
+    """Снимок разделов, суммарного I/O и скоростей по устройствам"""
+    __slots__ = ('partitions', 'read_bytes', 'write_bytes', 'rates')
+
+
+class AddressSnapshot(Snapshot):
+    """Адрес сетевого интерфейса (family: 'ipv4' или 'mac')"""
+    __slots__ = ('family', 'address', 'netmask', 'broadcast')
+
+
+class InterfaceSnapshot(Snapshot):
+    """Снимок сетевого интерфейса"""
+    __slots__ = ('name', 'addresses')
+
+
+class NetRate(Snapshot):
+    """Скорости интерфейса: бит/с, пакетов/с, ошибок и отбрасываний в секунду,
+    скорость линка (Мбит/с, 0 - неизвестна) и загрузка линка (%, None - неизвестна)"""
+    __slots__ = ('interface', 'rx_bps', 'tx_bps', 'rx_pps', 'tx_pps', 'errors_ps', 'drops_ps',
+                 'speed_mbps', 'utilisation', 'is_up')
+
+
+class NetworkSnapshot(Snapshot):
+    """Снимок сетевых интерфейсов, суммарного трафика и скоростей по интерфейсам"""
+    __slots__ = ('interfaces', 'bytes_sent', 'bytes_recv', 'rates')
+
+
+class ConnectionOwner(Snapshot):
+    """Процесс-владелец сокетов: всего и по состояниям {состояние: количество}"""
+    __slots__ = ('pid', 'name', 'total', 'states')
+
+
+class ConnectionsSnapshot(Snapshot):
+    """Сводка сокетов: по состояниям, топ владельцев, сокеты без владельца"""
+    __slots__ = ('total', 'states', 'owners', 'unowned', 'processes', 'source', 'elapsed')
+
+
+class ProcessSnapshot(Snapshot):
+    """Снимок процесса"""
+    __slots__ = ('pid', 'name', 'cpu_percent', 'memory_percent', 'rss')
+
+
+class ProcessMatch(Snapshot):
+    """Процесс, найденный поиском"""
+    __slots__ = ('pid', 'name', 'username', 'status', 'cpu_percent', 'memory_percent', 'cmdline')
+
+
+class ProcessSearchSnapshot(Snapshot):
+    """Результат поиска процессов: запрос, всего процессов, найдено, топ найденных"""
+    __slots__ = ('query', 'total', 'matches', 'processes')
+
+
+class ProcessEvent(Snapshot):
+    """Запуск ('spawn') или завершение ('exit') процесса; runtime - только для exit"""
+    __slots__ = ('kind', 'pid', 'ppid', 'name', 'cmdline', 'create_time', 'timestamp', 'runtime')
+
+
+class AlertEvent(Snapshot):
+    """Срабатывание ('firing') или снятие ('resolved') оповещения"""
+    __slots__ = ('rule', 'metric', 'instance', 'value', 'state', 'timestamp')
+
+
+class KillResult(Snapshot):
+    """Итог для одного процесса: terminated, killed, survived, gone или denied"""
+    __slots__ = ('pid', 'name', 'outcome', 'returncode')
+
+
+class KillReport(Snapshot):
+    """Итог массового завершения процессов"""
+    __slots__ = ('results', 'elapsed')
+
+
+class TreeRow(Snapshot):
+    """Строка дерева процессов: глубина, свои значения, суммы поддерева, скрыто потомков"""
+    __slots__ = ('depth', 'pid', 'name', 'cpu_percent', 'rss',
+                 'subtree_cpu', 'subtree_rss', 'subtree_count', 'hidden')
+
+
+class ProcessTreeSnapshot(Snapshot):
+    """Снимок дерева процессов"""
+    __slots__ = ('count', 'rows')
+
+
+class ProcessesSnapshot(Snapshot):
+    """Топ процессов и общее их количество"""
+    __slots__ = ('count', 'processes')
+
+
+class BatterySnapshot(Snapshot):
+    """Снимок батареи (secsleft = None, если время не ограничено или неизвестно)"""
+    __slots__ = ('percent', 'power_plugged', 'secsleft')
+
+
+class DirectoryCleanup(Snapshot):
+    """Итог очистки одного каталога (или файла) верхнего уровня"""
+    __slots__ = ('path', 'files', 'dirs', 'freed', 'skipped')
+
+
+class CleanupReport(Snapshot):
+    """Итог очистки временных файлов"""
+    __slots__ = ('dry_run', 'files', 'dirs', 'freed', 'skipped', 'directories')
+
+
+class PathUsage(Snapshot):
+    """Размер файла или каталога"""
+    __slots__ = ('path', 'size')
+
+
+class DiskUsageReport(Snapshot):
+    """Итог анализа занятого места"""
+    __slots__ = ('root', 'total', 'files', 'dirs', 'errors', 'top_dirs', 'top_files', 'elapsed')
+
+
+class Collector:
+    """Сбор данных о системе без вывода на экран"""
+    
+    @staticmethod
+    def system():
+        """Информация о системе"""
+        import platform
+        uname = platform.uname()
+        boot_time = psutil.boot_time()
+        return SystemSnapshot(
+            uname.system, uname.node, uname.release, uname.machine,
+            uname.processor or platform.processor(),
+            boot_time, time.time() - boot_time,
+        )
+    
+    @staticmethod
+    def cpu():
+        """Информация о CPU (загрузка из фонового сэмплера)"""
+        cpufreq = psutil.cpu_freq()
+        total, percpu, _ = get_cpu_sampler().latest()
+        return CpuSnapshot(
+            psutil.cpu_count(logical=False),
+            psutil.cpu_count(logical=True),
+            cpufreq.current if cpufreq else None,
+            cpufreq.min if cpufreq else None,
+            cpufreq.max if cpufreq else None,
+            total, list(percpu),
+        )
+    
+    @staticmethod
+    def memory():
+        """Информация о RAM и SWAP"""
+        return get_backend().memory()
+    
+    @staticmethod
+    def partitions():
+        """Разделы с занятым местом (без статистики I/O)"""
+        partitions = []
+        for partition in psutil.disk_partitions():
+            snapshot = PartitionSnapshot(partition.device, partition.mountpoint, partition.fstype)
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+                snapshot.total = usage.total
+                snapshot.used = usage.used
+                snapshot.free = usage.free
+                snapshot.percent = usage.percent
+            except PermissionError:
+                pass
+            partitions.append(snapshot)
+        return partitions
+    
+    @staticmethod
+    def disks():
+        """Информация о разделах и I/O дисков"""
+        partitions = Collector.partitions()
+        disk_io = get_backend().disk_io_total()
+        rates = get_disk_tracker().latest(timeout=get_cpu_sampler().interval + CpuSampler.WARMUP)
+        return DiskSnapshot(partitions, disk_io.read_bytes, disk_io.write_bytes, rates)
+    
+    @staticmethod
+    def network():
+        """Информация о сетевых интерфейсах и трафике"""
+        import socket
+        interfaces = []
+        for interface_name, interface_addresses in psutil.net_if_addrs().items():
+            addresses = []
+            for address in interface_addresses:
+                if address.family == socket.AF_INET:
+                    addresses.append(AddressSnapshot('ipv4', address.address, address.netmask, address.broadcast))
+                elif address.family == psutil.AF_LINK:
+                    addresses.append(AddressSnapshot('mac', address.address))
+            interfaces.append(InterfaceSnapshot(interface_name, addresses))
+        
+        net_io = get_backend().net_io_total()
+        rates = get_net_tracker().latest(timeout=get_cpu_sampler().interval + CpuSampler.WARMUP)
+        return NetworkSnapshot(interfaces, net_io.bytes_sent, net_io.bytes_recv, rates)
+    
+    @staticmethod
+    def connections(limit=10):
+        """Сокеты по процессам и состояниям TCP"""
+        return get_connection_table().refresh(limit)
+    
+    @staticmethod
+    def _process_table():
+        """Обновленная общая таблица процессов"""
+        table = get_process_table()
+        table.refresh()
+        if table.refreshes == 1:
+            # Первое обновление: для расчета CPU% нужен второй замер
+            time.sleep(table.min_interval)
+            table.refresh()
+        return table
+    
+    @staticmethod
+    def processes(limit=10):
+        """Топ процессов по CPU из кэшируемой таблицы процессов"""
+        table = Collector._process_table()
+        processes = [
+            ProcessSnapshot(e.pid, e.name, e.cpu_percent, e.memory_percent, e.rss)
+            for e in table.top(limit)
+        ]
+        return ProcessesSnapshot(len(table), processes)
+    
+    @staticmethod
+    def find_processes(query, limit=20):
+        """Процессы, подходящие под ProcessQuery (топ по CPU)"""
+        table = Collector._process_table()
+        matches = query.run(table)
+        processes = [
+            ProcessMatch(e.pid, e.name, e.username, e.status, e.cpu_percent, e.memory_percent, e.cmdline())
+            for e in heapq.nlargest(limit, matches, key=lambda e: e.cpu_percent)
+        ]
+        return ProcessSearchSnapshot(repr(query), len(table), len(matches), processes)
+    
+    @staticmethod
+    def process_tree(max_depth=None, min_cpu=0.0, min_rss=0, limit=None):
+        """Дерево процессов с суммами по поддеревьям"""
+        table = Collector._process_table()
+        tree = get_process_tree()
+        tree.update(table.entries())
+        return ProcessTreeSnapshot(len(tree), tree.rows(max_depth, min_cpu, min_rss, limit))
+    
+    @staticmethod
+    def battery():
+        """Информация о батарее (None, если батареи нет)"""
+        if not hasattr(psutil, "sensors_battery"):
+            return None
+        
+        battery = psutil.sensors_battery()
+        if battery is None:
+            return None
+        
+        secsleft = battery.secsleft
+        if secsleft in (psutil.POWER_TIME_UNLIMITED, psutil.POWER_TIME_UNKNOWN):
+            secsleft = None
+        return BatterySnapshot(battery.percent, battery.power_plugged, secsleft)
+
+
+DiskIO = namedtuple('DiskIO', 'read_count write_count read_bytes write_bytes read_time write_time busy_time')
+NetIO = namedtuple('NetIO', 'bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout')
+
+
+class PsutilBackend:
+    """Источник горячих метрик через psutil (работает на всех платформах)"""
+    name = 'psutil'
+    
+    @staticmethod
+    def _busy_total(times):
+        """Занятое и общее время CPU (как в psutil.cpu_percent)"""
+        total = sum(times)
+        # На Linux guest-время уже входит в user/nice
+        total -= getattr(times, 'guest', 0) + getattr(times, 'guest_nice', 0)
+        busy = total - times.idle - getattr(times, 'iowait', 0)
+        return busy, total
+    
+    def cpu_busy_total(self):
+        """Список (занятое, общее) время по каждому ядру"""
+        return [self._busy_total(t) for t in psutil.cpu_times(percpu=True)]
+    
+    def memory(self):
+        """Снимок RAM и SWAP"""
+        svmem = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        return MemorySnapshot(
+            svmem.total, svmem.available, svmem.used, svmem.percent,
+            swap.total, swap.used, swap.percent,
+        )
+    
+    def disk_io(self):
+        """Счетчики I/O по устройствам: {имя: DiskIO}"""
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        return {
+            name: DiskIO(c.read_count, c.write_count, c.read_bytes, c.write_bytes,
+                         c.read_time, c.write_time, getattr(c, 'busy_time', 0))
+            for name, c in counters.items()
+        }
+    
+    def disk_io_total(self):
+        """Суммарные счетчики I/O дисков"""
+        c = psutil.disk_io_counters()
+        if c is None:
+            return DiskIO(0, 0, 0, 0, 0, 0, 0)
+        return DiskIO(c.read_count, c.write_count, c.read_bytes, c.write_bytes,
+                      c.read_time, c.write_time, getattr(c, 'busy_time', 0))
+    
+    def net_io(self):
+        """Счетчики трафика по интерфейсам: {имя: NetIO}"""
+        return {name: NetIO(*c) for name, c in psutil.net_io_counters(pernic=True).items()}
+    
+    def net_io_total(self):
+        """Суммарные счетчики трафика"""
+        c = psutil.net_io_counters()
+        return NetIO(*c) if c is not None else NetIO(0, 0, 0, 0, 0, 0, 0, 0)
+
+
+class ProcFile:
+    """Открытый файл /proc, перечитываемый через pread в один и тот же буфер"""
+    
+    def __init__(self, path, size=16384):
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        self._buf = bytearray(size)
+        self._lock = threading.Lock()
+    
+    def read(self):
+        """Текущее содержимое файла"""
+        with self._lock:
+            # seq_file отдает не больше страницы за вызов, поэтому короткое
+            # чтение - еще не конец файла: читаем до нулевого результата
+            total = 0
+            while True:
+                if total == len(self._buf):
+                    # Буфер заполнен - увеличиваем его, прочитанное сохраняется
+                    self._buf.extend(bytes(len(self._buf)))
+                with memoryview(self._buf) as view:
+                    n = os.preadv(self._fd, [view[total:]], total)
+                    if n == 0:
+                        return bytes(view[:total])
+                total += n
+    
+    def close(self):
+        os.close(self._fd)
+
+
+class ProcBackend(PsutilBackend):
+    """Быстрый источник горячих метрик на Linux: прямое чтение /proc
+    
+    Файлы /proc/stat, /proc/meminfo, /proc/diskstats и /proc/net/dev
+    открываются один раз и разбираются только по нужным полям; всё
+    остальное (и другие платформы) остается за psutil.
+    """
+    name = 'proc'
+    
+    SECTOR_SIZE = 512
+    MEMINFO_FIELDS = (b'MemTotal', b'MemFree', b'MemAvailable', b'SwapTotal', b'SwapFree')
+    
+    def __init__(self, procfs='/proc'):
+        self._stat = ProcFile(f'{procfs}/stat')
+        self._meminfo = ProcFile(f'{procfs}/meminfo')
+        self._diskstats = ProcFile(f'{procfs}/diskstats')
+        self._netdev = ProcFile(f'{procfs}/net/dev')
+        # Целые устройства (не разделы) - для суммарной статистики, как в psutil
+        try:
+            self._block_devices = {name.replace('!', '/') for name in os.listdir('/sys/block')}
+        except OSError:
+            self._block_devices = None
+    
+    def cpu_busy_total(self):
+        result = []
+        lines = self._stat.read().split(b'\n')
+        # Первая строка - суммарная "cpu", дальше cpu0, cpu1, ...
+        for line in lines[1:]:
+            if not line.startswith(b'cpu'):
+                break
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal (guest уже в user/nice)
+            user, nice, system, idle, iowait, irq, softirq, steal = map(int, fields[1:9])
+            total = user + nice + system + idle + iowait + irq + softirq + steal
+            result.append((total - idle - iowait, total))
+        return result
+    
+    def memory(self):
+        values = {}
+        wanted = self.MEMINFO_FIELDS
+        for line in self._meminfo.read().split(b'\n'):
+            key, _, rest = line.partition(b':')
+            if key in wanted:
+                values[key] = int(rest.split()[0]) * 1024
+                if len(values) == len(wanted):
+                    break
+        
+        total = values.get(b'MemTotal', 0)
+        available = values.get(b'MemAvailable', values.get(b'MemFree', 0))
+        if available > total:
+            available = values.get(b'MemFree', 0)
+        used = total - available
+        percent = round(used / total * 100, 1) if total else 0.0
+        
+        swap_total = values.get(b'SwapTotal', 0)
+        swap_used = swap_total - values.get(b'SwapFree', 0)
+        swap_percent = round(swap_used / swap_total * 100, 1) if swap_total else 0.0
+        return MemorySnapshot(total, available, used, percent, swap_total, swap_used, swap_percent)
+    
+    def disk_io(self):
+        result = {}
+        sector = self.SECTOR_SIZE
+        for line in self._diskstats.read().split(b'\n'):
+            fields = line.split()
+            if len(fields) < 14:
+                continue
+            # major minor name reads rmerged rsectors rtime writes wmerged wsectors wtime inflight busy
+            result[fields[2].decode()] = DiskIO(
+                int(fields[3]), int(fields[7]),
+                int(fields[5]) * sector, int(fields[9]) * sector,
+                int(fields[6]), int(fields[10]), int(fields[12]),
+            )
+        return result
+    
+    def disk_io_total(self):
+        devices = self.disk_io()
+        if self._block_devices is not None:
+            devices = {name: c for name, c in devices.items() if name in self._block_devices}
+        if not devices:
+            return DiskIO(0, 0, 0, 0, 0, 0, 0)
+        return DiskIO(*map(sum, zip(*devices.values())))
+    
+    def net_io(self):
+        result = {}
+        # Две строки заголовка, дальше "iface: rx_bytes rx_packets rx_errs rx_drop ... tx_bytes ..."
+        for line in self._netdev.read().split(b'\n')[2:]:
+            name, _, rest = line.partition(b':')
+            fields = rest.split()
+            if len(fields) < 16:
+                continue
+            result[name.strip().decode()] = NetIO(
+                int(fields[8]), int(fields[0]), int(fields[9]), int(fields[1]),
+                int(fields[2]), int(fields[10]), int(fields[3]), int(fields[11]),
+            )
+        return result
+    
+    def net_io_total(self):
+        counters = self.net_io()
+        if not counters:
+            return NetIO(0, 0, 0, 0, 0, 0, 0, 0)
+        return NetIO(*map(sum, zip(*counters.values())))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Источник горячих метрик: /proc на Linux, иначе psutil
+    
+    Переменная окружения SYSTEMINFO_BACKEND=psutil принудительно
+    включает psutil.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if (sys.platform.startswith('linux') and hasattr(os, 'preadv')
+                    and os.environ.get('SYSTEMINFO_BACKEND') != 'psutil'):
+                try:
+                    _backend = ProcBackend()
+                except OSError:
+                    _backend = PsutilBackend()
+            else:
+                _backend = PsutilBackend()
+        return _backend
+
+
+class RingBuffer:
+    """Кольцевой буфер чисел фиксированного размера (array, добавление за O(1))"""
+    __slots__ = ('_data', '_capacity', '_next', '_size')
+    
+    def __init__(self, capacity, typecode='f'):
+        self._data = array(typecode, [0]) * capacity
+        self._capacity = capacity
+        self._next = 0
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def capacity(self):
+        return self._capacity
+    
+    @property
+    def nbytes(self):
+        """Память под данные буфера в байтах"""
+        return self._data.itemsize * self._capacity
+    
+    def append(self, value):
+        """Добавление значения (самое старое вытесняется)"""
+        self._data[self._next] = value
+        self._next += 1
+        if self._next == self._capacity:
+            self._next = 0
+        if self._size < self._capacity:
+            self._size += 1
+    
+    def last(self, default=None):
+        """Последнее добавленное значение"""
+        if not self._size:
+            return default
+        return self._data[self._next - 1]
+    
+    def values(self, n=None):
+        """Последние n значений (все, если n не задано) от старых к новым"""
+        size = self._size if n is None else min(n, self._size)
+        if size <= 0:
+            return []
+        start = (self._next - size) % self._capacity
+        end = start + size
+        if end <= self._capacity:
+            return self._data[start:end].tolist()
+        return (self._data[start:] + self._data[:end - self._capacity]).tolist()
+
+
+class Rollup:
+    """Агрегаты min/avg/max метрики по интервалам фиксированной длины"""
+    __slots__ = ('period', 'times', 'mins', 'avgs', 'maxs',
+                 '_bucket', '_count', '_total', '_low', '_high')
+    
+    def __init__(self, period, capacity):
+        self.period = period
+        self.times = RingBuffer(capacity, 'd')
+        self.mins = RingBuffer(capacity)
+        self.avgs = RingBuffer(capacity)
+        self.maxs = RingBuffer(capacity)
+        self._bucket = None
+        self._count = 0
+    
+    @property
+    def nbytes(self):
+        return self.times.nbytes + self.mins.nbytes + self.avgs.nbytes + self.maxs.nbytes
+    
+    def add(self, value, timestamp):
+        """Учет значения; при смене интервала предыдущий сохраняется в буферы"""
+        bucket = int(timestamp // self.period)
+        if bucket != self._bucket:
+            self.flush()
+            self._bucket = bucket
+        if self._count:
+            self._count += 1
+            self._total += value
+            if value < self._low:
+                self._low = value
+            elif value > self._high:
+                self._high = value
+        else:
+            self._count = 1
+            self._total = self._low = self._high = value
+    
+    def flush(self):
+        """Сохранение текущего (незавершенного) интервала"""
+        if self._count:
+            self.times.append(self._bucket * self.period)
+            self.mins.append(self._low)
+            self.avgs.append(self._total / self._count)
+            self.maxs.append(self._high)
+            self._count = 0
+    
+    def window(self, since):
+        """(min, avg, max) по интервалам, начавшимся не раньше since"""
+        times = self.times.values()
+        n = len(times)
+        while n and times[n - 1] >= since - self.period:
+            n -= 1
+        count = len(times) - n
+        mins = self.mins.values(count)
+        avgs = self.avgs.values(count)
+        maxs = self.maxs.values(count)
+        if self._count:
+            mins.append(self._low)
+            avgs.append(self._total / self._count)
+            maxs.append(self._high)
+        if not avgs:
+            return None
+        return min(mins), sum(avgs) / len(avgs), max(maxs)
+
+
+class MetricHistory:
+    """История метрики: последние замеры и агрегаты за 1с/10с/60с"""
+    
+    # (длина интервала в секундах, сколько интервалов хранить): 10 мин, 1 ч, 12 ч
+    ROLLUPS = ((1, 600), (10, 360), (60, 720))
+    
+    def __init__(self, capacity=600, rollups=ROLLUPS):
+        self.samples = RingBuffer(capacity)
+        self.rollups = [Rollup(period, count) for period, count in rollups]
+    
+    def __len__(self):
+        return len(self.samples)
+    
+    @property
+    def nbytes(self):
+        """Память под историю метрики в байтах (фиксирована при создании)"""
+        return self.samples.nbytes + sum(r.nbytes for r in self.rollups)
+    
+    def append(self, value, timestamp=None):
+        """Добавление замера"""
+        if timestamp is None:
+            timestamp = time.time()
+        self.samples.append(value)
+        for rollup in self.rollups:
+            rollup.add(value, timestamp)
+    
+    def last(self, default=None):
+        return self.samples.last(default)
+    
+    def values(self, n=None):
+        """Последние n замеров от старых к новым"""
+        return self.samples.values(n)
+    
+    def window(self, seconds, now=None):
+        """(min, avg, max) за последние seconds секунд или None
+        
+        Берется самый подробный агрегат, который покрывает окно.
+        """
+        if now is None:
+            now = time.time()
+        for rollup in self.rollups:
+            if rollup.period * rollup.times.capacity >= seconds:
+                return rollup.window(now - seconds)
+        return self.rollups[-1].window(now - seconds) if self.rollups else None
+
+
+class MonitorHistory:
+    """История метрик непрерывного мониторинга с фиксированным бюджетом памяти"""
+    
+    # Для метрик отдельных ядер храним меньше: их может быть много
+    COMPACT_CAPACITY = 120
+    COMPACT_ROLLUPS = ((10, 360),)
+    
+    def __init__(self):
+        self.metrics = {}
+    
+    def __contains__(self, name):
+        return name in self.metrics
+    
+    def __getitem__(self, name):
+        return self.metrics[name]
+    
+    @property
+    def nbytes(self):
+        """Суммарная память под историю в байтах"""
+        return sum(m.nbytes for m in self.metrics.values())
+    
+    def record(self, name, value, timestamp, compact=False):
+        """Добавление замера метрики (история создается при первом замере)"""
+        metric = self.metrics.get(name)
+        if metric is None:
+            if compact:
+                metric = MetricHistory(self.COMPACT_CAPACITY, self.COMPACT_ROLLUPS)
+            else:
+                metric = MetricHistory()
+            self.metrics[name] = metric
+        metric.append(value, timestamp)
+        return metric
+
+
+# Минимальное окно между замерами счетчиков для расчета скоростей, сек
+MIN_RATE_WINDOW = 0.1
+
+
+class DiskIOTracker:
+    """Скорости I/O по устройствам из разницы счетчиков disk_io_counters
+    
+    Обновляется фоновым сэмплером, поэтому к первому показу уже есть
+    скорости и история; устройства без единой операции не показываются.
+    """
+    
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+        self.history = MonitorHistory()
+        # {устройство: DiskRate} - заменяется целиком при каждом обновлении
+        self.rates = {}
+        self._prev = None
+        self._prev_time = None
+        self._ready = threading.Event()
+    
+    def update(self):
+        """Новый замер счетчиков и пересчет скоростей"""
+        counters = self.backend.disk_io()
+        now = time.monotonic()
+        if self._prev is not None and now - self._prev_time < MIN_RATE_WINDOW:
+            # Слишком короткое окно (такт сразу после подключения) - ждем следующего
+            return
+        prev, prev_time = self._prev, self._prev_time
+        self._prev, self._prev_time = counters, now
+        if prev is None:
+            return
+        
+        elapsed = now - prev_time
+        timestamp = time.time()
+        rates = {}
+        for name, c in counters.items():
+            p = prev.get(name)
+            if p is None or not (c.read_count or c.write_count):
+                continue
+            reads = max(c.read_count - p.read_count, 0)
+            writes = max(c.write_count - p.write_count, 0)
+            io_time = max(c.read_time - p.read_time, 0) + max(c.write_time - p.write_time, 0)
+            busy = max(c.busy_time - p.busy_time, 0) / (elapsed * 1000) * 100
+            rate = DiskRate(
+                name,
+                max(c.read_bytes - p.read_bytes, 0) / elapsed,
+                max(c.write_bytes - p.write_bytes, 0) / elapsed,
+                reads / elapsed,
+                writes / elapsed,
+                io_time / (reads + writes) if reads + writes else 0.0,
+                min(busy, 100.0),
+            )
+            rates[name] = rate
+            self.history.record(f'{name}.busy', rate.busy_percent, timestamp, compact=True)
+            self.history.record(f'{name}.bytes', rate.read_bps + rate.write_bps, timestamp, compact=True)
+        self.rates = rates
+        self._ready.set()
+    
+    def latest(self, timeout=None):
+        """Последние скорости по устройствам (ждет только самый первый замер)"""
+        if not self._ready.is_set() and timeout:
+            self._ready.wait(timeout)
+        return sorted(self.rates.values(), key=lambda r: r.device)
+
+
+class NetIOTracker:
+    """Скорости сетевых интерфейсов из разницы счетчиков net_io_counters
+    
+    Переполнение счетчиков учитывается; появившиеся интерфейсы получают
+    скорости со второго замера, исчезнувшие убираются из результата.
+    """
+    
+    # Как часто (в замерах) перечитывать скорость линка и состояние интерфейсов
+    STATS_REFRESH = 10
+    
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+        self.history = MonitorHistory()
+        # {интерфейс: NetRate} - заменяется целиком при каждом обновлении
+        self.rates = {}
+        self._prev = None
+        self._prev_time = None
+        self._stats = {}
+        self._updates = 0
+        self._ready = threading.Event()
+    
+    @staticmethod
+    def _delta(cur, prev):
+        """Прирост счетчика с учетом переполнения и сброса"""
+        if cur >= prev:
+            return cur - prev
+        if prev < (1 << 32):
+            # Похоже на переполнение 32-битного счетчика
+            wrapped = cur + (1 << 32) - prev
+            if wrapped < (1 << 31):
+                return wrapped
+        # Счетчик сброшен (интерфейс пересоздан) - считаем с нуля
+        return cur
+    
+    def update(self):
+        """Новый замер счетчиков и пересчет скоростей"""
+        counters = self.backend.net_io()
+        now = time.monotonic()
+        if self._prev is not None and now - self._prev_time < MIN_RATE_WINDOW:
+            # Слишком короткое окно (такт сразу после подключения) - ждем следующего
+            return
+        prev, prev_time = self._prev, self._prev_time
+        self._prev, self._prev_time = counters, now
+        
+        if self._updates % self.STATS_REFRESH == 0 or set(counters) != set(self._stats):
+            try:
+                self._stats = psutil.net_if_stats()
+            except Exception:
+                self._stats = {}
+        self._updates += 1
+        if prev is None:
+            return
+        
+        elapsed = now - prev_time
+        timestamp = time.time()
+        delta = self._delta
+        rates = {}
+        for name, c in counters.items():
+            p = prev.get(name)
+            if p is None:
+                continue
+            stats = self._stats.get(name)
+            speed = stats.speed if stats is not None else 0
+            rx_bps = delta(c.bytes_recv, p.bytes_recv) * 8 / elapsed
+            tx_bps = delta(c.bytes_sent, p.bytes_sent) * 8 / elapsed
+            rate = NetRate(
+                name, rx_bps, tx_bps,
+                delta(c.packets_recv, p.packets_recv) / elapsed,
+                delta(c.packets_sent, p.packets_sent) / elapsed,
+                (delta(c.errin, p.errin) + delta(c.errout, p.errout)) / elapsed,
+                (delta(c.dropin, p.dropin) + delta(c.dropout, p.dropout)) / elapsed,
+                speed,
+                min(max(rx_bps, tx_bps) / (speed * 1e6) * 100, 100.0) if speed else None,
+                stats.isup if stats is not None else None,
+            )
+            rates[name] = rate
+            self.history.record(f'{name}.rx', rx_bps, timestamp, compact=True)
+            self.history.record(f'{name}.tx', tx_bps, timestamp, compact=True)
+        self.rates = rates
+        self._ready.set()
+    
+    def latest(self, timeout=None):
+        """Последние скорости по интерфейсам (ждет только самый первый замер)"""
+        if not self._ready.is_set() and timeout:
+            self._ready.wait(timeout)
+        return sorted(self.rates.values(), key=lambda r: r.interface)
+
+
+_trackers = {}
+
+
+def _get_tracker(name, factory):
+    """Общий трекер, обновляемый фоновым сэмплером (создается при первом обращении)"""
+    with _cpu_sampler_lock:
+        tracker = _trackers.get(name)
+        if tracker is not None:
+            return tracker
+        tracker = _trackers[name] = factory()
+    get_cpu_sampler().add_tracker(tracker)
+    return tracker
+
+
+def get_disk_tracker():
+    """Общий трекер скоростей дисков"""
+    return _get_tracker('disk', DiskIOTracker)
+
+
+def get_net_tracker():
+    """Общий трекер скоростей сетевых интерфейсов"""
+    return _get_tracker('net', NetIOTracker)
+
+
+class ConnectionTable:
+    """Сводка сокетов по процессам и состояниям TCP
+    
+    На Linux таблицы /proc/net/{tcp,tcp6,udp,udp6} разбираются напрямую
+    (нужны только состояние и inode), а inode сопоставляются с PID одним
+    проходом по /proc/*/fd за обновление; проход прекращается, как только
+    найдены владельцы всех сокетов. На других платформах - psutil.net_connections.
+    """
+    
+    TABLES = (('tcp', True), ('tcp6', True), ('udp', False), ('udp6', False))
+    TCP_STATES = {
+        b'01': 'ESTABLISHED', b'02': 'SYN_SENT', b'03': 'SYN_RECV', b'04': 'FIN_WAIT1',
+        b'05': 'FIN_WAIT2', b'06': 'TIME_WAIT', b'07': 'CLOSE', b'08': 'CLOSE_WAIT',
+        b'09': 'LAST_ACK', b'0A': 'LISTEN', b'0B': 'CLOSING', b'0C': 'NEW_SYN_RECV',
+    }
+    
+    def __init__(self, procfs='/proc'):
+        self.procfs = procfs
+        self._lock = threading.Lock()
+        self.use_procfs = (sys.platform.startswith('linux')
+                           and os.path.exists(f'{procfs}/net/tcp'))
+    
+    def _read_sockets(self):
+        """{inode: состояние} из таблиц /proc/net (inode 0 - сокет без владельца)"""
+        sockets = {}
+        orphans = []
+        states = self.TCP_STATES
+        for table, is_tcp in self.TABLES:
+            try:
+                with open(f'{self.procfs}/net/{table}', 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            # Заголовок, дальше "sl local rem st tx:rx tr:when retr uid timeout inode ..."
+            for line in data.split(b'\n')[1:]:
+                fields = line.split(None, 10)
+                if len(fields) < 10:
+                    continue
+                state = states.get(fields[3], 'UNKNOWN') if is_tcp else 'UDP'
+                inode = int(fields[9])
+                if inode:
+                    sockets[inode] = state
+                else:
+                    orphans.append(state)
+        return sockets, orphans
+    
+    def _socket_owners(self, inodes):
+        """{inode: pid} для нужных inode - один проход по /proc/*/fd"""
+        owners = {}
+        remaining = len(inodes)
+        readlink = os.readlink
+        for pid in os.listdir(self.procfs):
+            if not pid.isdigit():
+                continue
+            fd_dir = f'{self.procfs}/{pid}/fd/'
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue
+            pid = int(pid)
+            for fd in fds:
+                try:
+                    target = readlink(fd_dir + fd)
+                except OSError:
+                    continue
+                # Сокеты выглядят как "socket:[12345]"
+                if target.startswith('socket:['):
+                    inode = int(target[8:-1])
+                    if inode in inodes and inode not in owners:
+                        owners[inode] = pid
+                        remaining -= 1
+            if not remaining:
+                break
+        return owners
+    
+    def _collect_procfs(self):
+        sockets, orphans = self._read_sockets()
+        owners = self._socket_owners(sockets)
+        per_pid = {}
+        for inode, state in sockets.items():
+            pid = owners.get(inode)
+            if pid is None:
+                orphans.append(state)
+                continue
+            per_pid.setdefault(pid, []).append(state)
+        return per_pid, orphans
+    
+    @staticmethod
+    def _collect_psutil():
+        import socket
+        per_pid = {}
+        orphans = []
+        for conn in psutil.net_connections(kind='inet'):
+            state = conn.status if conn.type == socket.SOCK_STREAM else 'UDP'
+            if conn.pid is None:
+                orphans.append(state)
+            else:
+                per_pid.setdefault(conn.pid, []).append(state)
+        return per_pid, orphans
+    
+    @staticmethod
+    def _count(states, into=None):
+        counts = into if into is not None else {}
+        for state in states:
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+    
+    def refresh(self, limit=10):
+        """Новый снимок: итоги по состояниям и топ процессов по числу сокетов"""
+        with self._lock:
+            started = time.perf_counter()
+            if self.use_procfs:
+                per_pid, orphans = self._collect_procfs()
+                source = 'procfs'
+            else:
+                per_pid, orphans = self._collect_psutil()
+                source = 'psutil'
+            
+            states = self._count(orphans)
+            for pid_states in per_pid.values():
+                self._count(pid_states, states)
+            
+            owners = []
+            for pid, pid_states in heapq.nlargest(limit, per_pid.items(), key=lambda item: len(item[1])):
+                try:
+                    name = psutil.Process(pid).name()
+                except psutil.Error:
+                    name = '?'
+                owners.append(ConnectionOwner(pid, name, len(pid_states), self._count(pid_states)))
+            
+            total = len(orphans) + sum(len(s) for s in per_pid.values())
+            return ConnectionsSnapshot(total, states, owners, len(orphans), len(per_pid), source,
+                                       time.perf_counter() - started)
+
+
+_connection_table = None
+_connection_table_lock = threading.Lock()
+
+
+def get_connection_table():
+    """Общая таблица соединений (создается при первом обращении)"""
+    global _connection_table
+    with _connection_table_lock:
+        if _connection_table is None:
+            _connection_table = ConnectionTable()
+        return _connection_table
+
+
+class RefreshScheduler:
+    """Планировщик обновлений по монотонным часам без накопления дрейфа
+    
+    Сроки отсчитываются от старта (t0, t0 + i, t0 + 2i, ...), а не от
+    конца предыдущего кадра; если кадр опоздал больше чем на интервал,
+    пропущенные сроки засчитываются и расписание не сдвигается.
+    """
+    
+    MIN_INTERVAL = 0.1
+    
+    def __init__(self, interval=1.0):
+        self.interval = max(float(interval), self.MIN_INTERVAL)
+        self.missed = 0
+        self.ticks = 0
+        self._next = None
+    
+    def wait(self):
+        """Ожидание следующего срока; возвращает число пропущенных сроков"""
+        if self._next is None:
+            self._next = time.monotonic()
+        else:
+            self._next += self.interval
+        
+        missed = 0
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+        else:
+            missed = int((now - self._next) // self.interval)
+            if missed:
+                self._next += missed * self.interval
+                self.missed += missed
+        self.ticks += 1
+        return missed
+
+
+class TerminalRenderer:
+    """Отрисовка кадров в терминале без мерцания
+    
+    Кадр собирается в один буфер; перерисовываются только изменившиеся
+    строки (позиционирование курсора ANSI-кодами), вывод - одной записью.
+    """
+    
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lines = []
+        self._size = None
+    
+    @staticmethod
+    def clear_screen(stream=None):
+        """Очистка экрана без запуска внешней команды"""
+        stream = stream or sys.stdout
+        stream.write('\033[H\033[2J\033[3J')
+        stream.flush()
+    
+    def invalidate(self):
+        """Следующий кадр будет нарисован целиком"""
+        self._lines = []
+        self._size = None
+    
+    def start(self):
+        """Начало отрисовки: скрыть курсор"""
+        self.invalidate()
+        self.stream.write('\033[?25l')
+        self.stream.flush()
+    
+    def stop(self):
+        """Конец отрисовки: вернуть курсор под последний кадр"""
+        self.stream.write(f'\033[{len(self._lines) + 1};1H\033[?25h')
+        self.stream.flush()
+    
+    def render(self, lines):
+        """Вывод кадра (список строк)"""
+        import shutil
+        size = shutil.get_terminal_size()
+        parts = []
+        if size != self._size:
+            # Новый экран или изменился размер терминала - рисуем всё
+            parts.append('\033[H\033[2J')
+            self._lines = []
+            self._size = size
+        
+        previous = self._lines
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                parts.append(f'\033[{row + 1};1H{line}\033[K')
+        if len(lines) < len(previous):
+            parts.append(f'\033[{len(lines) + 1};1H\033[J')
+        
+        if parts:
+            self.stream.write(''.join(parts))
+            self.stream.flush()
+        self._lines = list(lines)
+        return len(parts)
+
+
 class SystemMonitor:
     """Класс для мониторинга системы"""
     
+    SPARK_TICKS = '▁▂▃▄▅▆▇█'
+    
     @staticmethod
     def get_size(bytes, suffix="B"):
         """Конвертация байтов в читаемый формат"""
@@ -52,50 +1961,64 @@ class SystemMonitor:
     @staticmethod
     def get_system_info():
         """Получение информации о системе"""
+        snapshot = Collector.system()
+        SystemMonitor.render_system(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_system(snapshot):
+        """Вывод информации о системе"""
+        from datetime import datetime, timedelta
         print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}🖥️  ИНФОРМАЦИЯ О СИСТЕМЕ{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
-        uname = platform.uname()
-        print(f"{Colors.BOLD}Операционная система:{Colors.ENDC} {uname.system}")
-        print(f"{Colors.BOLD}Имя компьютера:{Colors.ENDC} {uname.node}")
-        print(f"{Colors.BOLD}Версия ОС:{Colors.ENDC} {uname.release}")
-        print(f"{Colors.BOLD}Архитектура:{Colors.ENDC} {uname.machine}")
-        print(f"{Colors.BOLD}Процессор:{Colors.ENDC} {uname.processor or platform.processor()}")
+        print(f"{Colors.BOLD}Операционная система:{Colors.ENDC} {snapshot.system}")
+        print(f"{Colors.BOLD}Имя компьютера:{Colors.ENDC} {snapshot.node}")
+        print(f"{Colors.BOLD}Версия ОС:{Colors.ENDC} {snapshot.release}")
+        print(f"{Colors.BOLD}Архитектура:{Colors.ENDC} {snapshot.machine}")
+        print(f"{Colors.BOLD}Процессор:{Colors.ENDC} {snapshot.processor}")
         
         # Время работы системы
-        boot_time = datetime.fromtimestamp(psutil.boot_time())
-        uptime = datetime.now() - boot_time
+        boot_time = datetime.fromtimestamp(snapshot.boot_time)
+        uptime = timedelta(seconds=int(snapshot.uptime))
         print(f"{Colors.BOLD}Время запуска:{Colors.ENDC} {boot_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{Colors.BOLD}Время работы:{Colors.ENDC} {str(uptime).split('.')[0]}")
+        print(f"{Colors.BOLD}Время работы:{Colors.ENDC} {uptime}")
         
         print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
     
     @staticmethod
     def get_cpu_info():
         """Получение информации о CPU"""
+        snapshot = Collector.cpu()
+        SystemMonitor.render_cpu(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_cpu(snapshot):
+        """Вывод информации о CPU"""
         print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}⚡ ПРОЦЕССОР (CPU){Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
         # Количество ядер
-        print(f"{Colors.BOLD}Физических ядер:{Colors.ENDC} {psutil.cpu_count(logical=False)}")
-        print(f"{Colors.BOLD}Всего ядер:{Colors.ENDC} {psutil.cpu_count(logical=True)}")
+        print(f"{Colors.BOLD}Физических ядер:{Colors.ENDC} {snapshot.physical_cores}")
+        print(f"{Colors.BOLD}Всего ядер:{Colors.ENDC} {snapshot.logical_cores}")
         
         # Частота CPU
-        cpufreq = psutil.cpu_freq()
-        print(f"{Colors.BOLD}Максимальная частота:{Colors.ENDC} {cpufreq.max:.2f}Mhz")
-        print(f"{Colors.BOLD}Минимальная частота:{Colors.ENDC} {cpufreq.min:.2f}Mhz")
-        print(f"{Colors.BOLD}Текущая частота:{Colors.ENDC} {cpufreq.current:.2f}Mhz")
+        if snapshot.freq_current is not None:
+            print(f"{Colors.BOLD}Максимальная частота:{Colors.ENDC} {snapshot.freq_max:.2f}Mhz")
+            print(f"{Colors.BOLD}Минимальная частота:{Colors.ENDC} {snapshot.freq_min:.2f}Mhz")
+            print(f"{Colors.BOLD}Текущая частота:{Colors.ENDC} {snapshot.freq_current:.2f}Mhz")
         
         # Загрузка CPU
         print(f"\n{Colors.BOLD}Загрузка CPU по ядрам:{Colors.ENDC}")
-        for i, percentage in enumerate(psutil.cpu_percent(percpu=True, interval=1)):
+        for i, percentage in enumerate(snapshot.percpu):
             bar = SystemMonitor.create_progress_bar(percentage)
             color = SystemMonitor.get_color_by_percentage(percentage)
             print(f"  Ядро {i}: {color}{bar} {percentage}%{Colors.ENDC}")
         
-        total_cpu = psutil.cpu_percent(interval=1)
+        total_cpu = snapshot.total_percent
         bar = SystemMonitor.create_progress_bar(total_cpu)
         color = SystemMonitor.get_color_by_percentage(total_cpu)
         print(f"\n{Colors.BOLD}Общая загрузка CPU:{Colors.ENDC} {color}{bar} {total_cpu}%{Colors.ENDC}")
@@ -105,118 +2028,192 @@ class SystemMonitor:
     @staticmethod
     def get_memory_info():
         """Получение информации о памяти"""
+        snapshot = Collector.memory()
+        SystemMonitor.render_memory(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_memory(snapshot):
+        """Вывод информации о памяти"""
         print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}💾 ОПЕРАТИВНАЯ ПАМЯТЬ (RAM){Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
-        svmem = psutil.virtual_memory()
-        print(f"{Colors.BOLD}Всего:{Colors.ENDC} {SystemMonitor.get_size(svmem.total)}")
-        print(f"{Colors.BOLD}Доступно:{Colors.ENDC} {SystemMonitor.get_size(svmem.available)}")
-        print(f"{Colors.BOLD}Используется:{Colors.ENDC} {SystemMonitor.get_size(svmem.used)}")
+        print(f"{Colors.BOLD}Всего:{Colors.ENDC} {SystemMonitor.get_size(snapshot.total)}")
+        print(f"{Colors.BOLD}Доступно:{Colors.ENDC} {SystemMonitor.get_size(snapshot.available)}")
+        print(f"{Colors.BOLD}Используется:{Colors.ENDC} {SystemMonitor.get_size(snapshot.used)}")
         
-        bar = SystemMonitor.create_progress_bar(svmem.percent)
-        color = SystemMonitor.get_color_by_percentage(svmem.percent)
-        print(f"{Colors.BOLD}Процент использования:{Colors.ENDC} {color}{bar} {svmem.percent}%{Colors.ENDC}")
+        bar = SystemMonitor.create_progress_bar(snapshot.percent)
+        color = SystemMonitor.get_color_by_percentage(snapshot.percent)
+        print(f"{Colors.BOLD}Процент использования:{Colors.ENDC} {color}{bar} {snapshot.percent}%{Colors.ENDC}")
         
         # SWAP память
-        swap = psutil.swap_memory()
         print(f"\n{Colors.BOLD}SWAP память:{Colors.ENDC}")
-        print(f"  Всего: {SystemMonitor.get_size(swap.total)}")
-        print(f"  Используется: {SystemMonitor.get_size(swap.used)}")
-        bar = SystemMonitor.create_progress_bar(swap.percent)
-        color = SystemMonitor.get_color_by_percentage(swap.percent)
-        print(f"  Процент: {color}{bar} {swap.percent}%{Colors.ENDC}")
+        print(f"  Всего: {SystemMonitor.get_size(snapshot.swap_total)}")
+        print(f"  Используется: {SystemMonitor.get_size(snapshot.swap_used)}")
+        bar = SystemMonitor.create_progress_bar(snapshot.swap_percent)
+        color = SystemMonitor.get_color_by_percentage(snapshot.swap_percent)
+        print(f"  Процент: {color}{bar} {snapshot.swap_percent}%{Colors.ENDC}")
         
         print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
     
     @staticmethod
     def get_disk_info():
         """Получение информации о дисках"""
+        snapshot = Collector.disks()
+        SystemMonitor.render_disks(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_disks(snapshot):
+        """Вывод информации о дисках"""
         print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}💿 ДИСКИ И РАЗДЕЛЫ{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
-        partitions = psutil.disk_partitions()
-        for partition in partitions:
+        for partition in snapshot.partitions:
             print(f"{Colors.BOLD}📁 Раздел: {partition.device}{Colors.ENDC}")
             print(f"  Точка монтирования: {partition.mountpoint}")
             print(f"  Файловая система: {partition.fstype}")
             
-            try:
-                partition_usage = psutil.disk_usage(partition.mountpoint)
-                print(f"  Всего: {SystemMonitor.get_size(partition_usage.total)}")
-                print(f"  Используется: {SystemMonitor.get_size(partition_usage.used)}")
-                print(f"  Свободно: {SystemMonitor.get_size(partition_usage.free)}")
+            if partition.total is not None:
+                print(f"  Всего: {SystemMonitor.get_size(partition.total)}")
+                print(f"  Используется: {SystemMonitor.get_size(partition.used)}")
+                print(f"  Свободно: {SystemMonitor.get_size(partition.free)}")
                 
-                bar = SystemMonitor.create_progress_bar(partition_usage.percent)
-                color = SystemMonitor.get_color_by_percentage(partition_usage.percent)
-                print(f"  Процент: {color}{bar} {partition_usage.percent}%{Colors.ENDC}")
-            except PermissionError:
+                bar = SystemMonitor.create_progress_bar(partition.percent)
+                color = SystemMonitor.get_color_by_percentage(partition.percent)
+                print(f"  Процент: {color}{bar} {partition.percent}%{Colors.ENDC}")
+            else:
                 print(f"  {Colors.YELLOW}⚠️  Нет доступа{Colors.ENDC}")
             print()
         
         # I/O дисков
-        disk_io = psutil.disk_io_counters()
         print(f"{Colors.BOLD}Статистика I/O:{Colors.ENDC}")
-        print(f"  Прочитано: {SystemMonitor.get_size(disk_io.read_bytes)}")
-        print(f"  Записано: {SystemMonitor.get_size(disk_io.write_bytes)}")
+        print(f"  Прочитано: {SystemMonitor.get_size(snapshot.read_bytes)}")
+        print(f"  Записано: {SystemMonitor.get_size(snapshot.write_bytes)}")
+        
+        if snapshot.rates:
+            history = get_disk_tracker().history
+            print(f"\n{Colors.BOLD}{'Устройство':<12} {'Чтение/с':>10} {'Запись/с':>10} {'IOPS r/w':>13} "
+                  f"{'Задержка':>9} {'Занят':>7}{Colors.ENDC}")
+            for rate in snapshot.rates:
+                color = SystemMonitor.get_color_by_percentage(rate.busy_percent)
+                iops = f"{rate.read_iops:.0f}/{rate.write_iops:.0f}"
+                trend = ''
+                if f'{rate.device}.busy' in history:
+                    trend = SystemMonitor.create_sparkline(history[f'{rate.device}.busy'].values(20))
+                print(f"{rate.device:<12} {SystemMonitor.get_size(rate.read_bps):>10} "
+                      f"{SystemMonitor.get_size(rate.write_bps):>10} {iops:>13} {rate.latency_ms:>7.1f}мс "
+                      f"{color}{rate.busy_percent:>6.1f}%{Colors.ENDC} {trend}")
         
         print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
     
     @staticmethod
     def get_network_info():
         """Получение информации о сети"""
+        snapshot = Collector.network()
+        SystemMonitor.render_network(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_network(snapshot):
+        """Вывод информации о сети"""
         print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}🌐 СЕТЕВЫЕ ИНТЕРФЕЙСЫ{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
         # Сетевые интерфейсы
-        if_addrs = psutil.net_if_addrs()
-        for interface_name, interface_addresses in if_addrs.items():
-            print(f"{Colors.BOLD}🔌 Интерфейс: {interface_name}{Colors.ENDC}")
-            for address in interface_addresses:
-                if str(address.family) == 'AddressFamily.AF_INET':
+        for interface in snapshot.interfaces:
+            print(f"{Colors.BOLD}🔌 Интерфейс: {interface.name}{Colors.ENDC}")
+            for address in interface.addresses:
+                if address.family == 'ipv4':
                     print(f"  IP адрес: {address.address}")
                     print(f"  Маска сети: {address.netmask}")
                     print(f"  Broadcast IP: {address.broadcast}")
-                elif str(address.family) == 'AddressFamily.AF_PACKET':
+                elif address.family == 'mac':
                     print(f"  MAC адрес: {address.address}")
             print()
         
         # Сетевая статистика
-        net_io = psutil.net_io_counters()
         print(f"{Colors.BOLD}Сетевая статистика:{Colors.ENDC}")
-        print(f"  Отправлено: {SystemMonitor.get_size(net_io.bytes_sent)}")
-        print(f"  Получено: {SystemMonitor.get_size(net_io.bytes_recv)}")
+        print(f"  Отправлено: {SystemMonitor.get_size(snapshot.bytes_sent)}")
+        print(f"  Получено: {SystemMonitor.get_size(snapshot.bytes_recv)}")
+        
+        if snapshot.rates:
+            print(f"\n{Colors.BOLD}{'Интерфейс':<12} {'Прием':>11} {'Передача':>11} {'Пакетов/с':>10} "
+                  f"{'Ошибки/с':>9} {'Сброс/с':>8} {'Линк':>9} {'Загрузка':>9}{Colors.ENDC}")
+            for rate in snapshot.rates:
+                link = f"{rate.speed_mbps}Mb" if rate.speed_mbps else "N/A"
+                if rate.is_up is False:
+                    link = "down"
+                if rate.utilisation is not None:
+                    color = SystemMonitor.get_color_by_percentage(rate.utilisation)
+                    utilisation = f"{color}{rate.utilisation:>8.1f}%{Colors.ENDC}"
+                else:
+                    utilisation = f"{'N/A':>9}"
+                problems = Colors.RED if rate.errors_ps or rate.drops_ps else ''
+                print(f"{rate.interface:<12} {SystemMonitor.format_bits(rate.rx_bps):>11} "
+                      f"{SystemMonitor.format_bits(rate.tx_bps):>11} {rate.rx_pps + rate.tx_pps:>10.0f} "
+                      f"{problems}{rate.errors_ps:>9.1f} {rate.drops_ps:>8.1f}{Colors.ENDC if problems else ''} "
+                      f"{link:>9} {utilisation}")
+        
+        print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
+    
+    @staticmethod
+    def get_connections_info(limit=10):
+        """Получение сводки сетевых соединений"""
+        snapshot = Collector.connections(limit)
+        SystemMonitor.render_connections(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_connections(snapshot):
+        """Вывод сводки соединений по состояниям и процессам"""
+        print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}🔗 СЕТЕВЫЕ СОЕДИНЕНИЯ{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
+        
+        print(f"{Colors.BOLD}Всего сокетов:{Colors.ENDC} {snapshot.total} "
+              f"(процессов: {snapshot.processes}, без владельца: {snapshot.unowned})")
+        if snapshot.states:
+            print(f"\n{Colors.BOLD}По состояниям:{Colors.ENDC}")
+            for state, count in sorted(snapshot.states.items(), key=lambda item: -item[1]):
+                print(f"  {state:<14} {count:>8}")
         
+        if snapshot.owners:
+            print(f"\n{Colors.BOLD}{'PID':<10} {'Имя процесса':<25} {'Сокетов':>8}  Состояния{Colors.ENDC}")
+            print(f"{Colors.CYAN}{'-'*70}{Colors.ENDC}")
+            for owner in snapshot.owners:
+                states = ", ".join(f"{state} {count}" for state, count in
+                                   sorted(owner.states.items(), key=lambda item: -item[1])[:3])
+                print(f"{owner.pid:<10} {owner.name[:24]:<25} {owner.total:>8}  {states}")
+        
+        print(f"\n{Colors.CYAN}Источник: {snapshot.source}, {snapshot.elapsed * 1000:.1f}мс{Colors.ENDC}")
         print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
     
     @staticmethod
     def get_processes_info(limit=10):
         """Получение информации о процессах"""
+        snapshot = Collector.processes(limit)
+        SystemMonitor.render_processes(snapshot, limit)
+        return snapshot
+    
+    @staticmethod
+    def render_processes(snapshot, limit=10):
+        """Вывод топа процессов"""
         print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}⚙️  ТОП {limit} ПРОЦЕССОВ ПО ИСПОЛЬЗОВАНИЮ CPU{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
-        # Получаем список процессов
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                processes.append(proc.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        
-        # Сортируем по CPU
-        processes = sorted(processes, key=lambda x: x['cpu_percent'] or 0, reverse=True)
-        
         print(f"{Colors.BOLD}{'PID':<10} {'Имя процесса':<35} {'CPU %':<10} {'RAM %':<10}{Colors.ENDC}")
         print(f"{Colors.CYAN}{'-'*70}{Colors.ENDC}")
         
-        for proc in processes[:limit]:
-            pid = proc['pid']
-            name = proc['name'][:33]
-            cpu = proc['cpu_percent'] or 0
-            mem = proc['memory_percent'] or 0
+        for proc in snapshot.processes:
+            pid = proc.pid
+            name = proc.name[:33]
+            cpu = proc.cpu_percent
+            mem = proc.memory_percent
             
             cpu_color = SystemMonitor.get_color_by_percentage(cpu)
             print(f"{pid:<10} {name:<35} {cpu_color}{cpu:<10.2f}{Colors.ENDC} {mem:<10.2f}")
@@ -224,32 +2221,165 @@ class SystemMonitor:
         print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
     
     @staticmethod
-    def get_battery_info():
-        """Получение информации о батарее"""
-        if not hasattr(psutil, "sensors_battery"):
-            return
+    def find_processes(query, limit=20):
+        """Поиск процессов по запросу"""
+        snapshot = Collector.find_processes(query, limit)
+        SystemMonitor.render_process_search(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def process_search_lines(snapshot, width=70):
+        """Строки таблицы найденных процессов"""
+        lines = [
+            f"{Colors.BOLD}Запрос:{Colors.ENDC} {snapshot.query} - найдено {snapshot.matches} из {snapshot.total}",
+            "",
+            f"{Colors.BOLD}{'PID':<8} {'Пользователь':<12} {'Сост.':<9} {'CPU %':>6} {'RAM %':>6}  Команда{Colors.ENDC}",
+            f"{Colors.CYAN}{'-'*width}{Colors.ENDC}",
+        ]
+        for proc in snapshot.processes:
+            command = proc.cmdline or f"[{proc.name}]"
+            cpu_color = SystemMonitor.get_color_by_percentage(proc.cpu_percent)
+            lines.append(f"{proc.pid:<8} {proc.username[:12]:<12} {(proc.status or '')[:9]:<9} "
+                         f"{cpu_color}{proc.cpu_percent:>6.1f}{Colors.ENDC} {proc.memory_percent:>6.2f}  "
+                         f"{command[:max(width - 47, 10)]}")
+        return lines
+    
+    @staticmethod
+    def render_process_search(snapshot):
+        """Вывод результата поиска процессов"""
+        import shutil
+        print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}🔍 ПОИСК ПРОЦЕССОВ{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
+        for line in SystemMonitor.process_search_lines(snapshot, shutil.get_terminal_size().columns):
+            print(line)
+        print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
+    
+    @staticmethod
+    def watch_processes(query, limit=20, interval=2.0):
+        """Живой поиск процессов: запрос разобран один раз, экран перерисовывается построчно"""
+        import shutil
+        scheduler = RefreshScheduler(interval)
+        renderer = TerminalRenderer()
+        renderer.start()
+        try:
+            while True:
+                snapshot = Collector.find_processes(query, limit)
+                lines = [f"{Colors.BOLD}{Colors.CYAN}🔍 ПОИСК ПРОЦЕССОВ (Ctrl+C для выхода){Colors.ENDC}", ""]
+                lines.extend(SystemMonitor.process_search_lines(snapshot, shutil.get_terminal_size().columns))
+                renderer.render(lines)
+                scheduler.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            renderer.stop()
+    
+    @staticmethod
+    def watch_lifecycle(interval=0.2, limit=15):
+        """Живая лента запусков и завершений процессов с частотой запусков по именам"""
+        import shutil
+        from datetime import datetime
+        lifecycle = ProcessLifecycle()
+        scheduler = RefreshScheduler(interval)
+        renderer = TerminalRenderer()
+        lifecycle.poll()
+        renderer.start()
+        try:
+            while True:
+                scheduler.wait()
+                lifecycle.poll()
+                width = shutil.get_terminal_size().columns
+                fork_rate = lifecycle.fork_rate
+                lines = [
+                    f"{Colors.BOLD}{Colors.CYAN}🧬 СОБЫТИЯ ПРОЦЕССОВ (Ctrl+C для выхода){Colors.ENDC}",
+                    "",
+                    f"{Colors.BOLD}Процессов:{Colors.ENDC} {len(lifecycle)} | "
+                    f"{Colors.BOLD}fork/с (ядро):{Colors.ENDC} {f'{fork_rate:.1f}' if fork_rate is not None else 'N/A'} | "
+                    f"опрос каждые {scheduler.interval:g}с",
+                    "",
+                    f"{Colors.BOLD}Чаще всего запускаются (за {lifecycle.window:.0f}с):{Colors.ENDC}",
+                ]
+                for name, rate, total in lifecycle.exec_rates(5):
+                    lines.append(f"  {name[:30]:<30} {rate:>7.2f}/с  всего {total}")
+                lines += ["", f"{Colors.BOLD}{'Время':<9} {'':<2} {'PID':<8} {'PPID':<8} {'Работал':>8}  Команда{Colors.ENDC}"]
+                for event in list(lifecycle.events)[-limit:][::-1]:
+                    mark = f"{Colors.GREEN}+{Colors.ENDC}" if event.kind == 'spawn' else f"{Colors.RED}-{Colors.ENDC}"
+                    runtime = f"{event.runtime:.1f}с" if event.runtime is not None else ""
+                    command = event.cmdline or f"[{event.name}]"
+                    lines.append(f"{datetime.fromtimestamp(event.timestamp).strftime('%H:%M:%S'):<9} {mark}  "
+                                 f"{event.pid:<8} {event.ppid if event.ppid is not None else '?':<8} {runtime:>8}  "
+                                 f"{command[:max(width - 42, 10)]}")
+                renderer.render(lines)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            renderer.stop()
+    
+    @staticmethod
+    def get_process_tree_info(max_depth=None, min_cpu=0.0, min_rss=0, limit=None):
+        """Получение дерева процессов"""
+        snapshot = Collector.process_tree(max_depth, min_cpu, min_rss, limit)
+        SystemMonitor.render_process_tree(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_process_tree(snapshot):
+        """Вывод дерева процессов: свои значения и суммы по поддереву"""
+        print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}🌳 ДЕРЕВО ПРОЦЕССОВ ({snapshot.count}){Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
-        battery = psutil.sensors_battery()
-        if battery is None:
-            return
+        print(f"{Colors.BOLD}{'PID':<8} {'CPU %':>7} {'Σ CPU %':>8} {'Σ RAM':>10}  Процесс{Colors.ENDC}")
+        print(f"{Colors.CYAN}{'-'*70}{Colors.ENDC}")
         
+        for row in snapshot.rows:
+            color = SystemMonitor.get_color_by_percentage(row.subtree_cpu)
+            name = f"{'  ' * row.depth}{'└ ' if row.depth else ''}{row.name}"
+            if row.hidden:
+                name += f" {Colors.CYAN}(+{row.hidden} скрыто){Colors.ENDC}"
+            print(f"{row.pid:<8} {row.cpu_percent:>7.1f} {color}{row.subtree_cpu:>8.1f}{Colors.ENDC} "
+                  f"{SystemMonitor.get_size(row.subtree_rss):>10}  {name}")
+        
+        print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
+    
+    @staticmethod
+    def get_battery_info():
+        """Получение информации о батарее"""
+        snapshot = Collector.battery()
+        if snapshot is not None:
+            SystemMonitor.render_battery(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def render_battery(snapshot):
+        """Вывод информации о батарее"""
+        from datetime import timedelta
         print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}🔋 БАТАРЕЯ{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
         
-        print(f"{Colors.BOLD}Заряд:{Colors.ENDC} {battery.percent}%")
-        print(f"{Colors.BOLD}Подключен к сети:{Colors.ENDC} {'Да' if battery.power_plugged else 'Нет'}")
+        print(f"{Colors.BOLD}Заряд:{Colors.ENDC} {snapshot.percent}%")
+        print(f"{Colors.BOLD}Подключен к сети:{Colors.ENDC} {'Да' if snapshot.power_plugged else 'Нет'}")
         
-        if battery.secsleft != psutil.POWER_TIME_UNLIMITED:
-            time_left = timedelta(seconds=battery.secsleft)
+        if snapshot.secsleft is not None:
+            time_left = timedelta(seconds=snapshot.secsleft)
             print(f"{Colors.BOLD}Время до разряда:{Colors.ENDC} {str(time_left).split('.')[0]}")
         
-        bar = SystemMonitor.create_progress_bar(battery.percent)
-        color = Colors.GREEN if battery.percent > 50 else Colors.YELLOW if battery.percent > 20 else Colors.RED
+        bar = SystemMonitor.create_progress_bar(snapshot.percent)
+        color = Colors.GREEN if snapshot.percent > 50 else Colors.YELLOW if snapshot.percent > 20 else Colors.RED
         print(f"{color}{bar}{Colors.ENDC}")
         
         print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
     
+    @staticmethod
+    def format_bits(bits_per_second):
+        """Скорость в битах в секунду в читаемом формате (десятичные приставки)"""
+        for unit in ["", "K", "M", "G", "T"]:
+            if bits_per_second < 1000:
+                return f"{bits_per_second:.1f}{unit}bit/s"
+            bits_per_second /= 1000
+        return f"{bits_per_second:.1f}Pbit/s"
+    
     @staticmethod
     def create_progress_bar(percentage, length=30):
         """Создание прогресс-бара"""
@@ -257,6 +2387,17 @@ class SystemMonitor:
         bar = '█' * filled + '░' * (length - filled)
         return f"[{bar}]"
     
+    @staticmethod
+    def create_sparkline(values, maximum=100):
+        """Создание мини-графика из значений (maximum=None - масштаб по максимуму)"""
+        if not values:
+            return ''
+        if maximum is None:
+            maximum = max(values) or 1
+        ticks = SystemMonitor.SPARK_TICKS
+        top = len(ticks) - 1
+        return ''.join(ticks[min(max(int(v / maximum * top + 0.5), 0), top)] for v in values)
+    
     @staticmethod
     def get_color_by_percentage(percentage):
         """Получение цвета в зависимости от процента"""
@@ -268,15 +2409,301 @@ class SystemMonitor:
             return Colors.RED
 
 
+def _walk_tree(root, visit, workers):
+    """Обход дерева каталогов фиксированным набором потоков с общей очередью
+    
+    visit(путь) -> (данные, [(путь подкаталога, данные для него)]) вызывается
+    в рабочих потоках. Возвращает узлы [(путь, номер родителя, данные от
+    родителя)] и результаты visit по номерам; родитель всегда раньше детей.
+    """
+    import queue
+    
+    nodes = [(root, -1, None)]
+    results = [None]
+    failures = []
+    work = queue.SimpleQueue()
+    work.put(0)
+    lock = threading.Lock()
+    # Каталоги в очереди и в обработке; на нуле обход закончен
+    outstanding = [1]
+    
+    def worker():
+        while True:
+            node_id = work.get()
+            if node_id is None:
+                return
+            data, children = None, ()
+            try:
+                data, children = visit(nodes[node_id][0])
+            except Exception as e:
+                failures.append(e)
+            with lock:
+                results[node_id] = data
+                for path, payload in children:
+                    nodes.append((path, node_id, payload))
+                    results.append(None)
+                    work.put(len(nodes) - 1)
+                outstanding[0] += len(children) - 1
+                if outstanding[0] == 0:
+                    for _ in range(workers):
+                        work.put(None)
+    
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers - 1)]
+    for thread in threads:
+        thread.start()
+    # Текущий поток тоже работает, так что при workers=1 потоков не создается
+    worker()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+    return nodes, results
+
+
+class DiskUsageAnalyzer:
+    """Анализ занятого места в стиле du
+    
+    Каталоги обходятся итеративно через scandir фиксированным набором
+    потоков с общей очередью, без
+    раскрытия симлинков и (по умолчанию) без выхода за пределы файловой
+    системы корня. Файл с несколькими жесткими ссылками учитывается один
+    раз по (st_dev, st_ino). Крупнейшие файлы и каталоги выбираются
+    ограниченными кучами.
+    """
+    
+    def __init__(self, root, top=20, workers=None, one_filesystem=True, apparent=False):
+        self.root = os.path.abspath(root)
+        self.top = top
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.one_filesystem = one_filesystem
+        # apparent=True - размер файлов в байтах (st_size), иначе занятое на диске место
+        self.apparent = apparent or not hasattr(os.stat_result, 'st_blocks')
+        self._seen_inodes = set()
+        self._seen_lock = threading.Lock()
+        self._top_files = []
+        self._files_lock = threading.Lock()
+    
+    def _size(self, st):
+        return st.st_size if self.apparent else st.st_blocks * 512
+    
+    def _offer_file(self, size, path):
+        """Кандидат в топ файлов (куча из top минимальных элементов)"""
+        heap = self._top_files
+        with self._files_lock:
+            if len(heap) < self.top:
+                heapq.heappush(heap, (size, path))
+            elif size > heap[0][0]:
+                heapq.heapreplace(heap, (size, path))
+    
+    def _scan_dir(self, path, root_dev, links=None):
+        """Сканирование одного каталога: (размер файлов, файлов, [(подкаталог, его размер)], ошибок)
+        
+        links - список, куда вместо учета складываются (st_dev, st_ino, размер)
+        файлов с несколькими жесткими ссылками: повторы исключает вызывающий.
+        """
+        own = files = errors = 0
+        subdirs = []
+        top = self.top
+        heap = self._top_files
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            if self.one_filesystem and st.st_dev != root_dev:
+                                continue
+                            subdirs.append((entry.path, self._size(st)))
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        errors += 1
+                        continue
+                    
+                    if st.st_nlink > 1 and not entry.is_symlink():
+                        if links is not None:
+                            links.append((st.st_dev, st.st_ino, self._size(st)))
+                            continue
+                        key = (st.st_dev, st.st_ino)
+                        with self._seen_lock:
+                            if key in self._seen_inodes:
+                                continue
+                            self._seen_inodes.add(key)
+                    size = self._size(st)
+                    own += size
+                    files += 1
+                    # Порог читается без блокировки - это лишь быстрый отсев
+                    if top and (len(heap) < top or size > heap[0][0]):
+                        self._offer_file(size, entry.path)
+        except OSError:
+            errors += 1
+        return own, files, subdirs, errors
+    
+    def scan(self):
+        """Обход дерева; возвращает DiskUsageReport"""
+        started = time.monotonic()
+        # Состояние одного обхода: повторный scan() начинается с чистого листа
+        self._seen_inodes = set()
+        self._top_files = []
+        root_st = os.lstat(self.root)
+        root_dev = root_st.st_dev
+        
+        def visit(path):
+            own, files, subdirs, errors = self._scan_dir(path, root_dev)
+            return (own, files, errors), subdirs
+        
+        nodes, results = _walk_tree(self.root, visit, self.workers)
+        # Размер каталога = его собственный блок (от родителя) + файлы в нем
+        paths = [path for path, _, _ in nodes]
+        parents = [parent for _, parent, _ in nodes]
+        sizes = [size for _, _, size in nodes]
+        sizes[0] = self._size(root_st)
+        total_files = total_errors = 0
+        for dir_id, (own, files, errors) in enumerate(results):
+            sizes[dir_id] += own
+            total_files += files
+            total_errors += errors
+        
+        # Суммирование снизу вверх: дети всегда идут после родителей
+        for dir_id in range(len(sizes) - 1, 0, -1):
+            sizes[parents[dir_id]] += sizes[dir_id]
+        
+        top_dirs = heapq.nlargest(self.top, zip(sizes, paths)) if self.top else []
+        top_files = sorted(self._top_files, reverse=True)
+        return DiskUsageReport(
+            self.root, sizes[0], total_files, len(paths), total_errors,
+            [PathUsage(path, size) for size, path in top_dirs],
+            [PathUsage(path, size) for size, path in top_files],
+            time.monotonic() - started,
+        )
+
+
+class DirSizeIndex:
+    """Постоянный индекс размеров каталогов для повторных сканирований
+    
+    Для каждого каталога хранятся mtime, размер собственных файлов и имена
+    подкаталогов. Каталог с прежним mtime не перечитывается, поэтому
+    повторный обход стоит один lstat на каталог плюс scandir только
+    изменившихся каталогов, а не stat каждого файла.
+    
+    mtime каталога меняется при добавлении, удалении и переименовании
+    записей, но не при дозаписи в существующий файл; для полного
+    пересчета используется scan(full=True).
+    """
+    
+    VERSION = 2
+    
+    def __init__(self, root, path=None, workers=None, apparent=False):
+        import hashlib
+        self.root = os.path.abspath(root)
+        if path is None:
+            digest = hashlib.sha1(self.root.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+            path = os.path.join(FactsCache.cache_dir(), f'dirsize-{digest}.json')
+        self.path = path
+        self.analyzer = DiskUsageAnalyzer(self.root, top=0, workers=workers, apparent=apparent)
+        # путь -> [mtime_ns, размер собственных файлов и самого каталога, файлов,
+        #          [имена подкаталогов], [[st_dev, st_ino, размер] файлов с жесткими ссылками]]
+        self.entries = {}
+        # путь -> размер поддерева после последнего обхода
+        self.totals = {}
+        self.rescanned = 0
+        self.reused = 0
+    
+    def load(self):
+        """Загрузка индекса с диска (отсутствующий или чужой индекс игнорируется)"""
+        import json
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (data.get('version') != self.VERSION or data.get('root') != self.root
+                or data.get('apparent') != self.analyzer.apparent):
+            return False
+        self.entries = data.get('entries', {})
+        return True
+    
+    def save(self):
+        """Атомарная запись индекса на диск"""
+        import json
+        data = {'version': self.VERSION, 'root': self.root,
+                'apparent': self.analyzer.apparent, 'entries': self.entries}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return False
+        return True
+    
+    def _visit(self, path, root_dev, full):
+        """Данные каталога: из индекса, если mtime не менялся, иначе сканированием"""
+        st = os.lstat(path)
+        if self.analyzer.one_filesystem and st.st_dev != root_dev:
+            return None, False
+        cached = None if full else self.entries.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            return cached, True
+        # mtime берется до чтения: изменения во время обхода попадут в следующий
+        links = []
+        own, files, subdirs, _ = self.analyzer._scan_dir(path, root_dev, links)
+        names = [os.path.basename(subdir) for subdir, _ in subdirs]
+        return [st.st_mtime_ns, own + self.analyzer._size(st), files, names, [list(l) for l in links]], False
+    
+    def scan(self, full=False):
+        """Обход дерева с использованием индекса; возвращает общий размер"""
+        root_dev = os.lstat(self.root).st_dev
+        
+        def visit(path):
+            try:
+                entry, reused = self._visit(path, root_dev, full)
+            except OSError:
+                return None, ()
+            if entry is None:
+                return None, ()
+            return (entry, reused), [(os.path.join(path, name), None) for name in entry[3]]
+        
+        nodes, results = _walk_tree(self.root, visit, self.analyzer.workers)
+        entries = {}
+        sizes = [0] * len(nodes)
+        self.rescanned = self.reused = 0
+        # Файлы с жесткими ссылками учитываются один раз на все дерево, в порядке
+        # обхода - одинаково для каталогов из индекса и перечитанных
+        seen_inodes = set()
+        for dir_id, result in enumerate(results):
+            if result is None:
+                continue
+            entry, reused = result
+            entries[nodes[dir_id][0]] = entry
+            size = entry[1]
+            for dev, ino, link_size in entry[4]:
+                if (dev, ino) not in seen_inodes:
+                    seen_inodes.add((dev, ino))
+                    size += link_size
+            sizes[dir_id] = size
+            if reused:
+                self.reused += 1
+            else:
+                self.rescanned += 1
+        
+        for dir_id in range(len(sizes) - 1, 0, -1):
+            sizes[nodes[dir_id][1]] += sizes[dir_id]
+        
+        # Удаленные каталоги выпадают из индекса сами
+        self.entries = entries
+        self.totals = {path: size for (path, _, _), size in zip(nodes, sizes)}
+        return sizes[0]
+
+
 class SystemManager:
     """Класс для управления системой"""
     
     @staticmethod
-    def clean_temp_files():
-        """Очистка временных файлов"""
-        print(f"\n{Colors.YELLOW}🧹 Очистка временных файлов...{Colors.ENDC}\n")
-        
-        temp_dirs = []
+    def get_temp_dirs():
+        """Системные временные папки (без повторов)"""
+        import platform
         if platform.system() == "Windows":
             temp_dirs = [
                 os.environ.get('TEMP'),
@@ -285,57 +2712,708 @@ class SystemManager:
         else:
             temp_dirs = ['/tmp']
         
-        total_freed = 0
-        files_deleted = 0
-        
+        result = []
         for temp_dir in temp_dirs:
-            if temp_dir and os.path.exists(temp_dir):
-                for item in os.listdir(temp_dir):
-                    item_path = os.path.join(temp_dir, item)
+            if temp_dir and os.path.isdir(temp_dir):
+                real = os.path.realpath(temp_dir)
+                if real not in result:
+                    result.append(real)
+        return result
+    
+    # Удаление относительно дескрипторов каталогов, как в shutil.rmtree:
+    # подмена компонента пути симлинком не уводит удаление из временной папки
+    _FD_SAFE = ({os.open, os.unlink, os.rmdir} <= os.supports_dir_fd
+                and os.scandir in os.supports_fd and hasattr(os, 'O_NOFOLLOW'))
+    
+    @staticmethod
+    def _open_dir(parent, name, st):
+        """Открытие подкаталога без перехода по симлинкам
+        
+        Возвращает дескриптор; там, где dir_fd не поддерживается, - путь.
+        """
+        if not SystemManager._FD_SAFE:
+            return os.path.join(parent, name)
+        fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=parent)
+        try:
+            opened = os.fstat(fd)
+        except OSError:
+            os.close(fd)
+            raise
+        if (opened.st_dev, opened.st_ino) != (st.st_dev, st.st_ino):
+            # Каталог подменили между lstat и открытием
+            os.close(fd)
+            raise OSError(f"каталог подменен: {name}")
+        return fd
+    
+    @staticmethod
+    def _close_dir(handle):
+        if isinstance(handle, int):
+            os.close(handle)
+    
+    @staticmethod
+    def _unlink(parent, name):
+        if isinstance(parent, int):
+            os.unlink(name, dir_fd=parent)
+        else:
+            os.unlink(os.path.join(parent, name))
+    
+    @staticmethod
+    def _rmdir(parent, name):
+        if isinstance(parent, int):
+            os.rmdir(name, dir_fd=parent)
+        else:
+            os.rmdir(os.path.join(parent, name))
+    
+    @staticmethod
+    def _clean_tree(parent, name, path, st, cutoff, uid, dry_run):
+        """Удаление поддерева за один проход с подсчетом освобожденного места
+        
+        parent - дескриптор (или путь) каталога, в котором лежит name;
+        st - его lstat. Обход итеративный, относительно дескрипторов,
+        симлинки не раскрываются, за пределы файловой системы не выходит.
+        Каталог удаляется, только если после очистки в нем ничего не
+        осталось и он сам проходит фильтры. Возвращает DirectoryCleanup.
+        """
+        result = DirectoryCleanup(path, 0, 0, 0, 0)
+        root_dev = st.st_dev
+        
+        def eligible(st):
+            if cutoff is not None and st.st_mtime > cutoff:
+                return False
+            return uid is None or st.st_uid == uid
+        
+        handle = None
+        try:
+            handle = SystemManager._open_dir(parent, name, st)
+            entries = os.scandir(handle)
+        except OSError:
+            if handle is not None:
+                SystemManager._close_dir(handle)
+            result.skipped += 1
+            return result
+        
+        # Кадр стека: [дескриптор, итератор scandir, все ли содержимое удалено, имя, lstat]
+        stack = [[handle, entries, True, name, st]]
+        while stack:
+            frame = stack[-1]
+            entry = next(frame[1], None)
+            if entry is None:
+                # Каталог обойден - удаляем его, если он опустел и прошел фильтры
+                frame[1].close()
+                SystemManager._close_dir(frame[0])
+                stack.pop()
+                _, _, emptied, dir_name, dir_st = frame
+                if emptied:
+                    # mtime берется до обхода: удаление содержимого его обновляет
+                    if not eligible(dir_st):
+                        result.skipped += 1
+                        emptied = False
+                    else:
+                        try:
+                            if not dry_run:
+                                SystemManager._rmdir(stack[-1][0] if stack else parent, dir_name)
+                            result.dirs += 1
+                        except OSError:
+                            result.skipped += 1
+                            emptied = False
+                if not emptied and stack:
+                    stack[-1][2] = False
+                continue
+            
+            try:
+                entry_st = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                result.skipped += 1
+                frame[2] = False
+                continue
+            
+            if is_dir:
+                if entry_st.st_dev != root_dev:
+                    # Точка монтирования внутри временной папки - не трогаем
+                    result.skipped += 1
+                    frame[2] = False
+                    continue
+                handle = None
+                try:
+                    handle = SystemManager._open_dir(frame[0], entry.name, entry_st)
+                    entries = os.scandir(handle)
+                except OSError:
+                    if handle is not None:
+                        SystemManager._close_dir(handle)
+                    result.skipped += 1
+                    frame[2] = False
+                    continue
+                stack.append([handle, entries, True, entry.name, entry_st])
+                continue
+            
+            if not eligible(entry_st):
+                result.skipped += 1
+                frame[2] = False
+                continue
+            try:
+                if not dry_run:
+                    SystemManager._unlink(frame[0], entry.name)
+            except OSError:
+                result.skipped += 1
+                frame[2] = False
+                continue
+            result.files += 1
+            result.freed += entry_st.st_size
+        
+        return result
+    
+    @staticmethod
+    def clean_temp_files(dry_run=False, min_age=0, uid=None, workers=None, temp_dirs=None, verbose=True):
+        """Очистка временных файлов
+        
+        dry_run - только подсчитать, что было бы удалено;
+        min_age - не трогать файлы и каталоги, измененные менее min_age секунд назад;
+        uid - удалять только файлы этого владельца (None - любые).
+        Подкаталоги верхнего уровня обрабатываются параллельно.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        if verbose:
+            title = "Предварительный просмотр очистки" if dry_run else "Очистка временных файлов"
+            print(f"\n{Colors.YELLOW}🧹 {title}...{Colors.ENDC}\n")
+        
+        cutoff = time.time() - min_age if min_age else None
+        workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        report = CleanupReport(dry_run, 0, 0, 0, 0, [])
+        
+        def clean_file(top, entry, path, st):
+            if cutoff is not None and st.st_mtime > cutoff or uid is not None and st.st_uid != uid:
+                return DirectoryCleanup(path, 0, 0, 0, 1)
+            try:
+                if not dry_run:
+                    SystemManager._unlink(top, entry.name)
+            except OSError:
+                return DirectoryCleanup(path, 0, 0, 0, 1)
+            return DirectoryCleanup(path, 1, 0, st.st_size, 0)
+        
+        tops = []
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = []
+                for temp_dir in temp_dirs or SystemManager.get_temp_dirs():
                     try:
-                        if os.path.isfile(item_path):
-                            size = os.path.getsize(item_path)
-                            os.unlink(item_path)
-                            total_freed += size
-                            files_deleted += 1
-                        elif os.path.isdir(item_path):
-                            size = SystemManager.get_dir_size(item_path)
-                            shutil.rmtree(item_path)
-                            total_freed += size
-                            files_deleted += 1
-                    except Exception:
-                        pass
-        
-        print(f"{Colors.GREEN}✅ Очистка завершена!{Colors.ENDC}")
-        print(f"Удалено файлов/папок: {files_deleted}")
-        print(f"Освобождено места: {SystemMonitor.get_size(total_freed)}\n")
-    
-    @staticmethod
-    def get_dir_size(path):
-        """Получение размера директории"""
-        total = 0
+                        if SystemManager._FD_SAFE:
+                            top = os.open(temp_dir, os.O_RDONLY | os.O_DIRECTORY)
+                            tops.append(top)
+                        else:
+                            top = temp_dir
+                        root_dev = os.stat(top).st_dev
+                        entries = list(os.scandir(top))
+                    except OSError:
+                        report.skipped += 1
+                        continue
+                    for entry in entries:
+                        path = os.path.join(temp_dir, entry.name)
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                            is_dir = entry.is_dir(follow_symlinks=False)
+                        except OSError:
+                            report.skipped += 1
+                            continue
+                        if is_dir and st.st_dev == root_dev:
+                            futures.append((True, executor.submit(
+                                SystemManager._clean_tree, top, entry.name, path, st, cutoff, uid, dry_run)))
+                        elif is_dir:
+                            report.skipped += 1
+                        else:
+                            futures.append((False, executor.submit(clean_file, top, entry, path, st)))
+                
+                for is_dir, future in futures:
+                    item = future.result()
+                    report.files += item.files
+                    report.dirs += item.dirs
+                    report.freed += item.freed
+                    report.skipped += item.skipped
+                    if is_dir:
+                        report.directories.append(item)
+        finally:
+            for top in tops:
+                os.close(top)
+        
+        report.directories.sort(key=lambda d: d.freed, reverse=True)
+        if verbose:
+            SystemManager.render_cleanup(report)
+        return report
+    
+    @staticmethod
+    def render_cleanup(report, limit=10):
+        """Вывод отчета об очистке"""
+        if report.directories:
+            print(f"{Colors.BOLD}{'Освобождается' if report.dry_run else 'Освобождено':<15} "
+                  f"{'Файлов':<10} {'Пропущено':<10} Каталог{Colors.ENDC}")
+            print(f"{Colors.CYAN}{'-'*70}{Colors.ENDC}")
+            for item in report.directories[:limit]:
+                print(f"{SystemMonitor.get_size(item.freed):<15} {item.files:<10} {item.skipped:<10} {item.path}")
+            if len(report.directories) > limit:
+                print(f"... и еще {len(report.directories) - limit} каталогов")
+            print()
+        
+        if report.dry_run:
+            print(f"{Colors.CYAN}🔍 Будет удалено файлов: {report.files}, папок: {report.dirs}{Colors.ENDC}")
+            print(f"Будет освобождено: {SystemMonitor.get_size(report.freed)}")
+        else:
+            print(f"{Colors.GREEN}✅ Очистка завершена!{Colors.ENDC}")
+            print(f"Удалено файлов: {report.files}, папок: {report.dirs}")
+            print(f"Освобождено места: {SystemMonitor.get_size(report.freed)}")
+        print(f"Пропущено (фильтры, нет доступа, занято): {report.skipped}\n")
+    
+    @staticmethod
+    def get_dir_size(path, use_index=False):
+        """Получение размера директории (в байтах, жесткие ссылки считаются один раз)
+        
+        use_index=True - повторные вызовы для того же каталога используют
+        сохраненный на диске индекс (DirSizeIndex) и перечитывают только
+        изменившиеся каталоги.
+        """
         try:
-            for entry in os.scandir(path):
-                if entry.is_file():
-                    total += entry.stat().st_size
-                elif entry.is_dir():
-                    total += SystemManager.get_dir_size(entry.path)
-        except Exception:
+            if use_index:
+                index = DirSizeIndex(path, apparent=True)
+                index.load()
+                total = index.scan()
+                index.save()
+                return total
+            return DiskUsageAnalyzer(path, top=0, apparent=True).scan().total
+        except OSError:
+            return 0
+    
+    @staticmethod
+    def analyze_disk_usage(path, top=20):
+        """Поиск самых больших каталогов и файлов (в стиле du)"""
+        print(f"\n{Colors.YELLOW}🔍 Анализ {path}...{Colors.ENDC}\n")
+        report = DiskUsageAnalyzer(path, top=top).scan()
+        SystemManager.render_disk_usage(report)
+        return report
+    
+    @staticmethod
+    def render_disk_usage(report):
+        """Вывод результатов анализа занятого места"""
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}📊 ЗАНЯТОЕ МЕСТО: {report.root}{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
+        
+        print(f"{Colors.BOLD}Всего:{Colors.ENDC} {SystemMonitor.get_size(report.total)} "
+              f"({report.files} файлов, {report.dirs} каталогов за {report.elapsed:.1f}с)")
+        if report.errors:
+            print(f"{Colors.YELLOW}⚠️  Недоступно: {report.errors}{Colors.ENDC}")
+        
+        for title, items in (("Самые большие каталоги:", report.top_dirs),
+                             ("Самые большие файлы:", report.top_files)):
+            if not items:
+                continue
+            print(f"\n{Colors.BOLD}{title}{Colors.ENDC}")
+            for item in items:
+                percent = item.size / report.total * 100 if report.total else 0
+                color = SystemMonitor.get_color_by_percentage(percent)
+                print(f"  {color}{SystemMonitor.get_size(item.size):>10}{Colors.ENDC}  {item.path}")
+        
+        print(f"{Colors.CYAN}{'='*70}{Colors.ENDC}\n")
+    
+    @staticmethod
+    def find_targets(pids=None, name=None, pattern=None, tree=False):
+        """Процессы для завершения: по PID, имени или regex командной строки
+        
+        С tree=True добавляются все потомки. Текущий процесс и его предки
+        (оболочка, из которой он запущен) исключаются.
+        """
+        targets = {}
+        for pid in pids or ():
+            try:
+                proc = psutil.Process(pid)
+                targets[proc.pid] = proc
+            except psutil.NoSuchProcess:
+                pass
+        if name or pattern:
+            table = get_process_table()
+            table.refresh()
+            for entry in ProcessQuery(name=name, cmdline=pattern).run(table):
+                targets[entry.pid] = entry.proc
+        if tree:
+            for proc in list(targets.values()):
+                try:
+                    for child in proc.children(recursive=True):
+                        targets.setdefault(child.pid, child)
+                except psutil.Error:
+                    pass
+        
+        me = psutil.Process()
+        for proc in [me] + me.parents():
+            targets.pop(proc.pid, None)
+        return list(targets.values())
+    
+    @staticmethod
+    def kill_processes(procs, timeout=3.0):
+        """Завершение процессов с эскалацией
+        
+        SIGTERM (terminate) отправляется всем сразу, затем все ждутся
+        вместе через psutil.wait_procs с общим таймаутом; оставшимся
+        отправляется SIGKILL (kill) и они ждутся еще раз.
+        """
+        started = time.perf_counter()
+        results = {}
+        names = {}
+        pending = []
+        for proc in procs:
+            try:
+                names[proc.pid] = proc.name()
+                proc.terminate()
+                pending.append(proc)
+            except psutil.NoSuchProcess:
+                results[proc.pid] = KillResult(proc.pid, names.get(proc.pid, '?'), 'gone')
+            except psutil.AccessDenied:
+                results[proc.pid] = KillResult(proc.pid, names.get(proc.pid, '?'), 'denied')
+        
+        gone, alive = psutil.wait_procs(pending, timeout=timeout)
+        for proc in gone:
+            results[proc.pid] = KillResult(proc.pid, names[proc.pid], 'terminated', proc.returncode)
+        
+        if alive:
+            for proc in alive:
+                try:
+                    proc.kill()
+                except psutil.NoSuchProcess:
+                    pass
+                except psutil.AccessDenied:
+                    results[proc.pid] = KillResult(proc.pid, names[proc.pid], 'denied')
+            alive = [proc for proc in alive if proc.pid not in results]
+            gone, alive = psutil.wait_procs(alive, timeout=timeout)
+            for proc in gone:
+                results[proc.pid] = KillResult(proc.pid, names[proc.pid], 'killed', proc.returncode)
+            for proc in alive:
+                results[proc.pid] = KillResult(proc.pid, names[proc.pid], 'survived')
+        
+        return KillReport(sorted(results.values(), key=lambda r: r.pid), time.perf_counter() - started)
+    
+    @staticmethod
+    def render_kill_report(report, limit=20):
+        """Вывод итогов завершения процессов"""
+        labels = {
+            'terminated': (Colors.GREEN, "завершен (SIGTERM)"),
+            'killed': (Colors.YELLOW, "убит (SIGKILL)"),
+            'survived': (Colors.RED, "не завершился"),
+            'gone': (Colors.CYAN, "уже не существует"),
+            'denied': (Colors.RED, "нет прав"),
+        }
+        counts = {}
+        for result in report.results:
+            counts[result.outcome] = counts.get(result.outcome, 0) + 1
+        
+        for result in report.results[:limit]:
+            color, label = labels[result.outcome]
+            code = f", код {result.returncode}" if result.returncode is not None else ""
+            print(f"  {color}{result.pid:<8} {result.name[:30]:<30} {label}{code}{Colors.ENDC}")
+        if len(report.results) > limit:
+            print(f"  ... и еще {len(report.results) - limit}")
+        
+        summary = ", ".join(f"{labels[outcome][1]}: {count}" for outcome, count in counts.items())
+        print(f"\n{Colors.BOLD}Итого {len(report.results)} за {report.elapsed:.2f}с{Colors.ENDC} - {summary}")
+    
+    @staticmethod
+    def kill_process(pid, timeout=3.0):
+        """Завершение процесса по PID (SIGTERM, при необходимости SIGKILL)"""
+        try:
+            process = psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            print(f"{Colors.RED}❌ Процесс с PID {pid} не найден{Colors.ENDC}")
+            return None
+        
+        result = SystemManager.kill_processes([process], timeout).results[0]
+        if result.outcome == 'terminated':
+            print(f"{Colors.GREEN}✅ Процесс '{result.name}' (PID: {pid}) завершен{Colors.ENDC}")
+        elif result.outcome == 'killed':
+            print(f"{Colors.YELLOW}⚠️  Процесс '{result.name}' (PID: {pid}) не ответил на SIGTERM и убит{Colors.ENDC}")
+        elif result.outcome == 'gone':
+            print(f"{Colors.RED}❌ Процесс с PID {pid} не найден{Colors.ENDC}")
+        elif result.outcome == 'denied':
+            print(f"{Colors.RED}❌ Нет прав для завершения процесса{Colors.ENDC}")
+        else:
+            print(f"{Colors.RED}❌ Процесс '{result.name}' (PID: {pid}) не завершился{Colors.ENDC}")
+        return result
+
+
+class PrometheusExporter:
+    """Экспорт метрик в текстовом формате Prometheus
+    
+    Ответ собирается не чаще раза в ttl секунд: одновременные запросы
+    ждут единственный идущий сбор и получают тот же готовый текст.
+    """
+    
+    PREFIX = 'systeminfo_'
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    def __init__(self, ttl=1.0, top=10):
+        self.ttl = ttl
+        self.top = top
+        self.collections = 0
+        self._body = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _escape(value):
+        """Экранирование значения метки"""
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    @staticmethod
+    def _labels(**labels):
+        escape = PrometheusExporter._escape
+        return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels.items()) + '}'
+    
+    def body(self):
+        """Текст ответа /metrics (из кэша, если он еще свежий)"""
+        if self._body is not None and time.monotonic() < self._expires:
+            return self._body
+        with self._lock:
+            # Пока ждали блокировку, сбор мог выполнить другой запрос
+            if self._body is None or time.monotonic() >= self._expires:
+                self._body = self.collect()
+                self._expires = time.monotonic() + self.ttl
+            return self._body
+    
+    def collect(self):
+        """Сбор всех метрик и формирование текста ответа (bytes)"""
+        started = time.perf_counter()
+        self.collections += 1
+        out = []
+        prefix = self.PREFIX
+        labels = self._labels
+        
+        def family(name, kind, help_text, samples):
+            out.append(f"# HELP {prefix}{name} {help_text}\n# TYPE {prefix}{name} {kind}\n")
+            for label_text, value in samples:
+                out.append(f"{prefix}{name}{label_text} {value}\n")
+        
+        backend = get_backend()
+        
+        # CPU
+        total, percpu, _ = get_cpu_sampler().latest()
+        family('cpu_usage_percent', 'gauge', 'Total CPU utilisation.', [('', total)])
+        family('cpu_core_usage_percent', 'gauge', 'Per-core CPU utilisation.',
+               [(labels(core=i), value) for i, value in enumerate(percpu)])
+        cpufreq = psutil.cpu_freq()
+        if cpufreq:
+            family('cpu_frequency_mhz', 'gauge', 'Current CPU frequency.', [('', cpufreq.current)])
+        family('boot_time_seconds', 'gauge', 'System boot time (unix time).', [('', psutil.boot_time())])
+        
+        # Память
+        mem = backend.memory()
+        family('memory_total_bytes', 'gauge', 'Total physical memory.', [('', mem.total)])
+        family('memory_available_bytes', 'gauge', 'Available physical memory.', [('', mem.available)])
+        family('memory_used_bytes', 'gauge', 'Used physical memory.', [('', mem.used)])
+        family('swap_total_bytes', 'gauge', 'Total swap.', [('', mem.swap_total)])
+        family('swap_used_bytes', 'gauge', 'Used swap.', [('', mem.swap_used)])
+        
+        # Разделы
+        # Только место на разделах: скорости I/O трекера экспорту не нужны
+        partitions = [p for p in Collector.partitions() if p.total is not None]
+        part_labels = [labels(device=p.device, mountpoint=p.mountpoint, fstype=p.fstype) for p in partitions]
+        family('filesystem_size_bytes', 'gauge', 'Filesystem size.',
+               [(l, p.total) for l, p in zip(part_labels, partitions)])
+        family('filesystem_used_bytes', 'gauge', 'Filesystem used space.',
+               [(l, p.used) for l, p in zip(part_labels, partitions)])
+        family('filesystem_free_bytes', 'gauge', 'Filesystem free space.',
+               [(l, p.free) for l, p in zip(part_labels, partitions)])
+        
+        # I/O дисков
+        disks = sorted(backend.disk_io().items())
+        disk_labels = [labels(device=name) for name, _ in disks]
+        family('disk_read_bytes_total', 'counter', 'Bytes read from disk.',
+               [(l, c.read_bytes) for l, (_, c) in zip(disk_labels, disks)])
+        family('disk_written_bytes_total', 'counter', 'Bytes written to disk.',
+               [(l, c.write_bytes) for l, (_, c) in zip(disk_labels, disks)])
+        family('disk_reads_total', 'counter', 'Completed disk reads.',
+               [(l, c.read_count) for l, (_, c) in zip(disk_labels, disks)])
+        family('disk_writes_total', 'counter', 'Completed disk writes.',
+               [(l, c.write_count) for l, (_, c) in zip(disk_labels, disks)])
+        family('disk_io_time_seconds_total', 'counter', 'Time spent doing I/O.',
+               [(l, c.busy_time / 1000) for l, (_, c) in zip(disk_labels, disks)])
+        
+        # Сеть
+        nics = sorted(backend.net_io().items())
+        nic_labels = [labels(interface=name) for name, _ in nics]
+        for name, field, help_text in (
+            ('network_sent_bytes_total', 'bytes_sent', 'Bytes sent.'),
+            ('network_received_bytes_total', 'bytes_recv', 'Bytes received.'),
+            ('network_sent_packets_total', 'packets_sent', 'Packets sent.'),
+            ('network_received_packets_total', 'packets_recv', 'Packets received.'),
+            ('network_receive_errors_total', 'errin', 'Receive errors.'),
+            ('network_transmit_errors_total', 'errout', 'Transmit errors.'),
+            ('network_receive_drops_total', 'dropin', 'Dropped incoming packets.'),
+            ('network_transmit_drops_total', 'dropout', 'Dropped outgoing packets.'),
+        ):
+            family(name, 'counter', help_text,
+                   [(l, getattr(c, field)) for l, (_, c) in zip(nic_labels, nics)])
+        
+        # Процессы
+        table = get_process_table()
+        table.refresh()
+        top = table.top(self.top)
+        proc_labels = [labels(pid=e.pid, name=e.name) for e in top]
+        family('processes', 'gauge', 'Number of processes.', [('', len(table))])
+        family('process_cpu_percent', 'gauge', 'CPU utilisation of the top processes.',
+               [(l, round(e.cpu_percent, 2)) for l, e in zip(proc_labels, top)])
+        family('process_resident_bytes', 'gauge', 'Resident memory of the top processes.',
+               [(l, e.rss) for l, e in zip(proc_labels, top)])
+        
+        # Батарея
+        battery = Collector.battery()
+        if battery is not None:
+            family('battery_percent', 'gauge', 'Battery charge.', [('', battery.percent)])
+            family('battery_power_plugged', 'gauge', 'Whether AC power is connected.',
+                   [('', int(bool(battery.power_plugged)))])
+            if battery.secsleft is not None:
+                family('battery_seconds_left', 'gauge', 'Estimated battery time left.',
+                       [('', battery.secsleft)])
+        
+        # Температуры
+        if hasattr(psutil, 'sensors_temperatures'):
+            try:
+                temps = psutil.sensors_temperatures()
+            except Exception:
+                temps = {}
+            family('temperature_celsius', 'gauge', 'Hardware temperature sensors.',
+                   # Индекс обязателен: у нескольких сокетов coretemp одинаковые "Core 0"
+                   [(labels(sensor=name, label=entry.label or str(i), index=i), entry.current)
+                    for name, entries in sorted(temps.items())
+                    for i, entry in enumerate(entries)])
+        
+        family('scrape_duration_seconds', 'gauge', 'Time spent collecting these metrics.',
+               [('', round(time.perf_counter() - started, 6))])
+        return ''.join(out).encode('utf-8')
+
+
+def serve_metrics(host='127.0.0.1', port=9101, ttl=1.0, top=10):
+    """Headless-режим: HTTP-сервер с метриками Prometheus на /metrics"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    exporter = PrometheusExporter(ttl=ttl, top=top)
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = exporter.body()
+            self.send_response(200)
+            self.send_header('Content-Type', exporter.CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
             pass
-        return total
     
-    @staticmethod
-    def kill_process(pid):
-        """Завершение процесса по PID"""
-        try:
-            process = psutil.Process(pid)
-            process_name = process.name()
-            process.terminate()
-            print(f"{Colors.GREEN}✅ Процесс '{process_name}' (PID: {pid}) завершен{Colors.ENDC}")
-        except psutil.NoSuchProcess:
-            print(f"{Colors.RED}❌ Процесс с PID {pid} не найден{Colors.ENDC}")
-        except psutil.AccessDenied:
-            print(f"{Colors.RED}❌ Нет прав для завершения процесса{Colors.ENDC}")
+    # Сэмплер и таблица процессов прогреваются до первого запроса
+    get_cpu_sampler()
+    get_process_table().refresh()
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    print(f"{Colors.GREEN}📡 Метрики Prometheus: http://{host}:{port}/metrics (Ctrl+C для выхода){Colors.ENDC}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{Colors.CYAN}Сервер метрик остановлен{Colors.ENDC}")
+    finally:
+        server.server_close()
+
+
+class AsyncSystemMonitor:
+    """Асинхронный фасад над Collector для встраивания в asyncio-сервисы
+    
+    Блокирующие сборы (disk_usage на медленных точках монтирования,
+    subprocess в FetchProbes, обход /proc) выполняются в ограниченном
+    пуле потоков, так что цикл событий не блокируется. Одинаковые
+    одновременные запросы разделяют один сбор: пока он идет, новые
+    ожидающие получают тот же результат.
+    """
+    
+    def __init__(self, max_workers=4):
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='systeminfo')
+        self._inflight = {}
+        # Сэмплер и трекеры запускаются сразу, чтобы первые замеры не ждали прогрева
+        get_cpu_sampler()
+        get_disk_tracker()
+        get_net_tracker()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Остановка пула (идущие сборы дорабатывают в фоне)"""
+        self._executor.shutdown(wait=False)
+    
+    async def _collect(self, key, func, *args, timeout=None):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        key = (id(loop),) + key
+        future = self._inflight.get(key)
+        if future is None:
+            future = loop.run_in_executor(self._executor, func, *args)
+            self._inflight[key] = future
+            
+            def forget(done, key=key):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+            future.add_done_callback(forget)
+        # shield: отмена одного ожидающего не отменяет общий сбор
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    
+    async def system(self, timeout=None):
+        return await self._collect(('system',), Collector.system, timeout=timeout)
+    
+    async def cpu(self, timeout=None):
+        return await self._collect(('cpu',), Collector.cpu, timeout=timeout)
+    
+    async def memory(self, timeout=None):
+        return await self._collect(('memory',), Collector.memory, timeout=timeout)
+    
+    async def disks(self, timeout=None):
+        return await self._collect(('disks',), Collector.disks, timeout=timeout)
+    
+    async def network(self, timeout=None):
+        return await self._collect(('network',), Collector.network, timeout=timeout)
+    
+    async def connections(self, limit=10, timeout=None):
+        return await self._collect(('connections', limit), Collector.connections, limit, timeout=timeout)
+    
+    async def processes(self, limit=10, timeout=None):
+        return await self._collect(('processes', limit), Collector.processes, limit, timeout=timeout)
+    
+    async def find_processes(self, query, limit=20, timeout=None):
+        return await self._collect(('find', id(query), limit), Collector.find_processes, query, limit,
+                                   timeout=timeout)
+    
+    async def process_tree(self, max_depth=None, min_cpu=0.0, min_rss=0, limit=None, timeout=None):
+        return await self._collect(('tree', max_depth, min_cpu, min_rss, limit), Collector.process_tree,
+                                   max_depth, min_cpu, min_rss, limit, timeout=timeout)
+    
+    async def battery(self, timeout=None):
+        return await self._collect(('battery',), Collector.battery, timeout=timeout)
+    
+    async def fetch(self, names=None, timeout=None):
+        """Медленные пробы ByredFetch (каждая со своим таймаутом)"""
+        names = tuple(names) if names else None
+        return await self._collect(('fetch', names), FetchProbes.run, names, timeout=timeout)
+    
+    async def snapshot(self, limit=10, timeout=None):
+        """Все основные снимки, собранные параллельно: {имя: снимок}"""
+        import asyncio
+        names = ('system', 'cpu', 'memory', 'disks', 'network', 'processes', 'battery')
+        results = await asyncio.gather(
+            self.system(timeout), self.cpu(timeout), self.memory(timeout), self.disks(timeout),
+            self.network(timeout), self.processes(limit, timeout), self.battery(timeout),
+        )
+        return dict(zip(names, results))
 
 
 def print_banner():
@@ -354,9 +3432,241 @@ def print_banner():
     print(banner)
 
 
-def show_neofetch():
-    """Показать красивый neofetch с логотипом ByredHub"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+class FetchProbes:
+    """Пробы данных для ByredFetch (каждая возвращает строку)"""
+    
+    # Сколько секунд ждать каждую пробу; не успевшая проба показывается как N/A
+    TIMEOUTS = {
+        'cpu_name': 3.0,
+        'gpu_name': 3.0,
+        'local_ip': 1.0,
+        'cpu_temp': 1.0,
+        'process_count': 1.0,
+        'cpu_usage': 1.0,
+        'disk': 1.0,
+    }
+    
+    @staticmethod
+    def _powershell(command, timeout):
+        import subprocess
+        result = subprocess.run(
+            ['powershell', '-Command', command],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+        return result.stdout.strip()
+    
+    @staticmethod
+    def cpu_name():
+        """Название процессора (PowerShell на Windows, /proc/cpuinfo на Linux)"""
+        import platform
+        timeout = FetchProbes.TIMEOUTS['cpu_name']
+        try:
+            if platform.system() == "Windows":
+                # Используем PowerShell вместо wmic
+                cpu_name = FetchProbes._powershell(
+                    "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty Name", timeout)
+                if cpu_name and 'error' not in cpu_name.lower():
+                    return cpu_name
+            else:
+                with open('/proc/cpuinfo', 'r') as f:
+                    for line in f:
+                        if 'model name' in line:
+                            return line.split(':')[1].strip()
+        except Exception:
+            pass
+        return platform.processor() or "Unknown CPU"
+    
+    @staticmethod
+    def gpu_name():
+        """Название основной видеокарты (PowerShell на Windows, lspci на Linux)"""
+        import platform
+        import subprocess
+        timeout = FetchProbes.TIMEOUTS['gpu_name']
+        try:
+            if platform.system() == "Windows":
+                gpu_lines = FetchProbes._powershell(
+                    "Get-CimInstance -ClassName Win32_VideoController | Select-Object -ExpandProperty Name",
+                    timeout).split('\n')
+                # Берем первую видеокарту (основную)
+                if gpu_lines and gpu_lines[0].strip():
+                    return gpu_lines[0].strip()
+            else:
+                result = subprocess.run(['lspci'], capture_output=True, text=True, timeout=timeout)
+                for line in result.stdout.split('\n'):
+                    if 'VGA' in line or 'Display' in line:
+                        return line.split(':')[-1].strip()
+        except Exception:
+            pass
+        return "Unknown GPU"
+    
+    @staticmethod
+    def local_ip():
+        """Локальный IP (адрес интерфейса маршрута по умолчанию)"""
+        import socket
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.settimeout(FetchProbes.TIMEOUTS['local_ip'])
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+        except OSError:
+            return "N/A"
+        finally:
+            s.close()
+    
+    @staticmethod
+    def cpu_temp():
+        """Температура первого найденного датчика"""
+        temps = psutil.sensors_temperatures() if hasattr(psutil, 'sensors_temperatures') else {}
+        for name, entries in (temps or {}).items():
+            if entries:
+                return f"{entries[0].current}°C"
+        return "N/A"
+    
+    @staticmethod
+    def process_count():
+        """Количество процессов"""
+        return str(len(psutil.pids()))
+    
+    @staticmethod
+    def cpu_usage():
+        """Загрузка CPU из фонового сэмплера"""
+        return f"{get_cpu_sampler().latest(FetchProbes.TIMEOUTS['cpu_usage'])[0]}%"
+    
+    @staticmethod
+    def disk():
+        """Использование корневого раздела"""
+        disk = psutil.disk_usage('/')
+        return f"{SystemMonitor.get_size(disk.used)} / {SystemMonitor.get_size(disk.total)} ({disk.percent}%)"
+    
+    @staticmethod
+    def run(names=None, timeouts=None):
+        """Параллельный запуск проб с собственным сроком у каждой
+        
+        Общее время ограничено самым долгим допустимым сроком, а не суммой;
+        проба, не успевшая к сроку или упавшая, дает "N/A".
+        """
+        timeouts = timeouts or FetchProbes.TIMEOUTS
+        names = list(names or timeouts)
+        results = {}
+        
+        def worker(name):
+            try:
+                results[name] = getattr(FetchProbes, name)()
+            except Exception:
+                results[name] = "N/A"
+        
+        started = time.monotonic()
+        threads = []
+        for name in names:
+            thread = threading.Thread(target=worker, args=(name,), name=f'probe-{name}', daemon=True)
+            thread.start()
+            threads.append((name, thread))
+        
+        for name, thread in threads:
+            thread.join(max(started + timeouts[name] - time.monotonic(), 0))
+        # Копия: опоздавшие пробы не должны менять уже выданный результат
+        return {name: results.get(name, "N/A") for name in names}
+
+
+class FactsCache:
+    """Кэш неизменных до перезагрузки фактов об оборудовании для ByredFetch
+    
+    Название CPU/GPU, число ядер, ядро ОС и имя хоста хранятся в JSON
+    и используются, пока совпадают время загрузки и имя хоста.
+    """
+    
+    VERSION = 1
+    # Факты, которые требуют медленных проб (PowerShell, lspci)
+    PROBED = ('cpu_name', 'gpu_name')
+    # Допуск сравнения boot_time: на некоторых системах он "плавает"
+    BOOT_TIME_TOLERANCE = 2.0
+    
+    def __init__(self, path=None):
+        self.path = path or os.path.join(FactsCache.cache_dir(), 'facts.json')
+    
+    @staticmethod
+    def cache_dir():
+        """Каталог кэша программы"""
+        if os.name == 'nt':
+            base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        else:
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'systeminfo')
+    
+    @staticmethod
+    def _key():
+        import platform
+        return psutil.boot_time(), platform.node()
+    
+    def load(self):
+        """Факты из кэша или None, если кэша нет или система перезагружалась"""
+        import json
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        boot_time, hostname = self._key()
+        if (data.get('version') != self.VERSION or data.get('hostname') != hostname
+                or abs(data.get('boot_time', 0) - boot_time) > self.BOOT_TIME_TOLERANCE):
+            return None
+        return data.get('facts')
+    
+    def save(self, facts):
+        """Сохранение фактов (непробованные/не полученные значения не кэшируются)"""
+        import json
+        if any(facts.get(name) in (None, "N/A") for name in self.PROBED):
+            return False
+        boot_time, hostname = self._key()
+        data = {'version': self.VERSION, 'boot_time': boot_time, 'hostname': hostname, 'facts': facts}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return False
+        return True
+    
+    @staticmethod
+    def build(probes):
+        """Сбор фактов из результатов проб и дешевых вызовов"""
+        import platform
+        return {
+            'cpu_name': probes.get('cpu_name'),
+            'gpu_name': probes.get('gpu_name'),
+            'cores': psutil.cpu_count(logical=False),
+            'threads': psutil.cpu_count(logical=True),
+            'system': platform.system(),
+            'kernel': platform.release(),
+            'hostname': platform.node(),
+        }
+
+
+def show_neofetch(refresh=False, pause=True):
+    """Показать красивый neofetch с логотипом ByredHub
+    
+    refresh=True заново определяет оборудование, не доверяя кэшу фактов;
+    pause=False не ждет Enter (для вызова из командной строки).
+    """
+    import platform
+    from datetime import datetime
+    TerminalRenderer.clear_screen()
+    
+    # Факты об оборудовании берутся из кэша до перезагрузки системы
+    cache = FactsCache()
+    facts = None if refresh else cache.load()
+    
+    # Медленные пробы (PowerShell, lspci, сеть, датчики) запускаются параллельно
+    names = [name for name in FetchProbes.TIMEOUTS if facts is None or name not in FactsCache.PROBED]
+    probes = FetchProbes.run(names)
+    if facts is None:
+        facts = FactsCache.build(probes)
+        cache.save(facts)
     
     # ASCII логотип - красивый и ровный
     logo = [
@@ -374,80 +3684,14 @@ def show_neofetch():
     
     # Получение информации
     username = os.getenv('USERNAME') or os.getenv('USER') or 'User'
-    hostname = platform.node()
-    
-    # CPU информация - улучшенное определение через PowerShell
-    try:
-        if platform.system() == "Windows":
-            # Используем PowerShell вместо wmic
-            result = subprocess.run(
-                ['powershell', '-Command', 
-                 "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty Name"],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            cpu_name = result.stdout.strip()
-            if not cpu_name or 'error' in cpu_name.lower():
-                cpu_name = platform.processor() or "Unknown CPU"
-        else:
-            # Для Linux
-            try:
-                with open('/proc/cpuinfo', 'r') as f:
-                    for line in f:
-                        if 'model name' in line:
-                            cpu_name = line.split(':')[1].strip()
-                            break
-                    else:
-                        cpu_name = platform.processor() or "Unknown CPU"
-            except:
-                cpu_name = platform.processor() or "Unknown CPU"
-    except:
-        cpu_name = platform.processor() or "Unknown CPU"
-    
-    cores = psutil.cpu_count(logical=False)
-    threads = psutil.cpu_count(logical=True)
-    cpu_info = f"{cpu_name} ({cores}C/{threads}T)"
+    hostname = facts['hostname']
     
-    # GPU информация - улучшенное определение через PowerShell
-    try:
-        if platform.system() == "Windows":
-            # Используем PowerShell вместо wmic
-            result = subprocess.run(
-                ['powershell', '-Command',
-                 "Get-CimInstance -ClassName Win32_VideoController | Select-Object -ExpandProperty Name"],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            gpu_lines = result.stdout.strip().split('\n')
-            # Берем первую видеокарту (основную)
-            gpu_name = gpu_lines[0].strip() if gpu_lines and gpu_lines[0].strip() else "Unknown GPU"
-        else:
-            # Для Linux
-            try:
-                result = subprocess.run(
-                    ['lspci'], capture_output=True, text=True
-                )
-                for line in result.stdout.split('\n'):
-                    if 'VGA' in line or 'Display' in line:
-                        gpu_name = line.split(':')[-1].strip()
-                        break
-                else:
-                    gpu_name = "Unknown GPU"
-            except:
-                gpu_name = "Unknown GPU"
-    except:
-        gpu_name = "Unknown GPU"
+    cpu_info = f"{facts['cpu_name']} ({facts['cores']}C/{facts['threads']}T)"
     
     # RAM информация
-    mem = psutil.virtual_memory()
+    mem = get_backend().memory()
     ram_info = f"{SystemMonitor.get_size(mem.used)} / {SystemMonitor.get_size(mem.total)} ({mem.percent}%)"
     
-    # Disk информация
-    disk = psutil.disk_usage('/')
-    disk_info = f"{SystemMonitor.get_size(disk.used)} / {SystemMonitor.get_size(disk.total)} ({disk.percent}%)"
-    
     # Uptime
     boot_time = datetime.fromtimestamp(psutil.boot_time())
     uptime = datetime.now() - boot_time
@@ -467,15 +3711,6 @@ def show_neofetch():
     # Shell
     shell = os.path.basename(os.getenv('SHELL') or os.getenv('ComSpec') or 'Unknown')
     
-    # Local IP
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-    except:
-        local_ip = "N/A"
-    
     # Разрешение экрана
     try:
         if platform.system() == "Windows":
@@ -494,47 +3729,33 @@ def show_neofetch():
     cpu_freq = psutil.cpu_freq()
     cpu_freq_str = f"{cpu_freq.current:.0f}MHz" if cpu_freq else "N/A"
     
-    # Температура (если доступна)
-    try:
-        temps = psutil.sensors_temperatures() if hasattr(psutil, 'sensors_temperatures') else {}
-        cpu_temp = "N/A"
-        if temps:
-            for name, entries in temps.items():
-                if entries:
-                    cpu_temp = f"{entries[0].current}°C"
-                    break
-    except:
-        cpu_temp = "N/A"
-    
     # Версия Python
     python_ver = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
     
-    # Количество процессов
-    process_count = len(psutil.pids())
-    
     separator = f"{Colors.BRIGHT_CYAN}{'─' * 50}{Colors.ENDC}"
     
     # Информационные строки - красиво выровненные
     info = [
         f"{Colors.BRIGHT_GREEN}{Colors.BOLD}{username}@{hostname}{Colors.ENDC}",
         separator,
-        f"{Colors.CYAN}🖥️  OS{Colors.ENDC}          {Colors.WHITE}{platform.system()} {platform.release()}{Colors.ENDC}",
+        f"{Colors.CYAN}🖥️  OS{Colors.ENDC}          {Colors.WHITE}{facts['system']} {facts['kernel']}{Colors.ENDC}",
         f"{Colors.CYAN}🏠 Host{Colors.ENDC}        {Colors.WHITE}{hostname}{Colors.ENDC}",
-        f"{Colors.CYAN}🔧 Kernel{Colors.ENDC}      {Colors.WHITE}{platform.release()}{Colors.ENDC}",
+        f"{Colors.CYAN}🔧 Kernel{Colors.ENDC}      {Colors.WHITE}{facts['kernel']}{Colors.ENDC}",
         f"{Colors.YELLOW}⏱️  Uptime{Colors.ENDC}      {Colors.WHITE}{uptime_str}{Colors.ENDC}",
         f"{Colors.YELLOW}📦 Shell{Colors.ENDC}       {Colors.WHITE}{shell}{Colors.ENDC}",
         f"{Colors.WHITE}🔲 Resolution{Colors.ENDC}  {Colors.WHITE}{resolution}{Colors.ENDC}",
         separator,
         f"{Colors.BRIGHT_YELLOW}⚡ CPU{Colors.ENDC}         {Colors.WHITE}{cpu_info}{Colors.ENDC}",
-        f"{Colors.BRIGHT_CYAN}📊 CPU Usage{Colors.ENDC}   {Colors.WHITE}{psutil.cpu_percent(interval=0.5)}%{Colors.ENDC}",
+        f"{Colors.BRIGHT_CYAN}📊 CPU Usage{Colors.ENDC}   {Colors.WHITE}{probes['cpu_usage']}{Colors.ENDC}",
         f"{Colors.BRIGHT_CYAN}🔥 CPU Freq{Colors.ENDC}    {Colors.WHITE}{cpu_freq_str}{Colors.ENDC}",
-        f"{Colors.BRIGHT_MAGENTA}🎮 GPU{Colors.ENDC}         {Colors.WHITE}{gpu_name}{Colors.ENDC}",
+        f"{Colors.BRIGHT_RED}🌡️  CPU Temp{Colors.ENDC}    {Colors.WHITE}{probes['cpu_temp']}{Colors.ENDC}",
+        f"{Colors.BRIGHT_MAGENTA}🎮 GPU{Colors.ENDC}         {Colors.WHITE}{facts['gpu_name']}{Colors.ENDC}",
         f"{Colors.BRIGHT_GREEN}💾 Memory{Colors.ENDC}      {Colors.WHITE}{ram_info}{Colors.ENDC}",
-        f"{Colors.BRIGHT_BLUE}💿 Disk{Colors.ENDC}        {Colors.WHITE}{disk_info}{Colors.ENDC}",
+        f"{Colors.BRIGHT_BLUE}💿 Disk{Colors.ENDC}        {Colors.WHITE}{probes['disk']}{Colors.ENDC}",
         separator,
-        f"{Colors.YELLOW}🌐 Local IP{Colors.ENDC}    {Colors.WHITE}{local_ip}{Colors.ENDC}",
+        f"{Colors.YELLOW}🌐 Local IP{Colors.ENDC}    {Colors.WHITE}{probes['local_ip']}{Colors.ENDC}",
         f"{Colors.BRIGHT_MAGENTA}🐍 Python{Colors.ENDC}      {Colors.WHITE}{python_ver}{Colors.ENDC}",
-        f"{Colors.CYAN}⚙️  Processes{Colors.ENDC}   {Colors.WHITE}{process_count}{Colors.ENDC}",
+        f"{Colors.CYAN}⚙️  Processes{Colors.ENDC}   {Colors.WHITE}{probes['process_count']}{Colors.ENDC}",
         separator,
     ]
     
@@ -560,7 +3781,28 @@ def show_neofetch():
         print(f"{logo_line}  {info_line}")
     
     print(f"\n{Colors.ENDC}")
-    input(f"{Colors.YELLOW}Нажмите Enter для продолжения...{Colors.ENDC}")
+    if pause:
+        input(f"{Colors.YELLOW}Нажмите Enter для продолжения...{Colors.ENDC}")
+
+
+def replay_recording(path, start=0, since=None, count=None, stream=None):
+    """Вывод записи сеанса строками JSON {столбец: значение}
+    
+    since - unix-время первого кадра (важнее start), count - сколько кадров.
+    """
+    import json
+    stream = stream or sys.stdout
+    with Recording(path) as recording:
+        total = len(recording)
+        if since is not None:
+            start = recording.index_at(since)
+        stop = None if count is None else start + count
+        print(f"{Colors.CYAN}{path}: кадров {total}, столбцов {len(recording.columns)}, "
+              f"интервал {recording.header['interval']:g}с{Colors.ENDC}", file=sys.stderr)
+        columns = recording.columns
+        for frame in recording.frames(start, stop):
+            stream.write(json.dumps(dict(zip(columns, frame)), separators=(',', ':')) + '\n')
+    return total
 
 
 def print_menu():
@@ -569,7 +3811,7 @@ def print_menu():
 {Colors.BOLD}{Colors.YELLOW}📋 ГЛАВНОЕ МЕНЮ:{Colors.ENDC}
 
 {Colors.GREEN}МОНИТОРИНГ:{Colors.ENDC}
-  0  - ByredFetch (Neofetch с логотипом)
+  0  - ByredFetch (Neofetch с логотипом), 0r - с обновлением кэша
   1  - Информация о системе
   2  - Информация о CPU
   3  - Информация о памяти
@@ -581,10 +3823,15 @@ def print_menu():
 
 {Colors.GREEN}УПРАВЛЕНИЕ:{Colors.ENDC}
   9  - Очистить временные файлы
-  10 - Завершить процесс (по PID)
+  10 - Завершить процессы (PID, дерево, имя или шаблон)
 
 {Colors.GREEN}ДРУГОЕ:{Colors.ENDC}
   11 - Непрерывный мониторинг CPU/RAM
+  12 - Анализ места на диске (самые большие каталоги и файлы)
+  13 - Сетевые соединения по процессам
+  14 - Дерево процессов (с суммами по поддеревьям)
+  15 - Поиск процессов (имя, пользователь, cmdline, cgroup, состояние)
+  16 - События процессов (запуски и завершения)
   99 - Выход
 
 {Colors.CYAN}{'='*70}{Colors.ENDC}
@@ -592,41 +3839,786 @@ def print_menu():
     print(menu)
 
 
-def continuous_monitor():
-    """Непрерывный мониторинг"""
-    print(f"{Colors.YELLOW}🔄 Непрерывный мониторинг (Ctrl+C для выхода){Colors.ENDC}\n")
+class AlertRule:
+    """Правило оповещения, разобранное из строки
+    
+    Синтаксис (одно правило на строку, # - комментарий):
+        метрика[:экземпляр] оп значение[ед.] [for длит.] [clear значение] [cooldown длит.] [-> действие]
+        process ИМЯ absent|present [for ...] [cooldown ...] [-> действие]
+    Без экземпляра правило проверяется для каждого экземпляра метрики
+    (любой раздел, любое ядро). Действия: exec "команда", webhook URL, log.
+    Примеры:
+        cpu > 90% for 30s clear 80% cooldown 5m -> exec "notify-send 'CPU'"
+        disk_free < 5GB -> webhook http://127.0.0.1:9000/alert
+        process nginx absent for 10s -> exec "systemctl restart nginx"
+    """
+    __slots__ = ('index', 'text', 'metric', 'instance', 'op', 'test', 'threshold', 'clear',
+                 'duration', 'cooldown', 'action', 'target')
+    
+    OPERATORS = {'>': 'gt', '>=': 'ge', '<': 'lt', '<=': 'le', '==': 'eq', '!=': 'ne'}
+    UNITS = {'': 1, '%': 1, 'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3, 'tb': 1024 ** 4,
+             'bit': 1, 'kbit': 1e3, 'mbit': 1e6, 'gbit': 1e9}
+    DURATIONS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    ACTIONS = ('exec', 'webhook', 'log')
+    
+    def __init__(self, index, text):
+        self.index = index
+        self.text = text
+        self.instance = None
+        self.duration = 0.0
+        self.cooldown = 0.0
+        self.action, self.target = 'log', None
+        
+        import re
+        import shlex
+        tokens = shlex.split(text)
+        if len(tokens) >= 3 and tokens[0] == 'process' and tokens[2] in ('absent', 'present'):
+            # Сахар: process ИМЯ absent -> process:ИМЯ < 1
+            self.metric, self.instance = 'process', tokens[1]
+            self.op, self.threshold = ('<', 1) if tokens[2] == 'absent' else ('>=', 1)
+            rest = tokens[3:]
+        else:
+            keywords = ('for', 'clear', 'cooldown', '->')
+            split = next((i for i, token in enumerate(tokens) if token in keywords), len(tokens))
+            condition, rest = ''.join(tokens[:split]), tokens[split:]
+            match = re.fullmatch(r'([\w.]+)(?::(\S+?))?(>=|<=|==|!=|>|<)([-\d.]+)([A-Za-z%]*)(?:/s)?', condition)
+            if match is None:
+                raise ValueError(f"не удалось разобрать условие: {condition!r}")
+            self.metric, self.instance, self.op = match.group(1), match.group(2), match.group(3)
+            self.threshold = self._value(match.group(4), match.group(5))
+        self.clear = self.threshold
+        
+        while rest:
+            keyword = rest.pop(0)
+            if keyword == '->':
+                if not rest or rest[0] not in self.ACTIONS:
+                    raise ValueError(f"действие должно быть одним из: {', '.join(self.ACTIONS)}")
+                self.action = rest.pop(0)
+                if self.action != 'log':
+                    if not rest:
+                        raise ValueError(f"для {self.action} нужен аргумент")
+                    self.target = rest.pop(0)
+            elif keyword in ('for', 'cooldown', 'clear') and rest:
+                value = rest.pop(0)
+                if keyword == 'clear':
+                    number = re.fullmatch(r'([-\d.]+)([A-Za-z%]*)(?:/s)?', value)
+                    if number is None:
+                        raise ValueError(f"неверное значение clear: {value!r}")
+                    self.clear = self._value(number.group(1), number.group(2))
+                else:
+                    setattr(self, 'duration' if keyword == 'for' else 'cooldown', self._duration(value))
+            else:
+                raise ValueError(f"неожиданное слово: {keyword!r}")
+        
+        # Сравнение один раз превращается в функцию operator
+        import operator
+        self.test = getattr(operator, self.OPERATORS[self.op])
+    
+    @classmethod
+    def _value(cls, number, unit):
+        scale = cls.UNITS.get(unit.lower())
+        if scale is None:
+            raise ValueError(f"неизвестная единица: {unit!r}")
+        return float(number) * scale
+    
+    @classmethod
+    def _duration(cls, text):
+        import re
+        match = re.fullmatch(r'([\d.]+)(ms|s|m|h)?', text)
+        if match is None:
+            raise ValueError(f"неверная длительность: {text!r}")
+        return float(match.group(1)) * cls.DURATIONS[match.group(2) or 's']
+    
+    def __repr__(self):
+        return f"AlertRule({self.text!r})"
+
+
+class AlertState:
+    """Состояние правила для одного экземпляра метрики"""
+    __slots__ = ('since', 'firing', 'last_fired')
+    
+    def __init__(self):
+        self.since = None
+        self.firing = False
+        self.last_fired = None
+
+
+class AlertEngine:
+    """Проверка правил оповещений на каждом замере
+    
+    Правила разбираются один раз и группируются по метрикам; собираются
+    только метрики, на которые есть правила (разделы, процессы и т.п.
+    не трогаются без нужды). Срабатывание требует выполнения условия в
+    течение for, снимается только при пересечении уровня clear
+    (гистерезис), повторное срабатывание - не чаще cooldown. Действия
+    (команда, webhook) запускаются в фоне и не задерживают проверку.
+    
+    Метрики: cpu, core (по ядрам), mem, swap (%), disk (% занято),
+    disk_free (байт), disk_busy (%), disk_read/disk_write (байт/с),
+    net_rx/net_tx (бит/с), net_errors (в секунду), process (число по имени).
+    """
+    
+    METRICS = ('cpu', 'core', 'mem', 'swap', 'disk', 'disk_free', 'disk_busy', 'disk_read', 'disk_write',
+               'net_rx', 'net_tx', 'net_errors', 'process')
+    
+    # Процессы пересчитываются реже остальных метрик (секунды): это обход всего /proc
+    PROCESS_INTERVAL = 5.0
+    
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.by_metric = {}
+        for rule in self.rules:
+            if rule.metric not in self.METRICS:
+                raise ValueError(f"правило {rule.index}: неизвестная метрика {rule.metric!r} "
+                                 f"(доступны: {', '.join(self.METRICS)})")
+            if rule.metric == 'process' and not rule.instance:
+                raise ValueError(f"правило {rule.index}: для process нужно имя процесса")
+            self.by_metric.setdefault(rule.metric, []).append(rule)
+        self.states = {}
+        self.firing = {}
+        self.errors = 0
+        # Последние значения метрик и ключи правил, ждущих for/cooldown:
+        # неизменившаяся метрика без ожидающих правил не перепроверяется
+        self._last = {}
+        self._pending = {}
+        self._process_counts = None
+        self._process_scanned = None
+    
+    @staticmethod
+    def load(path):
+        """Движок из файла правил"""
+        rules = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                try:
+                    rules.append(AlertRule(number, line))
+                except ValueError as e:
+                    raise ValueError(f"{path}:{number}: {e}")
+        return AlertEngine(rules)
+    
+    def collect(self):
+        """Текущие значения нужных метрик: {метрика: {экземпляр: значение}}"""
+        wanted = self.by_metric
+        sample = {}
+        if 'cpu' in wanted or 'core' in wanted:
+            total, percpu, _ = get_cpu_sampler().latest()
+            sample['cpu'] = {'': total}
+            sample['core'] = {str(i): value for i, value in enumerate(percpu)}
+        if 'mem' in wanted or 'swap' in wanted:
+            mem = get_backend().memory()
+            sample['mem'] = {'': mem.percent}
+            sample['swap'] = {'': mem.swap_percent}
+        if 'disk' in wanted or 'disk_free' in wanted:
+            used, free = {}, {}
+            for partition in psutil.disk_partitions():
+                try:
+                    usage = psutil.disk_usage(partition.mountpoint)
+                except OSError:
+                    continue
+                used[partition.mountpoint] = usage.percent
+                free[partition.mountpoint] = usage.free
+            sample['disk'], sample['disk_free'] = used, free
+        if {'disk_busy', 'disk_read', 'disk_write'}.intersection(wanted):
+            rates = get_disk_tracker().latest()
+            sample['disk_busy'] = {r.device: r.busy_percent for r in rates}
+            sample['disk_read'] = {r.device: r.read_bps for r in rates}
+            sample['disk_write'] = {r.device: r.write_bps for r in rates}
+        if {'net_rx', 'net_tx', 'net_errors'}.intersection(wanted):
+            rates = get_net_tracker().latest()
+            sample['net_rx'] = {r.interface: r.rx_bps for r in rates}
+            sample['net_tx'] = {r.interface: r.tx_bps for r in rates}
+            sample['net_errors'] = {r.interface: r.errors_ps for r in rates}
+        if 'process' in wanted:
+            counts = self._count_processes()
+            sample['process'] = {rule.instance: float(counts.get(rule.instance, 0))
+                                 for rule in wanted['process']}
+        return sample
+    
+    def _count_processes(self):
+        """Число процессов по именам (не чаще раза в PROCESS_INTERVAL)
+        
+        Читаются только имена, без полного обновления таблицы процессов;
+        между обходами правила проверяются по прошлому подсчету.
+        """
+        now = time.monotonic()
+        if self._process_counts is None or now - self._process_scanned >= self.PROCESS_INTERVAL:
+            counts = {}
+            for proc in psutil.process_iter(['name']):
+                name = proc.info['name']
+                counts[name] = counts.get(name, 0) + 1
+            self._process_counts = counts
+            self._process_scanned = now
+        return self._process_counts
+    
+    def check(self, sample, now=None):
+        """Проверка правил по замеру; возвращает новые события AlertEvent"""
+        now = time.time() if now is None else now
+        events = []
+        states = self.states
+        for metric, rules in self.by_metric.items():
+            values = sample.get(metric)
+            if not values:
+                continue
+            pending = self._pending.setdefault(metric, set())
+            if not pending and self._last.get(metric) == values:
+                continue
+            self._last[metric] = dict(values)
+            for rule in rules:
+                if rule.instance is not None:
+                    value = values.get(rule.instance)
+                    items = () if value is None else ((rule.instance, value),)
+                else:
+                    items = values.items()
+                for instance, value in items:
+                    key = (rule.index, instance)
+                    state = states.get(key)
+                    if state is None:
+                        state = states[key] = AlertState()
+                    if state.firing:
+                        # Гистерезис: снимается только за уровнем clear
+                        if not rule.test(value, rule.clear):
+                            state.firing = False
+                            state.since = None
+                            self.firing.pop(key, None)
+                            events.append(AlertEvent(rule.text, metric, instance, value, 'resolved', now))
+                    elif rule.test(value, rule.threshold):
+                        if state.since is None:
+                            state.since = now
+                        if (now - state.since >= rule.duration
+                                and (state.last_fired is None or now - state.last_fired >= rule.cooldown)):
+                            pending.discard(key)
+                            state.firing = True
+                            state.last_fired = now
+                            event = AlertEvent(rule.text, metric, instance, value, 'firing', now)
+                            self.firing[key] = event
+                            events.append(event)
+                            self._act(rule, event)
+                        else:
+                            pending.add(key)
+                    else:
+                        state.since = None
+                        pending.discard(key)
+        return events
+    
+    def _act(self, rule, event):
+        """Запуск действия правила в фоне"""
+        if rule.action == 'exec':
+            import subprocess
+            env = dict(os.environ, ALERT_RULE=event.rule, ALERT_METRIC=event.metric,
+                       ALERT_INSTANCE=event.instance, ALERT_VALUE=f"{event.value:g}", ALERT_STATE=event.state)
+            try:
+                subprocess.Popen(rule.target, shell=True, env=env,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except OSError:
+                self.errors += 1
+        elif rule.action == 'webhook':
+            threading.Thread(target=self._post, args=(rule.target, event), daemon=True).start()
+    
+    def _post(self, url, event):
+        import json
+        import urllib.request
+        request = urllib.request.Request(url, data=json.dumps(event.as_dict()).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception:
+            self.errors += 1
+
+
+class NdjsonWriter:
+    """Поток замеров непрерывного мониторинга в формате NDJSON
+    
+    Строка собирается готовыми %-шаблонами без промежуточных словарей,
+    имена устройств экранируются один раз и кэшируются; каждый замер -
+    одна запись в поток. flush_every: сбрасывать буфер каждые N замеров
+    (0 - оставить на усмотрение буфера потока).
+    
+    Поля: ts (unix-время), cpu и percpu (%), mem (%, байты), disk (корень),
+    disks (байт/с, IOPS, мс, % занятости), net (байт/с), nics (бит/с, пакетов/с,
+    ошибок и отбрасываний в секунду).
+    """
+    
+    SAMPLE = ('{"ts":%.3f,"cpu":%.1f,"percpu":[%s],'
+              '"mem":{"percent":%.1f,"used":%d,"total":%d,"swap_percent":%.1f},'
+              '"disk":{"percent":%.1f,"free":%d},"disks":{%s},'
+              '"net":{"sent":%.0f,"recv":%.0f},"nics":{%s}}\n')
+    DISK = '%s:{"read":%.0f,"write":%.0f,"iops":%.1f,"latency_ms":%.2f,"busy":%.1f}'
+    NIC = '%s:{"rx_bps":%.0f,"tx_bps":%.0f,"pps":%.1f,"errors":%.1f,"drops":%.1f}'
+    
+    def __init__(self, stream, flush_every=1):
+        self.stream = stream
+        self.flush_every = flush_every
+        self.samples = 0
+        self._names = {}
+    
+    def _name(self, name):
+        quoted = self._names.get(name)
+        if quoted is None:
+            import json
+            quoted = self._names[name] = json.dumps(name)
+        return quoted
+    
+    def write(self, timestamp, cpu, percpu, mem, disk, disk_rates, sent, recv, net_rates):
+        """Запись одного замера"""
+        disk_template, nic_template, name = self.DISK, self.NIC, self._name
+        disks = ','.join([
+            disk_template % (name(r.device), r.read_bps, r.write_bps, r.read_iops + r.write_iops,
+                             r.latency_ms, r.busy_percent)
+            for r in disk_rates
+        ])
+        nics = ','.join([
+            nic_template % (name(r.interface), r.rx_bps, r.tx_bps, r.rx_pps + r.tx_pps, r.errors_ps, r.drops_ps)
+            for r in net_rates
+        ])
+        self.stream.write(self.SAMPLE % (
+            timestamp, cpu, ','.join(['%.1f' % p for p in percpu]),
+            mem.percent, mem.used, mem.total, mem.swap_percent,
+            disk.percent, disk.free, disks, sent, recv, nics,
+        ))
+        self.samples += 1
+        if self.flush_every and self.samples % self.flush_every == 0:
+            self.stream.flush()
+
+
+class RecordingWriter:
+    """Запись сеанса мониторинга в компактный бинарный файл
+    
+    Формат: MAGIC, длина и JSON-заголовок со схемой (имена столбцов и их
+    множители), затем кадры: заголовок struct '<BH' (тип, длина данных) и
+    значения столбцов - целые в zigzag-varint. Ключевой кадр хранит значения
+    целиком, остальные - разницу с предыдущим кадром; ключевые кадры идут
+    каждые keyframe_every кадров, так что чтение с любого места не требует
+    разбора файла с начала.
+    """
+    
+    MAGIC = b'SYSREC\x00\x01'
+    FRAME = '<BH'
+    KEYFRAME, DELTA = 0, 1
+    
+    def __init__(self, path, columns, interval=1.0, keyframe_every=60):
+        import json
+        import struct
+        # columns - [(имя, множитель)]: значение хранится как round(value * множитель)
+        self.columns = [(name, scale) for name, scale in columns]
+        self.keyframe_every = keyframe_every
+        self.frames = 0
+        self._frame = struct.Struct(self.FRAME)
+        self._previous = None
+        self._file = open(path, 'wb')
+        header = json.dumps({
+            'version': 1, 'interval': interval, 'keyframe_every': keyframe_every,
+            'columns': [{'name': name, 'scale': scale} for name, scale in self.columns],
+        }, ensure_ascii=False).encode('utf-8')
+        self._file.write(self.MAGIC + struct.pack('<I', len(header)) + header)
+    
+    @staticmethod
+    def _put(out, value):
+        # zigzag: знак в младшем бите, затем varint по 7 бит
+        value = value * 2 if value >= 0 else -value * 2 - 1
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    
+    def write(self, values):
+        """Запись кадра (значения в порядке столбцов схемы)"""
+        if len(values) != len(self.columns):
+            # Лишнее или недостающее значение сдвинуло бы все следующие столбцы
+            raise ValueError(f"кадр из {len(values)} значений, а в схеме {len(self.columns)} столбцов")
+        current = [int(round(value * scale)) for value, (_, scale) in zip(values, self.columns)]
+        previous = self._previous
+        payload = bytearray()
+        put = self._put
+        if previous is None or self.frames % self.keyframe_every == 0:
+            kind = self.KEYFRAME
+            for value in current:
+                put(payload, value)
+        else:
+            kind = self.DELTA
+            for value, before in zip(current, previous):
+                put(payload, value - before)
+        self._file.write(self._frame.pack(kind, len(payload)) + payload)
+        self._previous = current
+        self.frames += 1
+    
+    def flush(self):
+        self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+
+class Recording:
+    """Чтение записи сеанса через mmap с индексом кадров
+    
+    Индекс (смещения кадров, номера и метки времени ключевых кадров)
+    строится одним проходом по заголовкам кадров без распаковки данных;
+    кадр восстанавливается от ближайшего предшествующего ключевого кадра.
+    Оборванный последний кадр (запись прервана) игнорируется.
+    """
+    
+    def __init__(self, path):
+        import json
+        import mmap
+        import struct
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: пустой файл")
+        magic = RecordingWriter.MAGIC
+        if self._map[:len(magic)] != magic:
+            self.close()
+            raise ValueError(f"{path}: не запись мониторинга")
+        size, = struct.unpack_from('<I', self._map, len(magic))
+        start = len(magic) + 4
+        self.header = json.loads(self._map[start:start + size].decode('utf-8'))
+        self.columns = [column['name'] for column in self.header['columns']]
+        self._scales = [column['scale'] for column in self.header['columns']]
+        self._frame = struct.Struct(RecordingWriter.FRAME)
+        self._data_start = start + size
+        self._offsets = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def __len__(self):
+        self._build_index()
+        return len(self._offsets)
+    
+    def close(self):
+        self._map.close()
+        self._file.close()
+    
+    def _build_index(self):
+        if self._offsets is not None:
+            return
+        offsets = array('Q')
+        key_frames = array('Q')
+        key_times = array('q')
+        data, unpack, header_size = self._map, self._frame.unpack_from, self._frame.size
+        pos, end = self._data_start, len(self._map)
+        while pos + header_size <= end:
+            kind, length = unpack(data, pos)
+            if pos + header_size + length > end:
+                break
+            if kind == RecordingWriter.KEYFRAME:
+                key_frames.append(len(offsets))
+                key_times.append(self._decode(pos + header_size, 1)[0])
+            offsets.append(pos)
+            pos += header_size + length
+        self._offsets, self._key_frames, self._key_times = offsets, key_frames, key_times
+    
+    def _decode(self, pos, count):
+        data = self._map
+        values = []
+        for _ in range(count):
+            result = shift = 0
+            while True:
+                byte = data[pos]
+                pos += 1
+                result |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            values.append((result >> 1) ^ -(result & 1))
+        return values
+    
+    def _raw(self, start, stop):
+        """Целочисленные значения кадров start..stop-1 (от ближайшего ключевого)"""
+        import bisect
+        self._build_index()
+        key = self._key_frames[bisect.bisect_right(self._key_frames, start) - 1]
+        count, header_size = len(self.columns), self._frame.size
+        current = None
+        for index in range(key, stop):
+            offset = self._offsets[index]
+            values = self._decode(offset + header_size, count)
+            if self._map[offset] == RecordingWriter.KEYFRAME:
+                current = values
+            else:
+                current = [a + b for a, b in zip(current, values)]
+            if index >= start:
+                yield current
+    
+    def frames(self, start=0, stop=None):
+        """Кадры start..stop-1 как кортежи значений (в порядке columns)"""
+        length = len(self)
+        stop = length if stop is None else min(stop, length)
+        start = max(start, 0)
+        if start >= stop:
+            return
+        scales = self._scales
+        for raw in self._raw(start, stop):
+            # Столбцы с множителем 1 остаются целыми
+            yield tuple(value / scale if scale != 1 else value for value, scale in zip(raw, scales))
+    
+    def frame(self, index):
+        """Один кадр по номеру (отрицательный - с конца)"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return next(self.frames(index, index + 1))
+    
+    def index_at(self, timestamp):
+        """Номер первого кадра не раньше timestamp (первый столбец - время)"""
+        import bisect
+        self._build_index()
+        target = int(round(timestamp * self._scales[0]))
+        position = bisect.bisect_right(self._key_times, target) - 1
+        if position < 0:
+            return 0
+        index = self._key_frames[position]
+        # Внутри участка до следующего ключевого кадра разбирается только время
+        header_size = self._frame.size
+        current = None
+        while index < len(self._offsets):
+            offset = self._offsets[index]
+            value = self._decode(offset + header_size, 1)[0]
+            current = value if self._map[offset] == RecordingWriter.KEYFRAME else current + value
+            if current >= target:
+                return index
+            index += 1
+        return index
+
+
+def format_alert(event):
+    """Строка события оповещения"""
+    from datetime import datetime
+    color, mark = (Colors.RED, "🚨") if event.state == 'firing' else (Colors.GREEN, "✅")
+    instance = f"[{event.instance}]" if event.instance else ""
+    return (f"{color}{mark} {datetime.fromtimestamp(event.timestamp).strftime('%H:%M:%S')} "
+            f"{event.metric}{instance} = {event.value:g}: {event.rule}{Colors.ENDC}")
+
+
+def run_alerts(rules, interval=1.0):
+    """Headless-проверка правил оповещений: события выводятся построчно"""
+    engine = AlertEngine.load(rules) if isinstance(rules, str) else rules
+    scheduler = RefreshScheduler(interval)
+    get_cpu_sampler(scheduler.interval)
+    print(f"{Colors.GREEN}🔔 Правил: {len(engine.rules)}, проверка каждые {scheduler.interval:g}с "
+          f"(Ctrl+C для выхода){Colors.ENDC}", flush=True)
+    try:
+        while True:
+            scheduler.wait()
+            for event in engine.check(engine.collect()):
+                print(format_alert(event), flush=True)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.CYAN}Проверка оповещений остановлена{Colors.ENDC}")
+
+
+def recording_schema(cores, disks, nics):
+    """Столбцы записи сеанса: [(имя, множитель)] для continuous_monitor"""
+    columns = [('ts', 1000), ('cpu', 10)]
+    columns += [(f'cpu{i}', 10) for i in range(cores)]
+    columns += [('mem_percent', 10), ('mem_used', 1), ('swap_percent', 10),
+                ('disk_percent', 10), ('disk_free', 1), ('net_sent', 1), ('net_recv', 1)]
+    for device in disks:
+        columns += [(f'disk.{device}.read', 1), (f'disk.{device}.write', 1), (f'disk.{device}.busy', 10)]
+    for interface in nics:
+        columns += [(f'nic.{interface}.rx_bps', 1), (f'nic.{interface}.tx_bps', 1)]
+    return columns
+
+
+def continuous_monitor(interval=1.0, ndjson=None, flush_every=1, record=None, rules=None):
+    """Непрерывный мониторинг с обновлением каждые interval секунд (от 0.1)
+    
+    ndjson - путь к файлу (дописывается) или '-' для stdout: вместо экрана
+    каждый замер пишется строкой NDJSON (см. NdjsonWriter).
+    record - путь к файлу бинарной записи сеанса (см. RecordingWriter),
+    пишется в дополнение к выводу.
+    rules - файл правил оповещений или AlertEngine: проверяются на каждом замере.
+    """
+    from datetime import datetime
+    writer = None
+    if ndjson is not None:
+        stream = sys.stdout if ndjson == '-' else open(ndjson, 'a', encoding='utf-8', buffering=1 << 16)
+        writer = NdjsonWriter(stream, flush_every)
+        print(f"{Colors.YELLOW}🔄 Запись замеров в NDJSON: {'stdout' if ndjson == '-' else ndjson} "
+              f"(Ctrl+C для выхода){Colors.ENDC}", file=sys.stderr)
+    else:
+        print(f"{Colors.YELLOW}🔄 Непрерывный мониторинг (Ctrl+C для выхода){Colors.ENDC}\n")
+    
+    scheduler = RefreshScheduler(interval)
+    history = MonitorHistory()
+    backend = get_backend()
+    # Сэмплер CPU работает в своем потоке с тем же интервалом - кадр не ждет замера
+    sampler = get_cpu_sampler()
+    sampler_interval = sampler.interval
+    sampler.interval = scheduler.interval
+    disk_tracker = get_disk_tracker()
+    net_tracker = get_net_tracker()
+    renderer = TerminalRenderer()
+    prev_net = backend.net_io_total()
+    prev_time = time.monotonic()
+    
+    def trend(name, maximum=100):
+        return SystemMonitor.create_sparkline(history[name].values(30), maximum=maximum)
     
+    engine = AlertEngine.load(rules) if isinstance(rules, str) else rules
+    
+    recorder = None
+    if record is not None:
+        # Набор устройств фиксируется в схеме при старте записи
+        wait = sampler.interval + CpuSampler.WARMUP
+        disks = [rate.device for rate in disk_tracker.latest(timeout=wait)]
+        nics = [rate.interface for rate in net_tracker.latest(timeout=wait)]
+        # Число ядер - из cpu_count(): список сэмплера пуст, если он еще не готов
+        cores = psutil.cpu_count() or len(sampler.latest()[1])
+        recorder = RecordingWriter(record, recording_schema(cores, disks, nics), scheduler.interval)
+    
+    if writer is None:
+        renderer.start()
     try:
         while True:
-            # Очищаем экран
-            os.system('cls' if os.name == 'nt' else 'clear')
+            scheduler.wait()
+            frame_start = time.perf_counter()
+            
+            # Сбор замера
+            now = time.time()
+            cpu_percent, percpu, _ = sampler.latest()
+            mem = backend.memory()
+            disk = psutil.disk_usage('/')
+            disk_rates = disk_tracker.latest()
+            net = backend.net_io_total()
+            current = time.monotonic()
+            elapsed = current - prev_time
+            sent_rate = (net.bytes_sent - prev_net.bytes_sent) / elapsed if elapsed > 0 else 0.0
+            recv_rate = (net.bytes_recv - prev_net.bytes_recv) / elapsed if elapsed > 0 else 0.0
+            prev_net, prev_time = net, current
+            
+            if engine is not None:
+                for event in engine.check(engine.collect(), now):
+                    if writer is not None:
+                        print(format_alert(event), file=sys.stderr)
+            
+            if recorder is not None:
+                values = [now, cpu_percent]
+                # Под схему: недостающие ядра - нули, лишние (hotplug) отбрасываются
+                values.extend(percpu[:cores])
+                values.extend([0.0] * (cores - len(percpu)))
+                values += [mem.percent, mem.used, mem.swap_percent, disk.percent, disk.free,
+                           max(sent_rate, 0.0), max(recv_rate, 0.0)]
+                rates = {rate.device: rate for rate in disk_rates}
+                for device in disks:
+                    rate = rates.get(device)
+                    values += [rate.read_bps, rate.write_bps, rate.busy_percent] if rate else [0, 0, 0]
+                rates = {rate.interface: rate for rate in net_tracker.latest()}
+                for interface in nics:
+                    rate = rates.get(interface)
+                    values += [rate.rx_bps, rate.tx_bps] if rate else [0, 0]
+                recorder.write(values)
+            
+            if writer is not None:
+                writer.write(now, cpu_percent, percpu, mem, disk, disk_rates,
+                             max(sent_rate, 0.0), max(recv_rate, 0.0), net_tracker.latest())
+                continue
             
-            print(f"{Colors.BOLD}{Colors.CYAN}⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{Colors.ENDC}\n")
+            history.record('cpu', cpu_percent, now)
+            for i, percentage in enumerate(percpu):
+                history.record(f'cpu{i}', percentage, now, compact=True)
+            history.record('ram', mem.percent, now)
+            history.record('swap', mem.swap_percent, now)
+            history.record('disk', disk.percent, now)
+            history.record('net_sent', max(sent_rate, 0.0), now)
+            history.record('net_recv', max(recv_rate, 0.0), now)
+            
+            # Сборка кадра
+            lines = [
+                f"{Colors.BOLD}{Colors.CYAN}⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{Colors.ENDC}",
+                "",
+            ]
             
             # CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
             bar = SystemMonitor.create_progress_bar(cpu_percent)
             color = SystemMonitor.get_color_by_percentage(cpu_percent)
-            print(f"{Colors.BOLD}CPU:{Colors.ENDC} {color}{bar} {cpu_percent}%{Colors.ENDC}")
+            lines.append(f"{Colors.BOLD}CPU:{Colors.ENDC} {color}{bar} {cpu_percent}%{Colors.ENDC} {trend('cpu')}")
+            low, avg, high = history['cpu'].window(60, now)
+            lines.append(f"      За минуту: мин {low:.1f}% / сред {avg:.1f}% / макс {high:.1f}%")
+            for i, percentage in enumerate(percpu):
+                color = SystemMonitor.get_color_by_percentage(percentage)
+                lines.append(f"      Ядро {i:<3} {color}{percentage:5.1f}%{Colors.ENDC} {trend(f'cpu{i}')}")
             
             # RAM
-            mem = psutil.virtual_memory()
             bar = SystemMonitor.create_progress_bar(mem.percent)
             color = SystemMonitor.get_color_by_percentage(mem.percent)
-            print(f"{Colors.BOLD}RAM:{Colors.ENDC} {color}{bar} {mem.percent}%{Colors.ENDC}")
-            print(f"      Используется: {SystemMonitor.get_size(mem.used)} / {SystemMonitor.get_size(mem.total)}")
+            lines.append(f"{Colors.BOLD}RAM:{Colors.ENDC} {color}{bar} {mem.percent}%{Colors.ENDC} {trend('ram')}")
+            lines.append(f"      Используется: {SystemMonitor.get_size(mem.used)} / {SystemMonitor.get_size(mem.total)}")
+            if mem.swap_total:
+                bar = SystemMonitor.create_progress_bar(mem.swap_percent)
+                color = SystemMonitor.get_color_by_percentage(mem.swap_percent)
+                lines.append(f"{Colors.BOLD}SWAP:{Colors.ENDC} {color}{bar} {mem.swap_percent}%{Colors.ENDC} {trend('swap')}")
             
             # Диск
-            disk = psutil.disk_usage('/')
             bar = SystemMonitor.create_progress_bar(disk.percent)
             color = SystemMonitor.get_color_by_percentage(disk.percent)
-            print(f"{Colors.BOLD}ДИСК:{Colors.ENDC} {color}{bar} {disk.percent}%{Colors.ENDC}")
-            print(f"       Свободно: {SystemMonitor.get_size(disk.free)} / {SystemMonitor.get_size(disk.total)}")
+            lines.append(f"{Colors.BOLD}ДИСК:{Colors.ENDC} {color}{bar} {disk.percent}%{Colors.ENDC} {trend('disk')}")
+            lines.append(f"       Свободно: {SystemMonitor.get_size(disk.free)} / {SystemMonitor.get_size(disk.total)}")
+            
+            for rate in disk_rates:
+                color = SystemMonitor.get_color_by_percentage(rate.busy_percent)
+                lines.append(
+                    f"       {rate.device:<10} R {SystemMonitor.get_size(rate.read_bps)}/s "
+                    f"W {SystemMonitor.get_size(rate.write_bps)}/s "
+                    f"IOPS {rate.read_iops + rate.write_iops:.0f} {rate.latency_ms:.1f}мс "
+                    f"{color}{rate.busy_percent:.0f}%{Colors.ENDC} "
+                    f"{SystemMonitor.create_sparkline(disk_tracker.history[rate.device + '.busy'].values(20))}")
             
-            time.sleep(2)
+            # Сеть
+            lines.append(f"{Colors.BOLD}СЕТЬ:{Colors.ENDC} ↑ {SystemMonitor.get_size(sent_rate)}/s {trend('net_sent', None)}")
+            lines.append(f"       ↓ {SystemMonitor.get_size(recv_rate)}/s {trend('net_recv', None)}")
+            for rate in net_tracker.latest():
+                if rate.is_up is False:
+                    continue
+                utilisation = f" {rate.utilisation:.0f}%" if rate.utilisation is not None else ""
+                problems = (f" {Colors.RED}err {rate.errors_ps:.0f}/s drop {rate.drops_ps:.0f}/s{Colors.ENDC}"
+                            if rate.errors_ps or rate.drops_ps else "")
+                lines.append(
+                    f"       {rate.interface:<10} ↓ {SystemMonitor.format_bits(rate.rx_bps)} "
+                    f"↑ {SystemMonitor.format_bits(rate.tx_bps)}{utilisation}{problems} "
+                    f"{SystemMonitor.create_sparkline(net_tracker.history[rate.interface + '.rx'].values(20), None)}")
+            
+            if engine is not None:
+                lines.append("")
+                lines.append(f"{Colors.BOLD}ОПОВЕЩЕНИЯ:{Colors.ENDC} правил {len(engine.rules)}, "
+                             f"активно {len(engine.firing)}")
+                for event in list(engine.firing.values())[:5]:
+                    lines.append(f"       {format_alert(event)}")
+            
+            lines.append("")
+            lines.append(f"{Colors.CYAN}История: {len(history['cpu'])} замеров, "
+                         f"{SystemMonitor.get_size(history.nbytes)}{Colors.ENDC}")
+            frame_ms = (time.perf_counter() - frame_start) * 1000
+            missed_color = Colors.RED if scheduler.missed else Colors.CYAN
+            lines.append(f"{Colors.CYAN}Интервал: {scheduler.interval:g}с | кадр: {frame_ms:.1f}мс | "
+                         f"{missed_color}пропущено сроков: {scheduler.missed}{Colors.ENDC}")
+            
+            renderer.render(lines)
             
     except KeyboardInterrupt:
-        print(f"\n{Colors.CYAN}Мониторинг остановлен{Colors.ENDC}\n")
+        if writer is None:
+            renderer.stop()
+            print(f"\n{Colors.CYAN}Мониторинг остановлен{Colors.ENDC}\n")
+        else:
+            print(f"\n{Colors.CYAN}Записано замеров: {writer.samples}{Colors.ENDC}", file=sys.stderr)
+    finally:
+        sampler.interval = sampler_interval
+        if recorder is not None:
+            recorder.close()
+            print(f"{Colors.CYAN}Запись сеанса: {record}, кадров: {recorder.frames}{Colors.ENDC}", file=sys.stderr)
+        if writer is not None:
+            writer.stream.flush()
+            if writer.stream is not sys.stdout:
+                writer.stream.close()
 
 
 def main():
@@ -634,6 +4626,11 @@ def main():
     monitor = SystemMonitor()
     manager = SystemManager()
     
+    # Сэмплер CPU и трекеры стартуют сразу, чтобы к первому запросу данные были готовы
+    get_cpu_sampler()
+    get_disk_tracker()
+    get_net_tracker()
+    
     print_banner()
     
     while True:
@@ -644,9 +4641,9 @@ def main():
             
             if choice == '':
                 continue
-            elif choice == '0':
-                show_neofetch()
-                os.system('cls' if os.name == 'nt' else 'clear')
+            elif choice in ('0', '0r'):
+                show_neofetch(refresh=choice == '0r')
+                TerminalRenderer.clear_screen()
                 print_banner()
                 continue
             elif choice == '1':
@@ -661,7 +4658,7 @@ def main():
                 monitor.get_network_info()
             elif choice == '6':
                 try:
-                    limit = input(f"Количество процессов (по умолчанию 10): ").strip()
+                    limit = input("Количество процессов (по умолчанию 10): ").strip()
                     limit = int(limit) if limit else 10
                     monitor.get_processes_info(limit)
                 except ValueError:
@@ -676,28 +4673,121 @@ def main():
                 monitor.get_network_info()
                 monitor.get_battery_info()
             elif choice == '9':
-                confirm = input(f"{Colors.YELLOW}Вы уверены? (да/нет): {Colors.ENDC}").strip().lower()
-                if confirm in ['да', 'yes', 'y', 'д']:
-                    manager.clean_temp_files()
-            elif choice == '10':
                 try:
-                    pid = int(input("Введите PID процесса: ").strip())
-                    confirm = input(f"{Colors.YELLOW}Завершить процесс {pid}? (да/нет): {Colors.ENDC}").strip().lower()
-                    if confirm in ['да', 'yes', 'y', 'д']:
-                        manager.kill_process(pid)
+                    hours = input("Не трогать файлы моложе N часов (по умолчанию 0): ").strip().replace(',', '.')
+                    min_age = float(hours) * 3600 if hours else 0
                 except ValueError:
-                    print(f"{Colors.RED}❌ PID должен быть числом{Colors.ENDC}")
+                    min_age = 0
+                # Без прав root удаляются только свои файлы
+                uid = os.getuid() if hasattr(os, 'getuid') and os.getuid() != 0 else None
+                preview = manager.clean_temp_files(dry_run=True, min_age=min_age, uid=uid)
+                if preview.files or preview.dirs:
+                    confirm = input(f"{Colors.YELLOW}Вы уверены? (да/нет): {Colors.ENDC}").strip().lower()
+                    if confirm in ['да', 'yes', 'y', 'д']:
+                        manager.clean_temp_files(min_age=min_age, uid=uid)
+            elif choice == '10':
+                target = input("PID, имя процесса или /регулярное выражение/ для командной строки: ").strip()
+                if target.isdigit():
+                    tree = input("Вместе с дочерними процессами? (да/нет): ").strip().lower() in ['да', 'yes', 'y', 'д']
+                    procs = manager.find_targets(pids=[int(target)], tree=tree)
+                elif len(target) > 1 and target.startswith('/') and target.endswith('/'):
+                    procs = manager.find_targets(pattern=target[1:-1])
+                elif target:
+                    procs = manager.find_targets(name=target)
+                else:
+                    procs = []
+                
+                if len(procs) == 1 and target.isdigit():
+                    confirm = input(f"{Colors.YELLOW}Завершить процесс {target}? (да/нет): {Colors.ENDC}").strip().lower()
+                    if confirm in ['да', 'yes', 'y', 'д']:
+                        manager.kill_process(procs[0].pid)
+                elif procs:
+                    for proc in procs[:20]:
+                        try:
+                            print(f"  {proc.pid:<8} {proc.name()}")
+                        except psutil.Error:
+                            pass
+                    if len(procs) > 20:
+                        print(f"  ... и еще {len(procs) - 20}")
+                    confirm = input(f"{Colors.YELLOW}Завершить процессов: {len(procs)}? (да/нет): {Colors.ENDC}").strip().lower()
+                    if confirm in ['да', 'yes', 'y', 'д']:
+                        manager.render_kill_report(manager.kill_processes(procs))
+                else:
+                    print(f"{Colors.RED}❌ Подходящие процессы не найдены{Colors.ENDC}")
             elif choice == '11':
-                continuous_monitor()
+                try:
+                    interval = input("Интервал обновления, сек (по умолчанию 1): ").strip().replace(',', '.')
+                    interval = float(interval) if interval else 1.0
+                except ValueError:
+                    interval = 1.0
+                continuous_monitor(interval)
+            elif choice == '12':
+                path = input("Путь для анализа (по умолчанию /): ").strip() or os.path.abspath(os.sep)
+                try:
+                    top = input("Сколько каталогов/файлов показать (по умолчанию 20): ").strip()
+                    top = int(top) if top else 20
+                except ValueError:
+                    top = 20
+                if os.path.isdir(path):
+                    manager.analyze_disk_usage(path, top)
+                else:
+                    print(f"{Colors.RED}❌ Каталог {path} не найден{Colors.ENDC}")
+            elif choice == '13':
+                try:
+                    limit = input("Сколько процессов показать (по умолчанию 10): ").strip()
+                    limit = int(limit) if limit else 10
+                except ValueError:
+                    limit = 10
+                monitor.get_connections_info(limit)
+            elif choice == '14':
+                try:
+                    depth = input("Максимальная глубина (по умолчанию без ограничения): ").strip()
+                    depth = int(depth) if depth else None
+                    threshold = input("Скрывать поддеревья с CPU% ниже (по умолчанию 0): ").strip().replace(',', '.')
+                    threshold = float(threshold) if threshold else 0.0
+                except ValueError:
+                    depth, threshold = None, 0.0
+                # Порог по CPU без порога по памяти скрыл бы всё; память - от 1% RAM
+                min_rss = psutil.virtual_memory().total // 100 if threshold else 0
+                monitor.get_process_tree_info(depth, threshold, min_rss)
+            elif choice == '15':
+                print(f"{Colors.CYAN}Пустое поле - без фильтра{Colors.ENDC}")
+                name = input("Имя процесса (точно): ").strip()
+                user = input("Пользователь: ").strip()
+                pattern = input("Регулярное выражение для командной строки: ").strip()
+                cgroup = input("Часть пути cgroup: ").strip()
+                status = input("Состояния через запятую (running, sleeping, zombie...): ").strip()
+                try:
+                    query = ProcessQuery(name, user, pattern, cgroup,
+                                         [s.strip() for s in status.split(',') if s.strip()])
+                except Exception as e:
+                    print(f"{Colors.RED}❌ Неверное регулярное выражение: {e}{Colors.ENDC}")
+                else:
+                    interval = input("Обновлять каждые N сек (пусто - один раз): ").strip().replace(',', '.')
+                    try:
+                        interval = float(interval) if interval else None
+                    except ValueError:
+                        interval = None
+                    if interval:
+                        monitor.watch_processes(query, interval=interval)
+                    else:
+                        monitor.find_processes(query)
+            elif choice == '16':
+                try:
+                    interval = input("Интервал опроса, сек (по умолчанию 0.2): ").strip().replace(',', '.')
+                    interval = float(interval) if interval else 0.2
+                except ValueError:
+                    interval = 0.2
+                monitor.watch_lifecycle(interval)
             elif choice == '99':
                 print(f"{Colors.CYAN}👋 До свидания!{Colors.ENDC}")
                 break
             else:
                 print(f"{Colors.RED}❌ Неверная опция!{Colors.ENDC}\n")
             
-            if choice not in ['11', '99', '0']:
+            if choice not in ['11', '99', '0', '0r']:
                 input(f"\n{Colors.YELLOW}Нажмите Enter для продолжения...{Colors.ENDC}")
-                os.system('cls' if os.name == 'nt' else 'clear')
+                TerminalRenderer.clear_screen()
                 print_banner()
                 
         except KeyboardInterrupt:
@@ -707,5 +4797,121 @@ def main():
             print(f"{Colors.RED}❌ Ошибка: {str(e)}{Colors.ENDC}\n")
 
 
+def parse_args(argv=None):
+    """Разбор аргументов командной строки"""
+    import argparse
+    
+    # Параметры сервера метрик объявлены один раз: для --serve и команды serve.
+    # Значения по умолчанию подставляются после разбора, иначе подкоманда
+    # молча затирала бы заданные до нее --host/--port
+    server_defaults = {'host': '127.0.0.1', 'port': 9101, 'ttl': 1.0, 'top': 10}
+    server = argparse.ArgumentParser(add_help=False)
+    server.add_argument('--host', default=argparse.SUPPRESS, help="адрес сервера метрик (по умолчанию 127.0.0.1)")
+    server.add_argument('--port', type=int, default=argparse.SUPPRESS,
+                        help="порт сервера метрик (по умолчанию 9101)")
+    server.add_argument('--ttl', type=float, default=argparse.SUPPRESS,
+                        help="время жизни кэша замеров, сек (по умолчанию 1)")
+    server.add_argument('--top', type=int, default=argparse.SUPPRESS,
+                        help="сколько процессов экспортировать (по умолчанию 10)")
+    
+    parser = argparse.ArgumentParser(parents=[server],
+                                     description="Системный монитор и менеджер. "
+                                                 "Без команды запускается интерактивное меню.")
+    parser.add_argument('--serve', action='store_true',
+                        help="headless-режим: метрики Prometheus по HTTP (то же, что команда serve)")
+    
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--json', action='store_true', help="вывод снимка одной строкой JSON")
+    
+    commands = parser.add_subparsers(dest='command', metavar='команда')
+    commands.add_parser('cpu', parents=[output], help="загрузка и частоты CPU")
+    commands.add_parser('mem', parents=[output], help="RAM и SWAP")
+    commands.add_parser('disks', parents=[output], help="разделы и скорости дисков")
+    commands.add_parser('net', parents=[output], help="интерфейсы и скорости сети")
+    top = commands.add_parser('top', parents=[output], help="топ процессов по CPU")
+    top.add_argument('-n', '--limit', type=int, default=10, help="сколько процессов показать (по умолчанию 10)")
+    fetch = commands.add_parser('fetch', help="ByredFetch")
+    fetch.add_argument('--refresh', action='store_true', help="заново определить оборудование, не доверяя кэшу")
+    watch = commands.add_parser('watch', help="непрерывный мониторинг")
+    watch.add_argument('-i', '--interval', type=float, default=1.0, help="интервал обновления, сек (по умолчанию 1)")
+    watch.add_argument('--ndjson', metavar='ФАЙЛ',
+                       help="писать замеры строками JSON в файл ('-' - в stdout) вместо экрана")
+    watch.add_argument('--flush', type=int, default=1, metavar='N',
+                       help="сбрасывать буфер каждые N замеров, 0 - не сбрасывать принудительно (по умолчанию 1)")
+    watch.add_argument('--record', metavar='ФАЙЛ', help="дополнительно писать сеанс в бинарный файл")
+    watch.add_argument('--rules', metavar='ФАЙЛ', help="проверять правила оповещений из файла")
+    alert = commands.add_parser('alert', help="проверка правил оповещений без экрана мониторинга")
+    alert.add_argument('rules', metavar='ФАЙЛ', help="файл правил (см. AlertRule)")
+    alert.add_argument('-i', '--interval', type=float, default=1.0, help="интервал проверки, сек (по умолчанию 1)")
+    replay = commands.add_parser('replay', help="вывод записи сеанса (watch --record) строками JSON")
+    replay.add_argument('path', metavar='ФАЙЛ', help="файл записи")
+    replay.add_argument('--start', type=int, default=0, help="номер первого кадра (по умолчанию 0)")
+    replay.add_argument('--since', type=float, metavar='UNIXTIME', help="начать с кадра не раньше этого времени")
+    replay.add_argument('-n', '--count', type=int, help="сколько кадров вывести (по умолчанию все)")
+    commands.add_parser('serve', parents=[server], help="метрики Prometheus по HTTP")
+    
+    args = parser.parse_args(argv)
+    if args.serve:
+        if args.command not in (None, 'serve'):
+            parser.error(f"--serve нельзя сочетать с командой {args.command}")
+        args.command = 'serve'
+    given = [name for name in server_defaults if hasattr(args, name)]
+    if given and args.command != 'serve':
+        options = ', '.join(f'--{name}' for name in given)
+        parser.error(f"{options}: только для --serve и команды serve")
+    for name, default in server_defaults.items():
+        if not hasattr(args, name):
+            setattr(args, name, default)
+    return args
+
+
+def run_command(args):
+    """Выполнение неинтерактивной команды; возвращает код выхода
+    
+    Каждая команда трогает только нужные ей сборщики, так что, например,
+    mem на Linux читает /proc/meminfo и вовсе не загружает psutil.
+    """
+    snapshots = {
+        'cpu': (Collector.cpu, SystemMonitor.render_cpu),
+        'mem': (Collector.memory, SystemMonitor.render_memory),
+        'disks': (Collector.disks, SystemMonitor.render_disks),
+        'net': (Collector.network, SystemMonitor.render_network),
+        'top': (lambda: Collector.processes(args.limit),
+                lambda snapshot: SystemMonitor.render_processes(snapshot, args.limit)),
+    }
+    
+    rules = getattr(args, 'rules', None)
+    if rules is not None:
+        # Ошибки в правилах - до запуска мониторинга, с номером строки
+        try:
+            rules = AlertEngine.load(rules)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.RED}❌ Правила оповещений: {e}{Colors.ENDC}", file=sys.stderr)
+            return 2
+    
+    if args.command in snapshots:
+        collect, render = snapshots[args.command]
+        snapshot = collect()
+        if args.json:
+            import json
+            print(json.dumps(snapshot.as_dict(), ensure_ascii=False, separators=(',', ':')))
+        else:
+            render(snapshot)
+    elif args.command == 'fetch':
+        show_neofetch(args.refresh, pause=False)
+    elif args.command == 'watch':
+        continuous_monitor(args.interval, args.ndjson, args.flush, args.record, rules)
+    elif args.command == 'alert':
+        run_alerts(rules, args.interval)
+    elif args.command == 'replay':
+        replay_recording(args.path, args.start, args.since, args.count)
+    elif args.command == 'serve':
+        serve_metrics(args.host, args.port, args.ttl, args.top)
+    else:
+        main()
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    # Без аргументов - сразу интерактивное меню, argparse не нужен
+    sys.exit(run_command(parse_args()) if len(sys.argv) > 1 else main())
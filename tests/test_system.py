@@ -0,0 +1,564 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Тесты system.py. Запуск: python -m pytest -q (или python -m unittest discover tests)
+"""
+
+import io
+import json
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import system
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), "нужен /proc")
+class ProcFileTest(unittest.TestCase):
+    
+    def test_reads_seq_file_larger_than_page(self):
+        # Дополнительные отображения раздувают /proc/self/maps до нескольких страниц
+        mappings = [mmap.mmap(-1, mmap.PAGESIZE) for _ in range(500)]
+        try:
+            proc_file = system.ProcFile('/proc/self/maps', size=1024)
+            try:
+                data = proc_file.read()
+            finally:
+                proc_file.close()
+            with open('/proc/self/maps', 'rb') as f:
+                expected = f.read()
+        finally:
+            for mapping in mappings:
+                mapping.close()
+        self.assertGreater(len(expected), 4 * mmap.PAGESIZE)
+        self.assertEqual(data.count(b'\n'), expected.count(b'\n'))
+        self.assertEqual(len(data), len(expected))
+    
+    def test_repeated_reads_reuse_buffer(self):
+        proc_file = system.ProcFile('/proc/self/stat', size=16)
+        try:
+            first = proc_file.read()
+            second = proc_file.read()
+        finally:
+            proc_file.close()
+        self.assertEqual(first.split()[0], second.split()[0])
+        self.assertTrue(first.endswith(b'\n'))
+
+
+class CleanTempFilesTest(unittest.TestCase):
+    
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self._tmp.name)
+        self.temp = os.path.join(self.root, 'temp')
+        self.outside = os.path.join(self.root, 'outside')
+        os.mkdir(self.temp)
+        os.mkdir(self.outside)
+        self.keep = self._make(self.outside, 'keep.txt')
+    
+    def tearDown(self):
+        self._tmp.cleanup()
+    
+    def _make(self, *parts, age=0):
+        path = os.path.join(*parts)
+        with open(path, 'w') as f:
+            f.write('data')
+        self._age(path, age)
+        return path
+    
+    @staticmethod
+    def _age(path, age):
+        if age:
+            stamp = time.time() - age
+            os.utime(path, (stamp, stamp), follow_symlinks=False)
+    
+    def _clean(self, **kwargs):
+        return system.SystemManager.clean_temp_files(temp_dirs=[self.temp], verbose=False, **kwargs)
+    
+    def test_fresh_empty_directory_is_kept(self):
+        fresh = os.path.join(self.temp, 'fresh')
+        os.mkdir(fresh)
+        old = os.path.join(self.temp, 'old')
+        os.mkdir(old)
+        self._age(old, 7200)
+        
+        report = self._clean(min_age=3600)
+        
+        self.assertTrue(os.path.isdir(fresh))
+        self.assertFalse(os.path.exists(old))
+        self.assertEqual(report.dirs, 1)
+    
+    def test_old_directory_emptied_after_walk_is_removed(self):
+        nested = os.path.join(self.temp, 'old', 'sub')
+        os.makedirs(nested)
+        self._make(nested, 'file', age=7200)
+        self._age(nested, 7200)
+        self._age(os.path.dirname(nested), 7200)
+        
+        report = self._clean(min_age=3600)
+        
+        self.assertFalse(os.path.exists(os.path.join(self.temp, 'old')))
+        self.assertEqual((report.files, report.dirs), (1, 2))
+    
+    def test_symlinks_are_removed_not_followed(self):
+        os.mkdir(os.path.join(self.temp, 'dir'))
+        os.symlink(self.outside, os.path.join(self.temp, 'dir', 'to-outside'))
+        os.symlink(self.outside, os.path.join(self.temp, 'top-link'))
+        
+        self._clean()
+        
+        self.assertEqual(os.listdir(self.temp), [])
+        self.assertTrue(os.path.isfile(self.keep))
+    
+    @unittest.skipUnless(system.SystemManager._FD_SAFE, "нет поддержки dir_fd")
+    def test_swapped_directory_is_not_entered(self):
+        victim = os.path.join(self.temp, 'victim')
+        os.mkdir(victim)
+        st = os.lstat(victim)
+        # Между lstat и открытием каталог заменяют симлинком наружу
+        os.rmdir(victim)
+        os.symlink(self.outside, victim)
+        
+        top = os.open(self.temp, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            result = system.SystemManager._clean_tree(top, 'victim', victim, st, None, None, False)
+        finally:
+            os.close(top)
+        
+        self.assertEqual((result.files, result.skipped), (0, 1))
+        self.assertTrue(os.path.isfile(self.keep))
+    
+    @unittest.skipUnless(system.SystemManager._FD_SAFE, "нет поддержки dir_fd")
+    def test_replaced_directory_is_not_entered(self):
+        victim = os.path.join(self.temp, 'victim')
+        os.mkdir(victim)
+        st = os.lstat(victim)
+        # Каталог заменяют другим каталогом с чужим содержимым
+        os.rename(victim, os.path.join(self.root, 'moved'))
+        os.rename(self.outside, victim)
+        
+        top = os.open(self.temp, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            result = system.SystemManager._clean_tree(top, 'victim', victim, st, None, None, False)
+        finally:
+            os.close(top)
+        
+        self.assertEqual(result.files, 0)
+        self.assertTrue(os.path.isfile(os.path.join(victim, 'keep.txt')))
+
+
+class ProcessTableTest(unittest.TestCase):
+    
+    def setUp(self):
+        # Поддельный /proc/loadavg: последний выданный PID задается тестом
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.table = system.ProcessTable(procfs=self._tmp.name)
+        self._set_last_pid(1000)
+    
+    def _set_last_pid(self, pid):
+        with open(os.path.join(self._tmp.name, 'loadavg'), 'w') as f:
+            f.write(f'0.00 0.00 0.00 1/100 {pid}\n')
+    
+    def _make_stale(self, pid):
+        """Запись, оставшаяся от прежнего владельца PID"""
+        table = self.table
+        stale = table._entries[pid]
+        table._drop_entry(pid)
+        stale.name = 'old-owner'
+        stale.create_time -= 1000
+        # Накопленное время CPU меньше, чем у нового процесса
+        stale.cpu_time = 0.0
+        table._entries[pid] = stale
+        table._by_name.setdefault(stale.name, {})[pid] = stale
+        table._by_user.setdefault(stale.username, {})[pid] = stale
+        return stale
+    
+    def test_reused_pid_replaces_stale_entry_after_pid_wrap(self):
+        table = self.table
+        table.refresh()
+        pid = os.getpid()
+        real_name = table._entries[pid].name
+        stale = self._make_stale(pid)
+        # Прежний процесс завершился, его PID выдан заново после переполнения счетчика
+        self._set_last_pid(10)
+        
+        with mock.patch.object(stale.proc, 'is_running', return_value=False) as is_running:
+            table.refresh()
+        
+        is_running.assert_called()
+        entry = table._entries[pid]
+        self.assertIsNot(entry, stale)
+        self.assertEqual(entry.name, real_name)
+        self.assertEqual(entry.create_time, system.psutil.Process(pid).create_time())
+        self.assertEqual(table.lookup(name='old-owner'), [])
+        self.assertIn(entry, table.lookup(name=real_name))
+    
+    def test_sweep_only_after_pid_wrap(self):
+        table = self.table
+        table.refresh()
+        entry = table._entries[os.getpid()]
+        self._set_last_pid(2000)
+        self.assertFalse(table._reuse_possible())
+        self._set_last_pid(5)
+        self.assertTrue(table._reuse_possible())
+        table.refresh()
+        self.assertIs(table._entries[os.getpid()], entry)
+    
+    def test_cpu_time_decrease_replaces_entry(self):
+        table = self.table
+        table.refresh()
+        pid = os.getpid()
+        stale = table._entries[pid]
+        stale.cpu_time = float('inf')
+        table.refresh()
+        self.assertIsNot(table._entries[pid], stale)
+    
+    @unittest.skipUnless(sys.platform.startswith('linux'), "нужен /bin/sh и /proc")
+    def test_exec_renames_entry_in_index(self):
+        child = subprocess.Popen(['/bin/sh', '-c', 'read line; exec sleep 5'], stdin=subprocess.PIPE)
+        self.addCleanup(child.wait)
+        self.addCleanup(child.kill)
+        table = self.table
+        table.refresh()
+        self.assertEqual(table._entries[child.pid].name, 'sh')
+        
+        child.stdin.write(b'go\n')
+        child.stdin.close()
+        deadline = time.monotonic() + 5
+        while system.psutil.Process(child.pid).name() != 'sleep' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        table.refresh()
+        
+        self.assertEqual(table._entries[child.pid].name, 'sleep')
+        self.assertIn(child.pid, [entry.pid for entry in table.lookup(name='sleep')])
+        self.assertNotIn(child.pid, [entry.pid for entry in table.lookup(name='sh')])
+
+
+class AlertEngineTest(unittest.TestCase):
+    
+    def test_process_rules_count_names_without_table_refresh(self):
+        name = system.psutil.Process().name()
+        engine = system.AlertEngine([system.AlertRule(1, f'process {name} absent'),
+                                     system.AlertRule(2, 'process no-such-process present')])
+        with mock.patch.object(system.ProcessTable, 'refresh') as refresh:
+            sample = engine.collect()
+        refresh.assert_not_called()
+        self.assertGreaterEqual(sample['process'][name], 1.0)
+        self.assertEqual(sample['process']['no-such-process'], 0.0)
+    
+    def test_process_scan_runs_on_its_own_schedule(self):
+        engine = system.AlertEngine([system.AlertRule(1, 'process init present')])
+        with mock.patch('psutil.process_iter', return_value=[]) as process_iter:
+            engine.collect()
+            engine.collect()
+            self.assertEqual(process_iter.call_count, 1)
+            engine._process_scanned -= engine.PROCESS_INTERVAL
+            engine.collect()
+            self.assertEqual(process_iter.call_count, 2)
+
+
+class PrometheusExporterTest(unittest.TestCase):
+    
+    def test_series_are_unique_and_disk_tracker_is_not_used(self):
+        shwtemp = namedtuple('shwtemp', 'label current high critical')
+        temps = {'coretemp': [shwtemp('Core 0', 40.0, 80.0, 90.0),
+                              shwtemp('Core 0', 42.0, 80.0, 90.0)]}
+        with mock.patch('psutil.sensors_temperatures', return_value=temps, create=True), \
+                mock.patch.object(system.Collector, 'disks') as disks:
+            body = system.PrometheusExporter().collect().decode('utf-8')
+        disks.assert_not_called()
+        
+        series = [line.rsplit(' ', 1)[0] for line in body.splitlines() if not line.startswith('#')]
+        self.assertEqual(len(series), len(set(series)))
+        temperature = [line for line in series if 'temperature_celsius' in line]
+        self.assertEqual(len(temperature), 2)
+
+
+class DiskUsageTest(unittest.TestCase):
+    
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self._tmp.name)
+        for name in ('a', 'b', os.path.join('a', 'deep')):
+            os.mkdir(os.path.join(self.root, name))
+        self.linked = os.path.join(self.root, 'a', 'linked')
+        with open(self.linked, 'wb') as f:
+            f.write(b'x' * 100000)
+        os.link(self.linked, os.path.join(self.root, 'b', 'linked'))
+        with open(os.path.join(self.root, 'a', 'deep', 'small'), 'wb') as f:
+            f.write(b'y' * 10)
+        # Ожидаемый размер: каталоги и файлы, жесткая ссылка - один раз
+        self._dir_sizes = {name: os.lstat(os.path.join(self.root, name)).st_size
+                           for name in ('a', 'b', os.path.join('a', 'deep'))}
+        self.expected = os.lstat(self.root).st_size + 100000 + 10 + sum(self._dir_sizes.values())
+    
+    def tearDown(self):
+        self._tmp.cleanup()
+    
+    def test_rescan_counts_hard_links_once(self):
+        analyzer = system.DiskUsageAnalyzer(self.root, top=5, apparent=True)
+        first = analyzer.scan()
+        second = analyzer.scan()
+        self.assertEqual(first.total, self.expected)
+        self.assertEqual(second.total, self.expected)
+        self.assertEqual((second.files, second.dirs), (2, 4))
+        self.assertEqual([f.size for f in second.top_files], [100000, 10])
+    
+    def test_single_worker_matches_pool(self):
+        pooled = system.DiskUsageAnalyzer(self.root, apparent=True, workers=8).scan()
+        single = system.DiskUsageAnalyzer(self.root, apparent=True, workers=1).scan()
+        self.assertEqual(pooled.total, single.total)
+        self.assertEqual((pooled.files, pooled.dirs), (single.files, single.dirs))
+        self.assertEqual(sorted(d.path for d in pooled.top_dirs), sorted(d.path for d in single.top_dirs))
+    
+    def test_index_rescan_counts_hard_links_once(self):
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        index = system.DirSizeIndex(self.root, path=os.path.join(index_dir.name, 'index.json'), apparent=True)
+        self.assertEqual(index.scan(), self.expected)
+        self.assertEqual(index.scan(full=True), self.expected)
+        self.assertEqual(index.scan(), self.expected)
+        self.assertEqual(index.rescanned, 0)
+        
+        # Каталог b перечитывается, a берется из индекса: ссылка по-прежнему одна
+        with open(os.path.join(self.root, 'b', 'new'), 'wb') as f:
+            f.write(b'z' * 5)
+        expected = self.expected + 5 + os.lstat(os.path.join(self.root, 'b')).st_size \
+            - self._dir_sizes['b']
+        self.assertEqual(index.scan(), expected)
+        self.assertEqual(index.rescanned, 1)
+        self.assertTrue(index.save())
+        
+        reloaded = system.DirSizeIndex(self.root, path=index.path, apparent=True)
+        self.assertTrue(reloaded.load())
+        self.assertEqual(reloaded.scan(), expected)
+        self.assertEqual(reloaded.rescanned, 0)
+
+
+class ParseArgsTest(unittest.TestCase):
+    
+    def _error(self, argv):
+        with mock.patch('sys.stderr'), self.assertRaises(SystemExit) as raised:
+            system.parse_args(argv)
+        self.assertEqual(raised.exception.code, 2)
+    
+    def test_server_options_before_and_after_serve(self):
+        args = system.parse_args(['--port', '9300', 'serve'])
+        self.assertEqual((args.command, args.host, args.port), ('serve', '127.0.0.1', 9300))
+        args = system.parse_args(['serve', '--port', '9400', '--ttl', '2'])
+        self.assertEqual((args.port, args.ttl, args.top), (9400, 2.0, 10))
+        args = system.parse_args(['--serve', '--host', '0.0.0.0'])
+        self.assertEqual((args.command, args.host, args.port), ('serve', '0.0.0.0', 9101))
+    
+    def test_conflicting_options_are_rejected(self):
+        self._error(['--serve', 'watch'])
+        self._error(['--port', '9300', 'mem'])
+        self._error(['--ttl', '5'])
+
+
+class RecordingTest(unittest.TestCase):
+    
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, 'session.rec')
+        self.columns = system.recording_schema(2, ['sda'], ['eth0'])
+    
+    def _frame(self, i):
+        return [1760000000 + i * 0.5, 12.5 + i, 10.0, 20.0 - i * 0.1,
+                55.5, 4 * 1024 ** 3 + i * 4096, 0.0, 70.1, 123456789 - i, i * 1000, i * 10,
+                i * 512, 1024, 3.3, 1e6 + i, 2e6 - i]
+    
+    def test_write_then_read_round_trip(self):
+        writer = system.RecordingWriter(self.path, self.columns, interval=0.5, keyframe_every=4)
+        frames = [self._frame(i) for i in range(11)]
+        for values in frames:
+            writer.write(values)
+        writer.close()
+        
+        with system.Recording(self.path) as recording:
+            self.assertEqual(len(recording), 11)
+            self.assertEqual(recording.columns, [name for name, _ in self.columns])
+            for expected, actual in zip(frames, recording.frames()):
+                for (name, scale), want, got in zip(self.columns, expected, actual):
+                    self.assertAlmostEqual(got, round(want * scale) / scale, msg=name)
+                    if scale == 1:
+                        self.assertIsInstance(got, int)
+            # Кадр из середины участка между ключевыми кадрами и поиск по времени
+            self.assertEqual(recording.frame(6), next(recording.frames(6, 7)))
+            self.assertEqual(recording.frame(-1)[1], frames[-1][1])
+            self.assertEqual(recording.index_at(1760000000 + 3.2), 7)
+    
+    def test_frame_length_must_match_schema(self):
+        writer = system.RecordingWriter(self.path, self.columns)
+        self.addCleanup(writer.close)
+        values = self._frame(0)
+        with self.assertRaises(ValueError):
+            writer.write(values[:-1])
+        with self.assertRaises(ValueError):
+            writer.write(values + [0])
+        writer.write(values)
+        self.assertEqual(writer.frames, 1)
+
+
+class RingBufferTest(unittest.TestCase):
+    
+    def test_keeps_last_values_in_order(self):
+        ring = system.RingBuffer(4)
+        self.assertEqual((len(ring), ring.values(), ring.last('-')), (0, [], '-'))
+        for value in range(1, 7):
+            ring.append(value)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.values(), [3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(ring.values(2), [5.0, 6.0])
+        self.assertEqual(ring.last(), 6.0)
+    
+    def test_rollup_aggregates_by_period(self):
+        rollup = system.Rollup(10, 3)
+        for timestamp, value in ((100, 1), (105, 5), (109, 3), (110, 10), (125, 7), (126, 9)):
+            rollup.add(value, timestamp)
+        # Закрыты интервалы 100 и 110; 120 еще копится
+        self.assertEqual(rollup.times.values(), [100.0, 110.0])
+        self.assertEqual(rollup.mins.values(), [1.0, 10.0])
+        self.assertEqual(rollup.maxs.values(), [5.0, 10.0])
+        self.assertEqual(rollup.avgs.values(), [3.0, 10.0])
+        # Интервал 110-120 пересекается с окном от 115, учитывается целиком
+        self.assertEqual(rollup.window(115), (7.0, 9.0, 10.0))
+        self.assertEqual(rollup.window(0), (1.0, 7.0, 10.0))
+
+
+class NdjsonWriterTest(unittest.TestCase):
+    
+    def test_lines_are_valid_json(self):
+        stream = io.StringIO()
+        writer = system.NdjsonWriter(stream, flush_every=2)
+        mem = SimpleNamespace(percent=50.0, used=1024, total=2048, swap_percent=0.0)
+        disk = SimpleNamespace(percent=10.0, free=5)
+        disk_rates = [SimpleNamespace(device='sd"a\\', read_bps=1.0, write_bps=2.0, read_iops=3, write_iops=4,
+                                      latency_ms=0.5, busy_percent=9.0)]
+        net_rates = [SimpleNamespace(interface='eth0', rx_bps=8.0, tx_bps=16.0, rx_pps=1, tx_pps=2,
+                                     errors_ps=0.0, drops_ps=0.0)]
+        with mock.patch.object(stream, 'flush') as flush:
+            for i in range(3):
+                writer.write(1760000000.5 + i, 12.3, (1.0, 2.0), mem, disk, disk_rates, 10.0, 20.0, net_rates)
+        self.assertEqual(flush.call_count, 1)
+        
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        sample = json.loads(lines[-1])
+        self.assertEqual(sample['ts'], 1760000002.5)
+        self.assertEqual(sample['percpu'], [1.0, 2.0])
+        self.assertEqual(sample['mem']['used'], 1024)
+        self.assertEqual(sample['disks']['sd"a\\']['iops'], 7.0)
+        self.assertEqual(sample['nics']['eth0']['tx_bps'], 16)
+        self.assertEqual(sample['net'], {'sent': 10, 'recv': 20})
+
+
+class ProcessTreeTest(unittest.TestCase):
+    
+    @staticmethod
+    def _entry(pid, ppid, cpu, rss, create_time=None):
+        return SimpleNamespace(pid=pid, ppid=ppid, name=f'p{pid}', cpu_percent=cpu, rss=rss,
+                               create_time=0 if create_time is None else create_time)
+    
+    def _assert_matches_rebuild(self, tree, entries):
+        # Инкрементальные суммы совпадают с деревом, построенным с нуля
+        fresh = system.ProcessTree()
+        fresh.update(entries)
+        self.assertEqual(set(tree.nodes), set(fresh.nodes))
+        for pid, node in fresh.nodes.items():
+            got = tree.nodes[pid]
+            self.assertEqual(got.parent.pid if got.parent else None, node.parent.pid if node.parent else None)
+            self.assertAlmostEqual(got.subtree_cpu, node.subtree_cpu)
+            self.assertEqual((got.subtree_rss, got.subtree_count), (node.subtree_rss, node.subtree_count))
+    
+    def test_incremental_updates_match_rebuild(self):
+        entries = {pid: self._entry(pid, ppid, cpu, rss) for pid, ppid, cpu, rss in (
+            (1, 0, 1.0, 100), (2, 1, 2.0, 200), (3, 2, 3.0, 300), (4, 1, 4.0, 400))}
+        tree = system.ProcessTree()
+        tree.update(entries.values())
+        root = tree.nodes[1]
+        self.assertEqual((root.subtree_cpu, root.subtree_rss, root.subtree_count), (10.0, 1000, 4))
+        
+        # Изменение нагрузки поднимается по цепочке предков
+        entries[3] = self._entry(3, 2, 13.0, 300)
+        tree.update(entries.values())
+        self.assertEqual(tree.nodes[2].subtree_cpu, 15.0)
+        self.assertEqual(root.subtree_cpu, 20.0)
+        self._assert_matches_rebuild(tree, entries.values())
+        
+        # Смена родителя переносит поддерево целиком
+        entries[3] = self._entry(3, 4, 13.0, 300)
+        tree.update(entries.values())
+        self.assertEqual(tree.nodes[4].subtree_count, 2)
+        self._assert_matches_rebuild(tree, entries.values())
+        
+        # Завершение процесса и появление нового
+        del entries[2]
+        entries[5] = self._entry(5, 3, 0.5, 50)
+        tree.update(entries.values())
+        self.assertEqual((root.subtree_count, root.subtree_cpu), (4, 18.5))
+        self._assert_matches_rebuild(tree, entries.values())
+        
+        # PID 4 достался новому процессу: он моложе 3 и родителем ему быть не может
+        entries[4] = self._entry(4, 1, 4.0, 400, create_time=4)
+        tree.update(entries.values())
+        self.assertIsNone(tree.nodes[3].parent)
+        self.assertEqual(root.subtree_count, 2)
+        self._assert_matches_rebuild(tree, entries.values())
+        entries[3] = self._entry(3, 1, 1.0, 10, create_time=99)
+        tree.update(entries.values())
+        self._assert_matches_rebuild(tree, entries.values())
+
+
+class AlertHysteresisTest(unittest.TestCase):
+    
+    def _engine(self, text):
+        return system.AlertEngine([system.AlertRule(1, text)])
+    
+    def _states(self, engine, samples):
+        """[(время, значение)] -> [(время, состояние)] для всех событий"""
+        result = []
+        for now, value in samples:
+            for event in engine.check({'cpu': {'': value}}, now):
+                result.append((now, event.state))
+        return result
+    
+    def test_fires_after_duration_and_clears_with_hysteresis(self):
+        engine = self._engine('cpu > 90% for 10s clear 80%')
+        events = self._states(engine, [
+            (0, 95), (5, 95),       # условие держится меньше for
+            (10, 95),               # срабатывает
+            (11, 85), (12, 85),     # ниже порога, но выше clear - остается
+            (13, 79),               # снимается
+            (14, 85),               # ниже порога - не срабатывает
+        ])
+        self.assertEqual(events, [(10, 'firing'), (13, 'resolved')])
+        self.assertEqual(engine.firing, {})
+    
+    def test_interrupted_condition_restarts_duration(self):
+        engine = self._engine('cpu > 90% for 10s')
+        events = self._states(engine, [(0, 95), (5, 50), (9, 95), (15, 95), (19, 95)])
+        self.assertEqual(events, [(19, 'firing')])
+    
+    def test_cooldown_limits_repeats(self):
+        engine = self._engine('cpu > 90% cooldown 60s')
+        events = self._states(engine, [
+            (0, 95), (1, 50),       # сработало и снялось
+            (2, 95), (30, 96),      # снова выше порога, но cooldown не истек
+            (61, 97),               # cooldown истек
+        ])
+        self.assertEqual(events, [(0, 'firing'), (1, 'resolved'), (61, 'firing')])
+
+
+if __name__ == '__main__':
+    unittest.main()